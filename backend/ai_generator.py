@@ -1,16 +1,64 @@
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
-import anthropic
+from anthropic_client import ClientSettings, ResilientCaller, build_clients
+from metrics import anthropic_round_seconds
+from retrieval_context import ToolInvocation
 
 logger = logging.getLogger(__name__)
 
+# Cache breakpoint marker for the Anthropic prompt cache
+EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+# response.usage fields accumulated per request and per generator
+USAGE_FIELDS = (
+    "input_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "output_tokens",
+)
+
+
+@dataclass
+class PromptUsage:
+    """Token counts reported by the API, split by prompt cache outcome"""
+
+    requests: int = 0
+    input_tokens: int = 0  # Input tokens neither read from nor written to cache
+    cache_read_input_tokens: int = 0  # Input tokens served from the prompt cache
+    cache_creation_input_tokens: int = 0  # Input tokens written to the cache
+    output_tokens: int = 0
+
+    def add(self, counts: Dict[str, int]):
+        """Add the usage of one API response"""
+        self.requests += 1
+        for name in USAGE_FIELDS:
+            setattr(self, name, getattr(self, name) + counts.get(name, 0))
+
+    @property
+    def cache_read_ratio(self) -> float:
+        """Share of all input tokens that were read from the prompt cache"""
+        total = (
+            self.input_tokens
+            + self.cache_read_input_tokens
+            + self.cache_creation_input_tokens
+        )
+        return self.cache_read_input_tokens / total if total else 0.0
+
 
 class AIGenerator:
     """Handles interactions with Anthropic's Claude API for generating responses"""
 
     MAX_TOOL_ROUNDS = 2
 
+    # Threads used to run the tool calls of one round concurrently
+    MAX_PARALLEL_TOOLS = 4
+
     # Static system prompt to avoid rebuilding on each call
     SYSTEM_PROMPT = """ You are an AI assistant specialized in course materials and educational content with access to search tools for course information.
 
@@ -48,19 +96,56 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
 
-    def __init__(self, api_key: str, model: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
+    # Prompt for folding old turns into a session's running summary
+    SUMMARY_PROMPT = """You maintain a running summary of a student's conversation with a course materials assistant.
+Merge the earlier summary and the new turns into one concise summary of a few short bullet points: the courses, lessons and topics discussed, and the answers given.
+Output only the summary.
+"""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        prompt_caching: bool = False,
+        client_settings: Optional[ClientSettings] = None,
+    ):
+        # Pooled clients shared by every round; retries and hedging happen
+        # in the caller so they can be counted
+        client_settings = client_settings or ClientSettings()
+        self.client, self.async_client = build_clients(api_key, client_settings)
+        self.caller = ResilientCaller(client_settings)
         self.model = model
 
+        # Keep system prompt, tools and history as a stable, cache-marked
+        # prefix instead of folding the history into the system string
+        self.prompt_caching = prompt_caching
+        self.usage = PromptUsage()
+        self._usage_lock = threading.Lock()
+
         # Pre-build base API parameters
         self.base_params = {"model": self.model, "temperature": 0, "max_tokens": 800}
 
+        # Created on first use by rounds with more than one tool call
+        self._tool_executor: Optional[ThreadPoolExecutor] = None
+        self._tool_executor_lock = threading.Lock()
+
+    async def aclose(self):
+        """Stop the hedging and tool threads and close both pooled clients"""
+        self.caller.close()
+        with self._tool_executor_lock:
+            executor, self._tool_executor = self._tool_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.client.close()
+        await self.async_client.close()
+
     def generate_response(
         self,
         query: str,
-        conversation_history: Optional[str] = None,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]] = None,
         tools: Optional[List] = None,
         tool_manager=None,
+        context=None,
     ) -> str:
         """
         Generate AI response with optional tool usage and conversation context.
@@ -68,50 +153,304 @@ Provide only the direct answer to what was asked.
 
         Args:
             query: The user's question or request
-            conversation_history: Previous messages for context
+            conversation_history: Previous messages for context, either
+                formatted text or a list of {"role", "content"} messages
             tools: Available tools the AI can use
             tool_manager: Manager to execute tools
+            context: Optional per-request RetrievalContext passed to tools
 
         Returns:
             Generated response as string
         """
 
-        # Build system content efficiently - avoid string ops when possible
-        system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-            if conversation_history
-            else self.SYSTEM_PROMPT
-        )
-
-        # Start with initial messages
-        messages = [{"role": "user", "content": query}]
+        system_content, messages = self._build_prompt(query, conversation_history)
 
         # Execute up to MAX_TOOL_ROUNDS rounds of tool calling
         for round_num in range(self.MAX_TOOL_ROUNDS):
             api_params = self._build_api_params(messages, system_content, tools)
 
-            logger.info("Round %d/%d — calling API", round_num + 1, self.MAX_TOOL_ROUNDS)
-            response = self.client.messages.create(**api_params)
-            logger.info("Round %d — stop_reason=%s", round_num + 1, response.stop_reason)
+            logger.info(
+                "Round %d/%d — calling API", round_num + 1, self.MAX_TOOL_ROUNDS
+            )
+            response = self.caller.call(self.client.messages.create, **api_params)
+            self._record_usage(response, context)
+            logger.info(
+                "Round %d — stop_reason=%s", round_num + 1, response.stop_reason
+            )
 
             # Handle tool execution if needed
             if response.stop_reason == "tool_use" and tool_manager:
                 messages, should_continue = self._handle_tool_execution(
-                    response, messages, tool_manager
+                    response, messages, tool_manager, context
                 )
                 if not should_continue:
                     break
             else:
                 # No tool use, return direct response
-                logger.info("Direct response (no tool use) after round %d", round_num + 1)
+                logger.info(
+                    "Direct response (no tool use) after round %d", round_num + 1
+                )
                 return response.content[0].text
 
         # After max rounds, make final call without tools to force a response
         logger.info("Max rounds reached — making final call without tools")
         final_params = self._build_api_params(messages, system_content, tools=None)
-        final_response = self.client.messages.create(**final_params)
+        final_response = self.caller.call(self.client.messages.create, **final_params)
+        self._record_usage(final_response, context)
         return final_response.content[0].text
 
+    async def agenerate_response(
+        self,
+        query: str,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+        context=None,
+    ) -> str:
+        """
+        Async variant of generate_response using the async Anthropic client.
+
+        API rounds are awaited instead of blocking the event loop, and tool
+        calls are dispatched through tool_manager.aexecute_tool so vector
+        search runs on the tool manager's executor.
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context, either
+                formatted text or a list of {"role", "content"} messages
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            context: Optional per-request RetrievalContext passed to tools
+
+        Returns:
+            Generated response as string
+        """
+        system_content, messages = self._build_prompt(query, conversation_history)
+
+        for round_num in range(self.MAX_TOOL_ROUNDS):
+            api_params = self._build_api_params(messages, system_content, tools)
+
+            logger.info(
+                "Round %d/%d — calling API", round_num + 1, self.MAX_TOOL_ROUNDS
+            )
+            response = await self.caller.acall(
+                self.async_client.messages.create, **api_params
+            )
+            self._record_usage(response, context)
+            logger.info(
+                "Round %d — stop_reason=%s", round_num + 1, response.stop_reason
+            )
+
+            if response.stop_reason == "tool_use" and tool_manager:
+                messages, should_continue = await self._ahandle_tool_execution(
+                    response, messages, tool_manager, context
+                )
+                if not should_continue:
+                    break
+            else:
+                logger.info(
+                    "Direct response (no tool use) after round %d", round_num + 1
+                )
+                return response.content[0].text
+
+        logger.info("Max rounds reached — making final call without tools")
+        final_params = self._build_api_params(messages, system_content, tools=None)
+        final_response = await self.caller.acall(
+            self.async_client.messages.create, **final_params
+        )
+        self._record_usage(final_response, context)
+        return final_response.content[0].text
+
+    async def astream_response(
+        self,
+        query: str,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+        context=None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an AI response as events while running the same tool rounds
+        as agenerate_response.
+
+        Yields event dicts keyed by "type":
+            round:        an API round is starting ("round", "final")
+            token:        a text delta as it arrives from the API
+                          ("round", "text")
+            discard:      the round ended in tool use, so its tokens (e.g.
+                          "Let me search...") are not part of the answer
+                          and should be removed from display ("round")
+            tool_use:     the model requested tools ("round", "tools")
+            tool_results: tool execution for the round finished ("round")
+            done:         the complete answer of the last round ("answer")
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context, either
+                formatted text or a list of {"role", "content"} messages
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+            context: Optional per-request RetrievalContext passed to tools
+
+        Yields:
+            Event dicts in the order they occur
+        """
+        system_content, messages = self._build_prompt(query, conversation_history)
+
+        for round_num in range(self.MAX_TOOL_ROUNDS):
+            api_params = self._build_api_params(messages, system_content, tools)
+
+            logger.info(
+                "Round %d/%d — streaming API", round_num + 1, self.MAX_TOOL_ROUNDS
+            )
+            yield {"type": "round", "round": round_num + 1, "final": False}
+            text_parts: List[str] = []
+            async for event in self._astream_round(api_params, round_num + 1):
+                if event["type"] == "token":
+                    text_parts.append(event["text"])
+                    yield event
+                else:
+                    response = event["message"]
+            self._record_usage(response, context)
+            logger.info(
+                "Round %d — stop_reason=%s", round_num + 1, response.stop_reason
+            )
+
+            if response.stop_reason == "tool_use" and tool_manager:
+                if text_parts:
+                    yield {"type": "discard", "round": round_num + 1}
+                yield {
+                    "type": "tool_use",
+                    "round": round_num + 1,
+                    "tools": [
+                        block.name
+                        for block in response.content
+                        if block.type == "tool_use"
+                    ],
+                }
+                messages, should_continue = await self._ahandle_tool_execution(
+                    response, messages, tool_manager, context
+                )
+                yield {"type": "tool_results", "round": round_num + 1}
+                if not should_continue:
+                    break
+            else:
+                logger.info(
+                    "Direct response (no tool use) after round %d", round_num + 1
+                )
+                yield {"type": "done", "answer": "".join(text_parts)}
+                return
+
+        logger.info("Max rounds reached — streaming final call without tools")
+        yield {"type": "round", "round": self.MAX_TOOL_ROUNDS + 1, "final": True}
+        final_params = self._build_api_params(messages, system_content, tools=None)
+        text_parts = []
+        async for event in self._astream_round(final_params, self.MAX_TOOL_ROUNDS + 1):
+            if event["type"] == "token":
+                text_parts.append(event["text"])
+                yield event
+            else:
+                self._record_usage(event["message"], context)
+        yield {"type": "done", "answer": "".join(text_parts)}
+
+    async def _astream_round(
+        self, api_params: Dict[str, Any], round_num: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream one API round as token events, then a "message" event with
+        the final message. The round is timed in the metrics, including the
+        time spent forwarding tokens to the client, and failed rounds are
+        recorded with outcome "error".
+        """
+        start = time.perf_counter()
+        try:
+            async with self.async_client.messages.stream(**api_params) as stream:
+                async for text in stream.text_stream:
+                    yield {"type": "token", "round": round_num, "text": text}
+                message = await stream.get_final_message()
+        except Exception:
+            anthropic_round_seconds.observe(
+                time.perf_counter() - start, mode="stream", outcome="error"
+            )
+            raise
+        anthropic_round_seconds.observe(
+            time.perf_counter() - start, mode="stream", outcome="ok"
+        )
+        yield {"type": "message", "message": message}
+
+    def summarize_conversation(
+        self,
+        previous_summary: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 300,
+    ) -> str:
+        """
+        Fold conversation turns into a running summary with one API call.
+
+        Args:
+            previous_summary: Summary of the turns before these ("" if none)
+            messages: {"role", "content"} turns to add to the summary
+            max_tokens: Maximum length of the new summary
+
+        Returns:
+            The updated summary
+        """
+        content = (
+            f"Earlier summary:\n{previous_summary or '(none)'}\n\n"
+            f"New turns:\n{self._format_history(messages)}"
+        )
+        response = self.caller.call(
+            self.client.messages.create,
+            model=self.model,
+            temperature=0,
+            max_tokens=max_tokens,
+            system=self.SUMMARY_PROMPT,
+            messages=[{"role": "user", "content": content}],
+        )
+        self._record_usage(response)
+        return response.content[0].text.strip()
+
+    def _build_prompt(
+        self,
+        query: str,
+        conversation_history: Optional[Union[str, List[Dict[str, str]]]],
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Lay out the system prompt and initial messages for a query.
+
+        Without prompt caching the history is appended to the system prompt
+        as text. With prompt caching the system prompt stays identical on
+        every call and the history becomes leading conversation turns, so
+        the system prompt, tools and earlier turns form a reusable prefix.
+
+        Returns:
+            Tuple of (system_content, messages)
+        """
+        if not self.prompt_caching:
+            if isinstance(conversation_history, list):
+                conversation_history = self._format_history(conversation_history)
+            system_content = self.SYSTEM_PROMPT
+            if conversation_history:
+                system_content += f"\n\nPrevious conversation:\n{conversation_history}"
+            return system_content, [{"role": "user", "content": query}]
+
+        messages: List[Dict[str, Any]] = []
+        if isinstance(conversation_history, list):
+            messages.extend(
+                {"role": m["role"], "content": m["content"]}
+                for m in conversation_history
+            )
+        elif conversation_history:
+            # Preformatted history has no turn structure to preserve
+            query = f"Previous conversation:\n{conversation_history}\n\n{query}"
+        messages.append({"role": "user", "content": query})
+        return self.SYSTEM_PROMPT, messages
+
+    @staticmethod
+    def _format_history(history: List[Dict[str, str]]) -> str:
+        """Format history messages the way SessionManager formats text history"""
+        return "\n".join(f"{m['role'].title()}: {m['content']}" for m in history)
+
     def _build_api_params(
         self,
         messages: List,
@@ -137,18 +476,86 @@ Provide only the direct answer to what was asked.
         if tools:
             params["tools"] = tools
             params["tool_choice"] = {"type": "auto"}
+        if self.prompt_caching:
+            self._add_cache_breakpoints(params)
         return params
 
+    @staticmethod
+    def _add_cache_breakpoints(params: Dict[str, Any]):
+        """
+        Mark the prompt cache breakpoints of a request.
+
+        Breakpoints go after the system prompt, after the last tool and on
+        the last message, so each tool round reads the previous round's
+        prefix from cache. The caller's message list is left untouched.
+        """
+        params["system"] = [
+            {"type": "text", "text": params["system"], "cache_control": EPHEMERAL_CACHE}
+        ]
+        tools = params.get("tools")
+        if tools:
+            params["tools"] = [
+                *tools[:-1],
+                {**tools[-1], "cache_control": EPHEMERAL_CACHE},
+            ]
+
+        messages = params["messages"]
+        if not messages:
+            return
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        if not content or not isinstance(content[-1], dict):
+            return
+        content = [*content[:-1], {**content[-1], "cache_control": EPHEMERAL_CACHE}]
+        params["messages"] = [*messages[:-1], {**last, "content": content}]
+
+    def _record_usage(self, response, context=None):
+        """Add the token usage of a response to the totals and the context"""
+        usage = getattr(response, "usage", None)
+        counts = {}
+        for name in USAGE_FIELDS:
+            value = getattr(usage, name, None)
+            counts[name] = value if isinstance(value, int) else 0
+        with self._usage_lock:
+            self.usage.add(counts)
+        if context is not None:
+            context.record_usage(counts)
+
+    def get_client_stats(self) -> Dict[str, Any]:
+        """Retry and hedge counters of the API caller"""
+        return self.caller.stats()
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """Token totals across requests, with the prompt cache read ratio"""
+        with self._usage_lock:
+            stats = asdict(self.usage)
+            stats["cache_read_ratio"] = self.usage.cache_read_ratio
+            return stats
+
+    @staticmethod
+    def _tool_kwargs(tool_input: Dict[str, Any], context) -> Dict[str, Any]:
+        """Build execute_tool keyword arguments, adding the context if given"""
+        if context is None:
+            return tool_input
+        return {**tool_input, "context": context}
+
     def _handle_tool_execution(
-        self, initial_response, messages: List, tool_manager
+        self, initial_response, messages: List, tool_manager, context=None
     ) -> Tuple[List, bool]:
         """
         Handle execution of tool calls and update message history.
 
+        Tool calls of the same round run concurrently, each bounded by
+        tool_manager.get_tool_timeout, and their results are sent back in
+        the order the model requested them.
+
         Args:
             initial_response: The response containing tool use requests
             messages: Current message history
             tool_manager: Manager to execute tools
+            context: Optional per-request RetrievalContext passed to tools
 
         Returns:
             Tuple of (updated_messages, should_continue)
@@ -156,49 +563,141 @@ Provide only the direct answer to what was asked.
         # Add AI's tool use response
         messages.append({"role": "assistant", "content": initial_response.content})
 
-        # Execute all tool calls and collect results
-        tool_results = []
-        for content_block in initial_response.content:
-            if content_block.type == "tool_use":
-                tool_name = content_block.name
-                tool_input = content_block.input
-                logger.info("Executing tool: %s(%s)", tool_name, tool_input)
-
+        blocks = [b for b in initial_response.content if b.type == "tool_use"]
+        timeouts = [tool_manager.get_tool_timeout(b.name) for b in blocks]
+
+        if len(blocks) == 1 and timeouts[0] is None:
+            # A single unbounded call gains nothing from a thread hop
+            outcomes = [self._run_tool(blocks[0], tool_manager, context)]
+        else:
+            executor = self._get_tool_executor()
+            started = time.monotonic()
+            # Each call records into a fork, merged back only if it finishes
+            forks = [context.fork() if context is not None else None for _ in blocks]
+            futures = [
+                executor.submit(self._run_tool, block, tool_manager, fork)
+                for block, fork in zip(blocks, forks)
+            ]
+            outcomes = []
+            for block, future, timeout, fork in zip(blocks, futures, timeouts, forks):
+                remaining = (
+                    None
+                    if timeout is None
+                    else max(0.0, started + timeout - time.monotonic())
+                )
                 try:
-                    tool_result = tool_manager.execute_tool(tool_name, **tool_input)
-                    logger.info(
-                        "Tool %s returned %d chars",
-                        tool_name,
-                        len(tool_result) if tool_result else 0,
-                    )
-
-                    tool_results.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": content_block.id,
-                            "content": tool_result,
-                        }
-                    )
-                except Exception as e:
-                    # Tool execution failed, log and stop rounds
-                    logger.warning(
-                        "Tool %s failed: %s", tool_name, str(e), exc_info=True
-                    )
-                    tool_results.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": content_block.id,
-                            "content": f"Error: Tool execution failed - {str(e)}",
-                        }
-                    )
-                    # Add tool results and signal to stop
-                    if tool_results:
-                        messages.append({"role": "user", "content": tool_results})
-                    return messages, False
+                    outcomes.append(future.result(timeout=remaining))
+                except TimeoutError:
+                    # Frees the worker if the call has not started; one that
+                    # has can no longer write to the request's context
+                    future.cancel()
+                    error = f"Tool '{block.name}' timed out after {timeout}s"
+                    if fork is not None:
+                        fork.close()
+                        context.record_tool_call(
+                            ToolInvocation(
+                                block.name, block.input, None, timeout, error
+                            )
+                        )
+                    outcomes.append((None, error))
+                    continue
+                if fork is not None:
+                    context.merge(fork)
+
+        return self._append_tool_results(blocks, outcomes, messages)
+
+    async def _ahandle_tool_execution(
+        self, initial_response, messages: List, tool_manager, context=None
+    ) -> Tuple[List, bool]:
+        """
+        Async counterpart of _handle_tool_execution.
+
+        All tool calls of the round are awaited together through
+        tool_manager.aexecute_tool, which enforces per-tool timeouts, so the
+        round takes as long as its slowest tool.
+
+        Args:
+            initial_response: The response containing tool use requests
+            messages: Current message history
+            tool_manager: Manager to execute tools (must provide aexecute_tool)
+            context: Optional per-request RetrievalContext passed to tools
+
+        Returns:
+            Tuple of (updated_messages, should_continue)
+        """
+        messages.append({"role": "assistant", "content": initial_response.content})
+
+        blocks = [b for b in initial_response.content if b.type == "tool_use"]
+        outcomes = await asyncio.gather(
+            *(self._arun_tool(block, tool_manager, context) for block in blocks)
+        )
+        return self._append_tool_results(blocks, list(outcomes), messages)
+
+    def _get_tool_executor(self) -> ThreadPoolExecutor:
+        with self._tool_executor_lock:
+            if self._tool_executor is None:
+                self._tool_executor = ThreadPoolExecutor(
+                    max_workers=self.MAX_PARALLEL_TOOLS, thread_name_prefix="rag-tool"
+                )
+            return self._tool_executor
+
+    def _run_tool(
+        self, block, tool_manager, context
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Execute one tool_use block, returning (result, error message)"""
+        logger.info("Executing tool: %s(%s)", block.name, block.input)
+        try:
+            result = tool_manager.execute_tool(
+                block.name, **self._tool_kwargs(block.input, context)
+            )
+        except Exception as e:
+            logger.warning("Tool %s failed: %s", block.name, str(e), exc_info=True)
+            return None, str(e)
+        logger.info(
+            "Tool %s returned %d chars", block.name, len(result) if result else 0
+        )
+        return result, None
+
+    async def _arun_tool(
+        self, block, tool_manager, context
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Async counterpart of _run_tool"""
+        logger.info("Executing tool: %s(%s)", block.name, block.input)
+        try:
+            result = await tool_manager.aexecute_tool(
+                block.name, **self._tool_kwargs(block.input, context)
+            )
+        except Exception as e:
+            logger.warning("Tool %s failed: %s", block.name, str(e), exc_info=True)
+            return None, str(e)
+        logger.info(
+            "Tool %s returned %d chars", block.name, len(result) if result else 0
+        )
+        return result, None
+
+    @staticmethod
+    def _append_tool_results(
+        blocks: List, outcomes: List[Tuple[Optional[str], Optional[str]]], messages
+    ) -> Tuple[List, bool]:
+        """
+        Add the round's tool results to the messages in request order.
+
+        Returns:
+            Tuple of (updated_messages, should_continue); any failed tool
+            stops further tool rounds
+        """
+        tool_results = []
+        failed = False
+        for block, (result, error) in zip(blocks, outcomes):
+            if error is not None:
+                failed = True
+                result = f"Error: Tool execution failed - {error}"
+            tool_results.append(
+                {"type": "tool_result", "tool_use_id": block.id, "content": result}
+            )
 
         # Add tool results as single message
         if tool_results:
             messages.append({"role": "user", "content": tool_results})
 
-        # Continue with next round
-        return messages, True
+        return messages, not failed
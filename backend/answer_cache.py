@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class CachedAnswer:
+    """An answer stored in the cache together with its citations"""
+
+    answer: str
+    sources: List[str]
+    source_links: List[Optional[str]]
+    embedding: np.ndarray  # Unit-length query embedding
+    scope: str  # Fingerprint of the session-independent prompt
+    generation: int  # Vector store generation the answer was produced from
+    created_at: float
+    hits: int = 0
+
+
+class AnswerCache:
+    """
+    Semantic cache of final answers keyed on the query embedding.
+
+    A lookup hits when a cached query in the same scope and index generation
+    has cosine similarity of at least similarity_threshold. Entries expire
+    after ttl_seconds, the least recently used ones are evicted beyond
+    max_entries, and entries from an older generation are dropped as soon as
+    the vector store content changes.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        similarity_threshold: float = 0.95,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+        self._entries: "OrderedDict[int, CachedAnswer]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: Any) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _drop_stale(self, generation: int):
+        """Remove expired entries and entries from other index generations"""
+        now = self.clock()
+        for entry_id, entry in list(self._entries.items()):
+            if entry.generation != generation:
+                del self._entries[entry_id]
+                self.invalidations += 1
+            elif now - entry.created_at > self.ttl_seconds:
+                del self._entries[entry_id]
+                self.expirations += 1
+
+    def lookup(
+        self, embedding: Any, scope: str, generation: int
+    ) -> Optional[CachedAnswer]:
+        """Return the most similar fresh answer, or None on a miss"""
+        query = self._normalize(embedding)
+        with self._lock:
+            self._drop_stale(generation)
+            best_id, best_score = None, self.similarity_threshold
+            for entry_id, entry in self._entries.items():
+                if entry.scope != scope:
+                    continue
+                score = float(np.dot(query, entry.embedding))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            entry = self._entries[best_id]
+            entry.hits += 1
+            self.hits += 1
+            return entry
+
+    def store(
+        self,
+        embedding: Any,
+        scope: str,
+        generation: int,
+        answer: str,
+        sources: List[str],
+        source_links: List[Optional[str]],
+    ):
+        """Cache an answer, evicting the least recently used entries if full"""
+        if self.max_entries <= 0:
+            return
+        entry = CachedAnswer(
+            answer=answer,
+            sources=list(sources),
+            source_links=list(source_links),
+            embedding=self._normalize(embedding),
+            scope=scope,
+            generation=generation,
+            created_at=self.clock(),
+        )
+        with self._lock:
+            self._entries[self._next_id] = entry
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss and eviction counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
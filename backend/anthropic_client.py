@@ -0,0 +1,329 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import anthropic
+import httpx
+from metrics import anthropic_round_seconds
+
+# Statuses worth retrying: timeouts, conflicts, rate limits and overload
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+@dataclass
+class ClientSettings:
+    """Connection pool, timeout, retry and hedging settings for API calls"""
+
+    max_connections: int = 32  # Concurrent connections per client
+    max_keepalive_connections: int = 16  # Idle connections kept open
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept
+    connect_timeout: float = 5.0  # Seconds to establish a connection
+    request_timeout: float = 60.0  # Seconds one API round may take
+    max_retries: int = 3  # Retries after the first attempt
+    backoff_base: float = 0.5  # First retry waits up to this many seconds
+    backoff_max: float = 8.0  # Upper bound of any single retry wait
+    hedge_percentile: float = 0.0  # Latency percentile that starts a hedge (0: off)
+    hedge_min_samples: int = 20  # Latencies observed before hedging starts
+    latency_window: int = 200  # Recent latencies the percentile is taken over
+
+    @classmethod
+    def from_config(cls, config) -> "ClientSettings":
+        """Build settings from the application Config"""
+        return cls(
+            max_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=config.ANTHROPIC_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.ANTHROPIC_KEEPALIVE_EXPIRY,
+            connect_timeout=config.ANTHROPIC_CONNECT_TIMEOUT,
+            request_timeout=config.ANTHROPIC_TIMEOUT,
+            max_retries=config.ANTHROPIC_MAX_RETRIES,
+            backoff_base=config.ANTHROPIC_BACKOFF_BASE,
+            backoff_max=config.ANTHROPIC_BACKOFF_MAX,
+            hedge_percentile=config.ANTHROPIC_HEDGE_PERCENTILE,
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.request_timeout, connect=self.connect_timeout)
+
+
+def build_clients(
+    api_key: str, settings: ClientSettings
+) -> Tuple[anthropic.Anthropic, anthropic.AsyncAnthropic]:
+    """
+    Create the sync and async Anthropic clients on pooled HTTP clients.
+
+    The SDK's own retries are disabled because ResilientCaller retries
+    with jittered backoff and counts every attempt.
+    """
+    client = anthropic.Anthropic(
+        api_key=api_key,
+        max_retries=0,
+        timeout=settings.timeout(),
+        http_client=httpx.Client(limits=settings.limits(), timeout=settings.timeout()),
+    )
+    async_client = anthropic.AsyncAnthropic(
+        api_key=api_key,
+        max_retries=0,
+        timeout=settings.timeout(),
+        http_client=httpx.AsyncClient(
+            limits=settings.limits(), timeout=settings.timeout()
+        ),
+    )
+    return client, async_client
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an API error is transient and the request may be repeated"""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True  # Includes APITimeoutError
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from a Retry-After header"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Sliding window of request latencies for percentile estimates"""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency at the given percentile (0-100), or None without samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class ResilientCaller:
+    """
+    Runs API requests with jittered retries and optional hedging.
+
+    Transient failures (connection errors, 429 and 5xx) are retried up to
+    max_retries times with full-jitter exponential backoff, honouring a
+    Retry-After header. When hedging is enabled and enough latencies have
+    been observed, a request still running after the hedge percentile gets
+    a second, identical request and whichever succeeds first is returned.
+    Hedging suits the idempotent messages.create calls; streams are not
+    routed through here because their tokens have already been forwarded.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[ClientSettings] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.settings = settings or ClientSettings()
+        self.latency = LatencyTracker(self.settings.latency_window)
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Seconds to wait before retry number attempt (0-based)"""
+        ceiling = min(
+            self.settings.backoff_max, self.settings.backoff_base * 2**attempt
+        )
+        delay = random.uniform(0, ceiling)
+        server_delay = retry_after(error)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.settings.backoff_max))
+        return delay
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a request is hedged, or None to not hedge"""
+        if self.settings.hedge_percentile <= 0:
+            return None
+        if len(self.latency) < self.settings.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.settings.hedge_percentile)
+
+    def call(self, fn: Callable[..., Any], **params) -> Any:
+        """Call fn(**params) with retries and hedging"""
+        self._count("requests")
+        round_start = time.perf_counter()
+        for attempt in range(self.settings.max_retries + 1):
+            start = time.monotonic()
+            try:
+                result = self._send(fn, params)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.settings.max_retries:
+                    self._count("failures")
+                    anthropic_round_seconds.observe(
+                        time.perf_counter() - round_start,
+                        mode="create",
+                        outcome="error",
+                    )
+                    raise
+                self._count("retries")
+                self._sleep(self.backoff(attempt, e))
+                continue
+            self.latency.record(time.monotonic() - start)
+            anthropic_round_seconds.observe(
+                time.perf_counter() - round_start, mode="create", outcome="ok"
+            )
+            return result
+
+    async def acall(self, fn: Callable[..., Awaitable[Any]], **params) -> Any:
+        """Async counterpart of call for the async client"""
+        self._count("requests")
+        round_start = time.perf_counter()
+        for attempt in range(self.settings.max_retries + 1):
+            start = time.monotonic()
+            try:
+                result = await self._asend(fn, params)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.settings.max_retries:
+                    self._count("failures")
+                    anthropic_round_seconds.observe(
+                        time.perf_counter() - round_start,
+                        mode="create",
+                        outcome="error",
+                    )
+                    raise
+                self._count("retries")
+                await self._async_sleep(self.backoff(attempt, e))
+                continue
+            self.latency.record(time.monotonic() - start)
+            anthropic_round_seconds.observe(
+                time.perf_counter() - round_start, mode="create", outcome="ok"
+            )
+            return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.settings.max_connections,
+                    thread_name_prefix="api-hedge",
+                )
+            return self._executor
+
+    def _send(self, fn: Callable[..., Any], params: Dict[str, Any]) -> Any:
+        """One attempt, hedged with a second request if it runs long"""
+        delay = self.hedge_delay()
+        if delay is None:
+            return fn(**params)
+
+        executor = self._get_executor()
+        primary = executor.submit(fn, **params)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+
+        self._count("hedges")
+        backup = executor.submit(fn, **params)
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count("hedge_wins")
+                    # The slower request finishes in the background
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    async def _asend(self, fn: Callable[..., Awaitable[Any]], params: Dict[str, Any]):
+        """Async attempt; the losing request of a hedge is cancelled"""
+        delay = self.hedge_delay()
+        if delay is None:
+            return await fn(**params)
+
+        primary = asyncio.ensure_future(fn(**params))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self._count("hedges")
+        backup = asyncio.ensure_future(fn(**params))
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self):
+        """Stop the hedging threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request, retry and hedge counters with latency percentiles"""
+        with self._lock:
+            counters = {
+                "requests": self.requests,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "failures": self.failures,
+            }
+        return {
+            **counters,
+            "latency_p50": self.latency.percentile(50),
+            "latency_p95": self.latency.percentile(95),
+        }
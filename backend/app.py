@@ -2,17 +2,28 @@ import warnings
 
 warnings.filterwarnings("ignore", message="resource_tracker: There appear to be.*")
 
+# Imported first so the startup profile covers the imports below
+from startup import WarmUp, startup_profile
+
+import json
 import os
-from typing import List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from config import config
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from ingestion import IngestionWorker
+from metrics import http_request_seconds, metrics
 from pydantic import BaseModel
 from rag_system import RAGSystem
 
+startup_profile.record("import modules", startup_profile.elapsed(), start=0.0)
+
 # Initialize FastAPI app
 app = FastAPI(title="Course Materials RAG System", root_path="")
 
@@ -29,8 +40,110 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
-# Initialize RAG system
-rag_system = RAGSystem(config)
+# Initialize RAG system; models and indexes load in the background warm-up
+with startup_profile.phase("create rag system"):
+    rag_system = RAGSystem(config)
+warm_up = WarmUp(rag_system.warm_up_steps() if config.WARM_UP_ON_STARTUP else [])
+
+# Background ingestion worker; the startup job id gates readiness on an empty index
+ingestion_worker = IngestionWorker(rag_system)
+initial_ingest_job_id: Optional[str] = None
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Time each request; streamed bodies are timed up to the first byte"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template so path parameters don't explode the series
+    route = getattr(request.scope.get("route"), "path", None) or "other"
+    http_request_seconds.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        path=route,
+        status=str(response.status_code),
+    )
+    return response
+
+
+def _collect_component_metrics():
+    """Counters the components already keep, read at scrape time"""
+    caches = rag_system.get_cache_stats()
+    sessions = rag_system.session_manager.stats()
+    client = rag_system.ai_generator.get_client_stats()
+    job_counts = ingestion_worker.job_counts()
+
+    cache_samples = []
+    for cache, hit_keys in (
+        ("answers", ["hits"]),
+        ("embeddings", ["memory_hits", "disk_hits"]),
+    ):
+        stats = caches[cache]
+        if not stats.get("enabled", True):
+            continue
+        cache_samples.append(
+            ({"cache": cache, "result": "hit"}, sum(stats[k] for k in hit_keys))
+        )
+        cache_samples.append(({"cache": cache, "result": "miss"}, stats["misses"]))
+    prompt = caches["prompt"]
+
+    return [
+        (
+            "rag_cache_lookups_total",
+            "counter",
+            "Cache lookups by result",
+            cache_samples,
+        ),
+        (
+            "rag_prompt_tokens_total",
+            "counter",
+            "Anthropic input tokens by prompt cache outcome",
+            [
+                ({"cache": "read"}, prompt["cache_read_input_tokens"]),
+                ({"cache": "write"}, prompt["cache_creation_input_tokens"]),
+                ({"cache": "none"}, prompt["input_tokens"]),
+            ],
+        ),
+        (
+            "rag_sessions",
+            "gauge",
+            "Conversation sessions held in memory",
+            [({}, sessions["sessions"])],
+        ),
+        (
+            "rag_session_messages",
+            "gauge",
+            "Messages held across all sessions",
+            [({}, sessions["messages"])],
+        ),
+        (
+            "rag_sessions_removed_total",
+            "counter",
+            "Sessions removed from memory by reason",
+            [
+                ({"reason": "evicted"}, sessions["evictions"]),
+                ({"reason": "expired"}, sessions["expirations"]),
+            ],
+        ),
+        (
+            "rag_anthropic_calls_total",
+            "counter",
+            "Anthropic API calls, retries, hedges and final failures",
+            [
+                ({"event": event}, client[event])
+                for event in ("requests", "retries", "hedges", "failures")
+            ],
+        ),
+        (
+            "rag_ingest_jobs",
+            "gauge",
+            "Tracked ingestion jobs by status",
+            [({"status": status}, n) for status, n in sorted(job_counts.items())],
+        ),
+    ]
+
+
+metrics.register_collector(_collect_component_metrics)
 
 
 # Pydantic models for request/response
@@ -63,20 +176,70 @@ class ClearSessionRequest(BaseModel):
     session_id: str
 
 
+class IngestRequest(BaseModel):
+    """Request model for queueing a folder ingestion job"""
+
+    folder_path: str = "."  # Relative to the configured docs root
+    clear_existing: bool = False  # Rejected unless INGEST_ALLOW_CLEAR is set
+
+
+class IngestJobStatus(BaseModel):
+    """Response model for ingestion job status"""
+
+    job_id: str
+    folder_path: str
+    status: str
+    progress: float
+    files_total: int
+    files_done: int
+    courses_added: int
+    courses_updated: int
+    courses_removed: int
+    files_unchanged: int
+    chunks_added: int
+    chunks_per_sec: float
+    elapsed: float
+    errors: List[str]
+
+
 # API Endpoints
 
 
+def format_server_timing(timings: Dict[str, float]) -> str:
+    """Format per-stage seconds as a Server-Timing header value"""
+    return ", ".join(
+        f"{stage.replace(':', '-')};dur={seconds * 1000:.1f}"
+        for stage, seconds in timings.items()
+    )
+
+
+def format_prompt_tokens(sections: Dict[str, int]) -> str:
+    """Format estimated prompt tokens per section as a header value"""
+    return ", ".join(f"{section}={tokens}" for section, tokens in sections.items())
+
+
 @app.post("/api/query", response_model=QueryResponse)
-async def query_documents(request: QueryRequest):
+async def query_documents(request: QueryRequest, response: Response):
     """Process a query and return response with sources"""
     try:
         # Create session if not provided
         session_id = request.session_id
         if not session_id:
-            session_id = rag_system.session_manager.create_session()
+            session_id = await rag_system.acreate_session()
 
         # Process query using RAG system
-        answer, sources, source_links = rag_system.query(request.query, session_id)
+        answer, context = await rag_system.aquery_with_context(
+            request.query, session_id
+        )
+        sources, source_links = context.get_sources()
+
+        # Stage timings and prompt size for clients and load tests
+        if context.timings:
+            response.headers["Server-Timing"] = format_server_timing(context.timings)
+        if context.prompt_tokens:
+            response.headers["X-Prompt-Tokens"] = format_prompt_tokens(
+                context.prompt_tokens
+            )
 
         return QueryResponse(
             answer=answer,
@@ -88,11 +251,41 @@ async def query_documents(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a single Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/query/stream")
+async def stream_query(request: QueryRequest):
+    """Stream tool-round progress, sources and answer tokens as SSE"""
+    session_id = request.session_id
+    if not session_id:
+        session_id = await rag_system.acreate_session()
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield format_sse("session", {"session_id": session_id})
+        try:
+            async for event in rag_system.astream_query(request.query, session_id):
+                event_type = event.pop("type")
+                if event_type == "done":
+                    event["session_id"] = session_id
+                yield format_sse(event_type, event)
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/courses", response_model=CourseStats)
 async def get_course_stats():
     """Get course analytics and statistics"""
     try:
-        analytics = rag_system.get_course_analytics()
+        analytics = await run_in_threadpool(rag_system.get_course_analytics)
         return CourseStats(
             total_courses=analytics["total_courses"],
             course_titles=analytics["course_titles"],
@@ -101,33 +294,133 @@ async def get_course_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Get cache hit/miss statistics and the compressed index footprint"""
+    # Sizes the rescore vectors on disk
+    return await run_in_threadpool(rag_system.get_cache_stats)
+
+
+@app.get("/api/client/stats")
+async def get_client_stats():
+    """Get Anthropic request, retry and hedge counters"""
+    return rag_system.ai_generator.get_client_stats()
+
+
+@app.get("/api/sessions/stats")
+async def get_session_stats():
+    """Get session store occupancy, memory and eviction counters"""
+    # Takes the session lock and counts shared sessions in SQLite
+    return await run_in_threadpool(rag_system.session_manager.stats)
+
+
 @app.post("/api/clear-session")
 async def clear_session(request: ClearSessionRequest):
-    """Clear a conversation session and reset tool state"""
+    """Clear a conversation session"""
     try:
         rag_system.session_manager.clear_session(request.session_id)
-        rag_system.tool_manager.reset_sources()
         return {"status": "success", "message": "Session cleared successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _resolve_docs_folder(folder_path: str) -> str:
+    """Resolve a requested folder inside the docs root, rejecting escapes"""
+    root = os.path.realpath(config.DOCS_PATH)
+    folder = os.path.realpath(os.path.join(root, folder_path))
+    if os.path.commonpath([root, folder]) != root:
+        raise HTTPException(
+            status_code=403, detail="Folder must be inside the docs directory"
+        )
+    return folder
+
+
+@app.post("/api/ingest", response_model=IngestJobStatus, status_code=202)
+async def start_ingestion(request: IngestRequest):
+    """Queue a folder of course documents for background ingestion"""
+    if request.clear_existing and not config.INGEST_ALLOW_CLEAR:
+        raise HTTPException(
+            status_code=403, detail="Clearing the index is disabled on this server"
+        )
+    folder = _resolve_docs_folder(request.folder_path)
+    if not os.path.isdir(folder):
+        raise HTTPException(
+            status_code=400, detail=f"Folder {request.folder_path} does not exist"
+        )
+    job = ingestion_worker.submit(folder, request.clear_existing)
+    return IngestJobStatus(**job.to_dict())
+
+
+@app.get("/api/ingest/{job_id}", response_model=IngestJobStatus)
+async def get_ingestion_job(job_id: str):
+    """Get progress, throughput and errors of an ingestion job"""
+    job = ingestion_worker.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return IngestJobStatus(**job.to_dict())
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint with latency histograms and counters"""
+    # Collectors read session and cache stats that may touch SQLite
+    body = await run_in_threadpool(metrics.render)
+    return Response(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/startup")
+async def get_startup_profile():
+    """Get startup phase timings and the warm-up status"""
+    return {"profile": startup_profile.as_dict(), "warm_up": warm_up.to_dict()}
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: warmed up, with an index to answer course questions"""
+    initial_job = (
+        ingestion_worker.get_job(initial_ingest_job_id)
+        if initial_ingest_job_id
+        else None
+    )
+    initial_done = initial_job is None or initial_job.finished
+    course_count = await run_in_threadpool(rag_system.vector_store.get_course_count)
+    ready = warm_up.status == "completed" and (course_count > 0 or initial_done)
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "courses": course_count,
+        "initial_ingestion": initial_job.status if initial_job else None,
+        "warm_up": warm_up.status,
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=body)
+
+
 @app.on_event("startup")
 async def startup_event():
-    """Load initial documents on startup"""
-    docs_path = "../docs"
+    """Start the background workers and queue the initial documents"""
+    global initial_ingest_job_id
+    warm_up.start()
+    rag_system.session_manager.start_sweeper()
+    ingestion_worker.start()
+    docs_path = config.DOCS_PATH
     if os.path.exists(docs_path):
-        print("Loading initial documents...")
-        try:
-            courses, chunks = rag_system.add_course_folder(
-                docs_path, clear_existing=False
-            )
-            print(f"Loaded {courses} courses with {chunks} chunks")
-        except Exception as e:
-            print(f"Error loading documents: {e}")
+        print("Queueing initial documents for background ingestion...")
+        initial_ingest_job_id = ingestion_worker.submit(docs_path).job_id
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the ingestion worker, flush the session store and close clients"""
+    ingestion_worker.stop(timeout=5)
+    rag_system.session_manager.close(timeout=5)
+    await rag_system.ai_generator.aclose()
 
 
-import os
 from pathlib import Path
 
 from fastapi.responses import FileResponse
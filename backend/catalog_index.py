@@ -0,0 +1,153 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+def _normalize(text: str) -> str:
+    """Casefold and collapse whitespace"""
+    return " ".join(text.casefold().split())
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"\w+", text.casefold())
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class CourseCatalogIndex:
+    """
+    In-process index of course titles for resolving user-supplied names.
+
+    Resolution tries, in order: an exact casefolded title, titles containing
+    the name as a substring (narrowed with a trigram index), titles
+    containing every word of the name, and finally the nearest title
+    embedding. Only the last step needs the name to be embedded, and
+    ambiguous matches are ranked by embedding similarity when available.
+
+    Given the catalog metadata, it also keeps course metadata with decoded
+    lessons and a lesson table keyed by (course_title, lesson_number), so
+    links and outlines are dictionary lookups instead of catalog reads.
+    """
+
+    def __init__(
+        self,
+        titles: List[str],
+        embeddings: Optional[Any] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.titles = list(titles)
+        self._folded = [_normalize(title) for title in self.titles]
+        self._by_folded = {folded: t for folded, t in zip(self._folded, self.titles)}
+
+        self._trigram_index: Dict[str, Set[int]] = {}
+        self._token_index: Dict[str, Set[int]] = {}
+        for i, folded in enumerate(self._folded):
+            for trigram in _trigrams(folded):
+                self._trigram_index.setdefault(trigram, set()).add(i)
+            for token in _tokens(folded):
+                self._token_index.setdefault(token, set()).add(i)
+
+        # Row-normalized title embeddings, so a dot product is cosine similarity
+        self._matrix: Optional[np.ndarray] = None
+        if embeddings is not None and len(embeddings) == len(self.titles):
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            if matrix.ndim == 2 and len(matrix):
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                self._matrix = matrix / np.where(norms > 0, norms, 1.0)
+
+        self.courses: Dict[str, Dict[str, Any]] = {}
+        self.lessons: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        if metadatas is not None and len(metadatas) == len(self.titles):
+            for title, metadata in zip(self.titles, metadatas):
+                self._add_course(title, metadata or {})
+
+    def _add_course(self, title: str, metadata: Dict[str, Any]):
+        """Decode a catalog entry into the course and lesson tables"""
+        course = dict(metadata)
+        lessons = json.loads(course.pop("lessons_json", None) or "[]")
+        course["lessons"] = lessons
+        self.courses[title] = course
+        for lesson in lessons:
+            self.lessons[(title, lesson.get("lesson_number"))] = lesson
+
+    def course(self, title: str) -> Optional[Dict[str, Any]]:
+        """Catalog metadata of a course with its lessons decoded"""
+        return self.courses.get(title)
+
+    def lesson(self, title: str, lesson_number: int) -> Optional[Dict[str, Any]]:
+        """Lesson number, title and link of a course lesson"""
+        return self.lessons.get((title, lesson_number))
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def exact(self, name: str) -> Optional[str]:
+        """Title equal to the name ignoring case and spacing"""
+        return self._by_folded.get(_normalize(name))
+
+    def substring_matches(self, name: str) -> List[int]:
+        """Indices of titles containing the name"""
+        folded = _normalize(name)
+        if not folded:
+            return []
+        candidates: Any = range(len(self.titles))
+        if len(folded) >= 3:
+            sets = [self._trigram_index.get(t, set()) for t in _trigrams(folded)]
+            candidates = sorted(set.intersection(*sets))
+        return [i for i in candidates if folded in self._folded[i]]
+
+    def token_matches(self, name: str) -> List[int]:
+        """Indices of titles containing every word of the name"""
+        tokens = _tokens(name)
+        if not tokens:
+            return []
+        sets = [self._token_index.get(token, set()) for token in tokens]
+        return sorted(set.intersection(*sets))
+
+    def nearest(
+        self, embedding: Any, among: Optional[List[int]] = None
+    ) -> Optional[int]:
+        """Index of the title embedding most similar to the given one"""
+        if self._matrix is None:
+            return None
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        rows = np.asarray(among if among is not None else range(len(self.titles)))
+        scores = self._matrix[rows] @ query
+        return int(rows[int(np.argmax(scores))])
+
+    def resolve(self, name: str, embed: Callable[[str], Any]) -> Optional[str]:
+        """
+        Resolve a course name to a title.
+
+        Args:
+            name: Name as given by the user or model
+            embed: Embeds the name; only called when no lexical match decides
+
+        Returns:
+            The best matching title, or None if the index cannot decide
+        """
+        if not self.titles:
+            return None
+
+        title = self.exact(name)
+        if title:
+            return title
+
+        for matches in (self.substring_matches(name), self.token_matches(name)):
+            if len(matches) == 1:
+                return self.titles[matches[0]]
+            if matches:
+                best = self.nearest(embed(name), among=matches)
+                if best is None:
+                    best = min(matches, key=lambda i: len(self.titles[i]))
+                return self.titles[best]
+
+        best = self.nearest(embed(name))
+        return self.titles[best] if best is not None else None
@@ -0,0 +1,224 @@
+"""
+Recall, latency and memory of compressed embedding search.
+
+Embeds every chunk of the course documents with the configured model and
+compares each compression setting against exact float32 search: recall@k
+of the approximate ranking alone and after full-precision rescoring, mean
+query latency, and the net footprint: the compressed vectors held in
+memory plus the full-precision copy VectorStore keeps on disk to rescore
+against. Run it from backend/ so ../docs is found:
+
+    python compression_benchmark.py --output ../EMBEDDING_COMPRESSION_REPORT.md
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from query_fixtures import DEFAULT_QUERIES
+from vector_compression import CompressedVectorIndex, VectorCodec, rescore
+
+# (compression mode, PCA dimensions) pairs compared against float32
+DEFAULT_SETTINGS: List[Tuple[str, int]] = [
+    ("none", 0),
+    ("float16", 0),
+    ("int8", 0),
+    ("float16", 128),
+    ("int8", 128),
+    ("int8", 64),
+]
+
+
+@dataclass
+class BenchmarkRow:
+    """Measurements for one compression setting"""
+
+    mode: str
+    dimensions: int  # Stored dimensions after any PCA projection
+    memory_bytes: int  # Compressed vectors held in memory
+    rescore_bytes: int  # Full-precision copy rescored against, kept on disk
+    recall: float  # Recall@k of the compressed ranking alone
+    rescored_recall: float  # Recall@k after full-precision rescoring
+    latency_ms: float  # Mean compressed search time per query
+    rescored_latency_ms: float  # Mean search plus rescoring time per query
+
+
+def exact_top_k(embeddings: np.ndarray, query: Any, k: int) -> List[int]:
+    """Rows of the k most cosine-similar embeddings"""
+    scores = rescore(query, embeddings)
+    return [int(i) for i in np.argsort(-scores, kind="stable")[:k]]
+
+
+def evaluate(
+    embeddings: Any,
+    queries: Sequence[Any],
+    settings: Sequence[Tuple[str, int]] = tuple(DEFAULT_SETTINGS),
+    k: int = 5,
+    rescore_factor: int = 4,
+) -> List[BenchmarkRow]:
+    """
+    Measure each compression setting on one corpus.
+
+    Args:
+        embeddings: Full-precision chunk embeddings
+        queries: Query embeddings
+        settings: (mode, PCA dimensions) pairs to measure
+        k: Results per query compared with exact search
+        rescore_factor: Candidates rescored per result
+
+    Returns:
+        One BenchmarkRow per setting, in order
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    ids = [str(i) for i in range(len(matrix))]
+    truth = [set(exact_top_k(matrix, q, k)) for q in queries]
+
+    rows = []
+    for mode, dimensions in settings:
+        index = CompressedVectorIndex(VectorCodec(mode, dimensions).fit(matrix))
+        index.add(ids, matrix)
+        # Uncompressed full-dimension search needs no rescore copy, as in
+        # VectorStore where it leaves compression disabled
+        lossy = mode != "none" or index.codec.projected
+
+        hits, rescored_hits = 0, 0
+        latencies, rescored_latencies = [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            found = index.search(query, k)
+            latencies.append(time.perf_counter() - start)
+            hits += len(expected & {int(doc_id) for doc_id, _ in found})
+
+            start = time.perf_counter()
+            candidates = [int(i) for i, _ in index.search(query, k * rescore_factor)]
+            scores = rescore(query, matrix[candidates])
+            best = [candidates[i] for i in np.argsort(-scores, kind="stable")[:k]]
+            rescored_latencies.append(time.perf_counter() - start)
+            rescored_hits += len(expected & set(best))
+
+        total = max(1, sum(len(expected) for expected in truth))
+        rows.append(
+            BenchmarkRow(
+                mode=mode,
+                dimensions=index.stats()["dimensions"],
+                memory_bytes=index.memory_bytes(),
+                rescore_bytes=matrix.nbytes if lossy else 0,
+                recall=hits / total,
+                rescored_recall=rescored_hits / total,
+                latency_ms=statistics.fmean(latencies or [0.0]) * 1000,
+                rescored_latency_ms=statistics.fmean(rescored_latencies or [0.0])
+                * 1000,
+            )
+        )
+    return rows
+
+
+def format_report(
+    rows: List[BenchmarkRow], corpus: Dict[str, Any], k: int, rescore_factor: int
+) -> str:
+    """Markdown report of a benchmark run"""
+    baseline = corpus["chunks"] * corpus["dimensions"] * 4  # float32 vectors
+    lines = [
+        "# Embedding compression trade-off",
+        "",
+        f"Corpus: {corpus['documents']} documents, {corpus['chunks']} chunks, "
+        f"{corpus['queries']} queries, model `{corpus['model']}` "
+        f"({corpus['dimensions']} dimensions).",
+        f"Recall@{k} is measured against exact float32 cosine search; "
+        f"rescoring reranks {k * rescore_factor} compressed candidates "
+        "with the full-precision vectors.",
+        "Memory is the compressed index; the rescore copy is the float32 "
+        "vectors kept memory-mapped on disk for rescoring. The total of both "
+        "is compared with plain float32 vectors.",
+        "",
+        "| Mode | Dims | Memory | Rescore copy | Total | vs float32 | Recall "
+        "| Rescored recall | Latency (ms) | Rescored latency (ms) |",
+        "|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        total = row.memory_bytes + row.rescore_bytes
+        ratio = total / baseline if baseline else 0.0
+        lines.append(
+            f"| {row.mode} | {row.dimensions} | {row.memory_bytes / 1024:.1f} KiB "
+            f"| {row.rescore_bytes / 1024:.1f} KiB | {total / 1024:.1f} KiB "
+            f"| {ratio:.2f}x | {row.recall:.3f} | {row.rescored_recall:.3f} "
+            f"| {row.latency_ms:.3f} | {row.rescored_latency_ms:.3f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _parse_setting(spec: str) -> Tuple[str, int]:
+    """Parse "int8" or "int8:128" into (mode, PCA dimensions)"""
+    mode, _, dimensions = spec.partition(":")
+    return mode, int(dimensions or 0)
+
+
+def main():
+    from config import config
+    from document_processor import DocumentProcessor
+    from sentence_transformers import SentenceTransformer
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", default="../docs")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument(
+        "--setting",
+        action="append",
+        type=_parse_setting,
+        help='Mode with optional PCA dimensions, e.g. "int8:128" (repeatable)',
+    )
+    parser.add_argument("--output", help="Write the markdown report here")
+    args = parser.parse_args()
+
+    processor = DocumentProcessor(config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+    paths = sorted(
+        path
+        for path in glob.glob(os.path.join(args.docs, "*"))
+        if path.lower().endswith((".pdf", ".docx", ".txt"))
+    )
+    texts: List[str] = []
+    queries: List[str] = list(DEFAULT_QUERIES)
+    for path in paths:
+        course, chunks = processor.process_course_document(path)
+        texts.extend(chunk.content for chunk in chunks)
+        # Lesson titles make realistic, course-specific questions
+        queries.extend(lesson.title for lesson in course.lessons)
+
+    model = SentenceTransformer(config.EMBEDDING_MODEL)
+    embeddings = model.encode(texts, batch_size=64)
+    query_embeddings = model.encode(queries)
+
+    settings: Optional[List[Tuple[str, int]]] = args.setting
+    rows = evaluate(
+        embeddings,
+        query_embeddings,
+        settings or DEFAULT_SETTINGS,
+        k=args.k,
+        rescore_factor=args.rescore_factor,
+    )
+    report = format_report(
+        rows,
+        {
+            "documents": len(paths),
+            "chunks": len(texts),
+            "queries": len(queries),
+            "model": config.EMBEDDING_MODEL,
+            "dimensions": embeddings.shape[1],
+        },
+        args.k,
+        args.rescore_factor,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,20 @@ class Config:
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
 
+    # Anthropic HTTP client settings
+    ANTHROPIC_MAX_CONNECTIONS: int = 32  # Pooled connections per client
+    ANTHROPIC_KEEPALIVE_CONNECTIONS: int = 16  # Idle connections kept alive
+    ANTHROPIC_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept
+    ANTHROPIC_CONNECT_TIMEOUT: float = 5.0  # Seconds to open a connection
+    ANTHROPIC_TIMEOUT: float = 60.0  # Seconds one API round may take
+    ANTHROPIC_MAX_RETRIES: int = 3  # Retries on connection errors, 429 and 5xx
+    ANTHROPIC_BACKOFF_BASE: float = 0.5  # Max wait before the first retry
+    ANTHROPIC_BACKOFF_MAX: float = 8.0  # Max wait before any retry
+    ANTHROPIC_HEDGE_PERCENTILE: float = 0.0  # Hedge after this latency pct (0: off)
+
+    # Vector storage backend: "chroma", or "numpy" for a memory-mapped flat index
+    VECTOR_BACKEND: str = "chroma"
+
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
 
@@ -22,7 +36,53 @@ class Config:
     CHUNK_SIZE: int = 800  # Size of text chunks for vector storage
     CHUNK_OVERLAP: int = 100  # Characters to overlap between chunks
     MAX_RESULTS: int = 5  # Maximum search results to return
+    SEARCH_MODE: str = "vector"  # "vector", "hybrid" (vector + BM25) or "lexical"
+    VECTOR_COMPRESSION: str = "none"  # "none", "float16" or "int8" candidate index
+    VECTOR_PCA_DIMENSIONS: int = 0  # PCA dimensions of candidate vectors (0: off)
+    VECTOR_RESCORE_FACTOR: int = 4  # Candidates rescored at full precision per result
     MAX_HISTORY: int = 2  # Number of conversation messages to remember
+    CONTEXT_TOKEN_BUDGET: int = 6000  # Prompt tokens for system, tools and history
+    TOOL_RESULT_TOKEN_RESERVE: int = 2000  # Budget tokens held back for tool results
+    SESSION_COMPACTION: bool = False  # Summarize turns that leave the history window
+    SESSION_SUMMARY_TOKENS: int = 300  # Max tokens of a session's running summary
+
+    # Session store settings
+    SESSION_MAX_COUNT: int = 10000  # Sessions kept before evicting the least recent
+    SESSION_TTL: float = 3600.0  # Seconds a session may sit idle (0: never expire)
+    SESSION_SWEEP_INTERVAL: float = 60.0  # Seconds between expiry sweeps (0: off)
+    SESSION_BACKEND: str = "memory"  # "memory", or "sqlite" to share across workers
+    SESSION_DB_PATH: str = "./session_db/sessions.db"  # SQLite session database
+    SESSION_CACHE_TTL: float = 60.0  # Seconds a shared session is served from memory
+    SESSION_WRITE_INTERVAL: float = 0.05  # Seconds between batched session commits
+
+    # Concurrency settings
+    QUERY_WORKERS: int = 8  # Threads for blocking vector work in async queries
+    TOOL_TIMEOUT: float = 20.0  # Seconds a single tool call may run
+
+    # Startup: load the embedding model and indexes in the background, and
+    # report not ready until done
+    WARM_UP_ON_STARTUP: bool = True
+
+    # Prompt caching: static system prompt and tools, history as messages
+    PROMPT_CACHING: bool = False  # Opt in: cache reads bill differently
+
+    # Ingestion pipeline settings
+    INGEST_PARSE_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)  # Parse processes
+    INGEST_EMBED_BATCH_SIZE: int = 64  # Chunks embedded per model call
+    INGEST_QUEUE_SIZE: int = 8  # Documents buffered between pipeline stages
+    CONTENT_WRITE_BATCH_SIZE: int = 256  # Chunks per vector store upsert
+    DOCS_PATH: str = "../docs"  # Root of the folders /api/ingest may index
+    INGEST_ALLOW_CLEAR: bool = False  # Let /api/ingest wipe the index first
+
+    # Answer cache settings
+    ANSWER_CACHE_SIZE: int = 1024  # Cached answers kept (0 disables the cache)
+    ANSWER_CACHE_TTL: float = 3600.0  # Seconds before a cached answer expires
+    ANSWER_CACHE_SIMILARITY: float = 0.95  # Min cosine similarity for a hit
+
+    # Embedding cache settings
+    EMBEDDING_CACHE_SIZE: int = 2048  # Query embeddings kept in memory
+    EMBEDDING_CACHE_DISK: bool = True  # Persist query embeddings next to the index
+    EMBEDDING_CACHE_DISK_ENTRIES: int = 100000  # Rows kept on disk, least recent pruned
 
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
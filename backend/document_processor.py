@@ -105,8 +105,21 @@ class DocumentProcessor:
         Following lines: Lesson markers and content
         """
         content = self.read_file(file_path)
-        filename = os.path.basename(file_path)
+        return self.process_course_text(content, os.path.basename(file_path))
 
+    def process_course_text(
+        self, content: str, filename: str
+    ) -> Tuple[Course, List[CourseChunk]]:
+        """
+        Parse and chunk course document text that has already been read.
+
+        Args:
+            content: Full document text (same format as process_course_document)
+            filename: File name used as the title fallback
+
+        Returns:
+            Tuple of (Course, list of CourseChunk)
+        """
         lines = content.strip().split("\n")
 
         # Extract course metadata from first three lines
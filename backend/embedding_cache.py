@@ -0,0 +1,233 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from metrics import embedding_seconds
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache around an embedding function.
+
+    Embeddings are looked up in an in-memory LRU first, then in an optional
+    SQLite store on disk, and only the remaining texts are sent to the model
+    in a single batch, each distinct text once. Keys combine the model name
+    with a hash of the text, so switching models never serves stale vectors.
+
+    The disk tier holds at most max_disk_entries rows. Rows record when
+    they were last used, and once the store grows past the cap the least
+    recently used are pruned down to DISK_PRUNE_RATIO of it, so the rows
+    are only recounted once per tenth of the cap written.
+    """
+
+    # Fraction of max_disk_entries kept after pruning the disk tier
+    DISK_PRUNE_RATIO = 0.9
+
+    def __init__(
+        self,
+        embedding_function: Callable[[List[str]], List[Any]],
+        model_name: str,
+        max_entries: int = 2048,
+        disk_path: Optional[str] = None,
+        max_disk_entries: int = 100000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.embedding_function = embedding_function
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+        self.clock = clock
+        self._disk_rows = 0  # Upper bound on rows stored, recounted when pruning
+        self.disk_evictions = 0
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_path:
+            self._open_disk(disk_path)
+
+    def _open_disk(self, disk_path: str):
+        """Open the on-disk tier; failures leave the cache memory-only"""
+        try:
+            directory = os.path.dirname(disk_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, "
+                "last_used REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [
+                row[1] for row in self._disk.execute("PRAGMA table_info(embeddings)")
+            ]
+            if "last_used" not in columns:
+                # Stores created before the disk tier was bounded
+                self._disk.execute(
+                    "ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0"
+                )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used "
+                "ON embeddings (last_used)"
+            )
+            self._disk.commit()
+            (self._disk_rows,) = self._disk.execute(
+                "SELECT count(*) FROM embeddings"
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Embedding disk cache unavailable at {disk_path}: {e}")
+            self._disk = None
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under this cache's model"""
+        digest = hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+        return f"{self.model_name}:{digest}"
+
+    def embed(self, texts: List[str]) -> List[Any]:
+        """Embed texts, computing only the ones not cached in either tier"""
+        keys = [self.key(text) for text in texts]
+        results: List[Any] = [None] * len(texts)
+
+        # Positions of each distinct text not found yet, in first-seen order
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing and self._disk is not None:
+            found = self._read_disk(list(missing))
+            with self._lock:
+                for key, vector in found.items():
+                    positions = missing.pop(key)
+                    for i in positions:
+                        results[i] = vector
+                    self.disk_hits += len(positions)
+                    self._remember(key, vector)
+
+        if missing:
+            with embedding_seconds.time(kind="query"):
+                computed = self.embedding_function(
+                    [texts[positions[0]] for positions in missing.values()]
+                )
+            with self._lock:
+                for (key, positions), vector in zip(missing.items(), computed):
+                    for i in positions:
+                        results[i] = vector
+                    # Repeats within the batch are served by the same call
+                    self.misses += 1
+                    self.memory_hits += len(positions) - 1
+                    self._remember(key, vector)
+            if self._disk is not None:
+                self._write_disk(dict(zip(missing, computed)))
+
+        return results
+
+    def _remember(self, key: str, vector: Any):
+        """Add to the memory tier; caller holds the lock"""
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        placeholders = ",".join("?" * len(keys))
+        try:
+            with self._disk_lock:
+                rows = self._disk.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    keys,
+                ).fetchall()
+                if rows:
+                    self._disk.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                        [(self.clock(), key) for key, _ in rows],
+                    )
+                    self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"Error reading embedding cache: {e}")
+            return {}
+        return {key: np.frombuffer(blob, dtype=np.float32) for key, blob in rows}
+
+    def _write_disk(self, vectors: Dict[str, Any]):
+        now = self.clock()
+        rows = [
+            (key, self.model_name, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in vectors.items()
+        ]
+        try:
+            with self._disk_lock:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._disk_rows += len(rows)
+                if self._disk_rows > self.max_disk_entries:
+                    self._prune_disk()
+                self._disk.commit()
+        except sqlite3.Error as e:
+            print(f"Error writing embedding cache: {e}")
+
+    def _prune_disk(self):
+        """Delete the least recently used rows; caller holds the disk lock"""
+        # Other workers sharing the file write too, so count before pruning
+        (count,) = self._disk.execute("SELECT count(*) FROM embeddings").fetchone()
+        keep = int(self.max_disk_entries * self.DISK_PRUNE_RATIO)
+        if count > self.max_disk_entries:
+            self._disk.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (count - keep,),
+            )
+            self.disk_evictions += count - keep
+            count = keep
+        self._disk_rows = count
+
+    def clear(self):
+        """Drop every cached embedding in both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM embeddings")
+                self._disk.commit()
+                self._disk_rows = 0
+
+    def close(self):
+        """Close the on-disk tier"""
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.close()
+            self._disk = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per tier"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "disk_enabled": self._disk is not None,
+                "disk_evictions": self.disk_evictions,
+            }
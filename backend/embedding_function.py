@@ -0,0 +1,90 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from startup import startup_profile
+
+
+class LazySentenceTransformerFunction:
+    """
+    Sentence-transformer embedding function that loads its model on first use.
+
+    Chroma's SentenceTransformerEmbeddingFunction imports
+    sentence_transformers and torch and loads the model as soon as it is
+    constructed. This wrapper reports the same name and config to Chroma,
+    so collections persisted with it open unchanged, and builds the real
+    function with factory the first time text is embedded or load() is
+    called. Chroma rebuilds persisted functions from its own registry by
+    name, so this class is only ever constructed with a factory.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        device: str = "cpu",
+        normalize_embeddings: bool = False,
+        *,
+        factory: Callable[..., Callable],
+        **kwargs: Any,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+        self.kwargs = kwargs
+        self._factory = factory
+        self._function: Optional[Callable[[List[str]], List[Any]]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._function is not None
+
+    def load(self) -> Callable[[List[str]], List[Any]]:
+        """Build the underlying embedding function (and model) once"""
+        with self._lock:
+            if self._function is None:
+                with startup_profile.phase(f"load embedding model {self.model_name}"):
+                    self._function = self._factory(
+                        model_name=self.model_name,
+                        device=self.device,
+                        normalize_embeddings=self.normalize_embeddings,
+                        **self.kwargs,
+                    )
+            return self._function
+
+    def __call__(self, input: List[str]) -> List[Any]:
+        return self.load()(input)
+
+    def embed_query(self, input: List[str]) -> List[Any]:
+        return self(input)
+
+    # Chroma embedding function interface, mirroring the sentence-transformer one
+
+    @staticmethod
+    def name() -> str:
+        return "sentence_transformer"
+
+    def is_legacy(self) -> bool:
+        return False
+
+    def default_space(self) -> str:
+        return "cosine"
+
+    def supported_spaces(self) -> List[str]:
+        return ["cosine", "l2", "ip"]
+
+    def get_config(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "device": self.device,
+            "normalize_embeddings": self.normalize_embeddings,
+            "kwargs": self.kwargs,
+        }
+
+    def validate_config_update(
+        self, old_config: Dict[str, Any], new_config: Dict[str, Any]
+    ):
+        return
+
+    @staticmethod
+    def validate_config(config: Dict[str, Any]):
+        return
@@ -0,0 +1,299 @@
+"""
+Local stand-in for the Anthropic Messages API, for offline load testing.
+
+Run it and point the RAG app at it through the SDK's ANTHROPIC_BASE_URL:
+
+    python fake_anthropic.py --port 8765 --latency lognormal:0.8:0.5
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 uvicorn app:app --port 8000
+
+Only non-streaming messages.create calls are emulated.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Tool calls requested per round; rounds beyond the script answer in text.
+# "{query}" and "{course}" in input values become the user's question and
+# the configured course name.
+TOOL_SCRIPTS: Dict[str, List[List[Tuple[str, Dict[str, Any]]]]] = {
+    "direct": [],
+    "search": [[("search_course_content", {"query": "{query}"})]],
+    "search_outline": [
+        [
+            ("search_course_content", {"query": "{query}"}),
+            ("get_course_outline", {"course_name": "{course}"}),
+        ]
+    ],
+    "two_rounds": [
+        [("get_course_outline", {"course_name": "{course}"})],
+        [("search_course_content", {"query": "{query}"})],
+    ],
+}
+
+ERROR_TYPES = {
+    429: "rate_limit_error",
+    500: "api_error",
+    529: "overloaded_error",
+}
+
+
+@dataclass
+class LatencyModel:
+    """Distribution of simulated response times in seconds"""
+
+    kind: str = "fixed"  # "fixed", "uniform" or "lognormal"
+    a: float = 0.0  # fixed value, uniform low, or lognormal median
+    b: float = 0.0  # uniform high, or lognormal sigma
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse "fixed:0.5", "uniform:0.2:1.0" or "lognormal:0.8:0.5" """
+        kind, *values = spec.split(":")
+        numbers = [float(v) for v in values] + [0.0, 0.0]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return cls(kind, numbers[0], numbers[1])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return self.a * rng.lognormvariate(0.0, self.b) if self.a > 0 else 0.0
+        return self.a
+
+
+@dataclass
+class FakeAnthropicSettings:
+    """Behaviour of the simulated backend"""
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    script: str = "search"  # Key of TOOL_SCRIPTS
+    course_name: str = "Introduction"  # Substituted for "{course}"
+    error_rate: float = 0.0  # Share of requests answered with error_status
+    error_status: int = 529
+    retry_after: Optional[float] = None  # Retry-After header on injected errors
+    seed: Optional[int] = None
+
+
+def _estimate_tokens(payload: Any) -> int:
+    """Rough token count of a JSON payload (4 characters per token)"""
+    return max(1, len(json.dumps(payload, default=str)) // 4)
+
+
+def _last_user_text(messages: List[Dict[str, Any]]) -> str:
+    """Text of the latest user turn that is not a tool result"""
+    for message in reversed(messages):
+        if message.get("role") != "user":
+            continue
+        content = message.get("content")
+        if isinstance(content, str):
+            return content
+        texts = [b.get("text", "") for b in content if b.get("type") == "text"]
+        if texts:
+            return " ".join(texts)
+    return ""
+
+
+def _tool_rounds_done(messages: List[Dict[str, Any]]) -> int:
+    """Assistant tool turns since the latest user question"""
+    rounds = 0
+    for message in reversed(messages):
+        content = message.get("content")
+        if message.get("role") == "assistant":
+            rounds += 1
+        elif isinstance(content, str) or not any(
+            b.get("type") == "tool_result" for b in content
+        ):
+            break
+    return rounds
+
+
+class FakeAnthropic:
+    """
+    Simulated Messages API with scripted tool use and injected errors.
+
+    Each request sleeps for a sample of the latency model, then either
+    fails with an Anthropic-style error body or answers with the tool
+    calls the script prescribes for the current round. The prompt cache is
+    emulated for requests marking cache_control: a repeated system prompt
+    and tool prefix is reported as cache_read_input_tokens.
+    """
+
+    def __init__(self, settings: Optional[FakeAnthropicSettings] = None):
+        self.settings = settings or FakeAnthropicSettings()
+        if self.settings.script not in TOOL_SCRIPTS:
+            raise ValueError(f"Unknown tool script: {self.settings.script}")
+        self._rng = random.Random(self.settings.seed)
+        self._ids = itertools.count(1)
+        self._cached_prefixes: set = set()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors_injected = 0
+        self.tool_calls = 0
+
+    def respond(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], float]:
+        """Build (status, JSON body, delay seconds) for one request"""
+        with self._lock:
+            self.requests += 1
+            delay = self.settings.latency.sample(self._rng)
+            fail = self._rng.random() < self.settings.error_rate
+            if fail:
+                self.errors_injected += 1
+            message_id = next(self._ids)
+
+        if body.get("stream"):
+            return (
+                400,
+                self._error("invalid_request_error", "Streaming not supported"),
+                0.0,
+            )
+        if fail:
+            status = self.settings.error_status
+            error_type = ERROR_TYPES.get(status, "api_error")
+            return status, self._error(error_type, "Injected error"), delay
+
+        messages = body.get("messages", [])
+        script = TOOL_SCRIPTS[self.settings.script]
+        round_index = _tool_rounds_done(messages)
+        query = _last_user_text(messages)
+
+        if body.get("tools") and round_index < len(script):
+            content = []
+            for i, (name, template) in enumerate(script[round_index]):
+                tool_input = {
+                    key: value.format(query=query, course=self.settings.course_name)
+                    for key, value in template.items()
+                }
+                content.append(
+                    {
+                        "type": "tool_use",
+                        "id": f"toolu_fake_{message_id}_{i}",
+                        "name": name,
+                        "input": tool_input,
+                    }
+                )
+            with self._lock:
+                self.tool_calls += len(content)
+            stop_reason = "tool_use"
+        else:
+            answer = f"Simulated answer to: {query[:200]}"
+            content = [{"type": "text", "text": answer}]
+            stop_reason = "end_turn"
+
+        return (
+            200,
+            {
+                "id": f"msg_fake_{message_id}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "fake"),
+                "content": content,
+                "stop_reason": stop_reason,
+                "stop_sequence": None,
+                "usage": {
+                    **self._usage(body),
+                    "output_tokens": _estimate_tokens(content),
+                },
+            },
+            delay,
+        )
+
+    def _usage(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """Input token counts, splitting off an emulated cached prefix"""
+        total = _estimate_tokens(
+            [body.get("system"), body.get("tools"), body.get("messages")]
+        )
+        prefix = [body.get("system"), body.get("tools")]
+        if "cache_control" not in json.dumps(prefix, default=str):
+            return {
+                "input_tokens": total,
+                "cache_read_input_tokens": 0,
+                "cache_creation_input_tokens": 0,
+            }
+
+        prefix_tokens = min(total, _estimate_tokens(prefix))
+        key = hashlib.sha256(json.dumps(prefix, default=str).encode()).hexdigest()
+        with self._lock:
+            hit = key in self._cached_prefixes
+            self._cached_prefixes.add(key)
+        return {
+            "input_tokens": total - prefix_tokens,
+            "cache_read_input_tokens": prefix_tokens if hit else 0,
+            "cache_creation_input_tokens": 0 if hit else prefix_tokens,
+        }
+
+    @staticmethod
+    def _error(error_type: str, message: str) -> Dict[str, Any]:
+        return {"type": "error", "error": {"type": error_type, "message": message}}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors_injected": self.errors_injected,
+                "tool_calls": self.tool_calls,
+            }
+
+
+def create_app(fake: Optional[FakeAnthropic] = None) -> FastAPI:
+    """FastAPI app serving POST /v1/messages and GET /stats"""
+    fake = fake or FakeAnthropic()
+    app = FastAPI(title="Fake Anthropic API")
+    app.state.fake = fake
+
+    @app.post("/v1/messages")
+    async def create_message(request: Request):
+        status, body, delay = fake.respond(await request.json())
+        if delay > 0:
+            await asyncio.sleep(delay)
+        headers = {"request-id": body.get("id", "req_fake_error")}
+        if status != 200 and fake.settings.retry_after is not None:
+            headers["retry-after"] = str(fake.settings.retry_after)
+        return JSONResponse(body, status_code=status, headers=headers)
+
+    @app.get("/stats")
+    async def stats():
+        return fake.stats()
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:0.8:0.5")
+    parser.add_argument("--script", default="search", choices=sorted(TOOL_SCRIPTS))
+    parser.add_argument("--course-name", default="Introduction")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=529)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = FakeAnthropicSettings(
+        latency=LatencyModel.parse(args.latency),
+        script=args.script,
+        course_name=args.course_name,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(FakeAnthropic(settings)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class IngestionJob:
+    """State and progress of one background folder ingestion"""
+
+    job_id: str
+    folder_path: str
+    clear_existing: bool = False
+    status: str = "queued"  # queued, running, completed or failed
+    files_total: int = 0
+    files_done: int = 0
+    courses_added: int = 0
+    courses_updated: int = 0
+    courses_removed: int = 0
+    files_unchanged: int = 0
+    chunks_added: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has stopped running"""
+        return self.status in ("completed", "failed")
+
+    @property
+    def progress(self) -> float:
+        """Fraction of files processed, between 0 and 1"""
+        if self.files_total == 0:
+            return 1.0 if self.finished else 0.0
+        return self.files_done / self.files_total
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running so far (or in total once finished)"""
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return end - self.started_at
+
+    @property
+    def chunks_per_sec(self) -> float:
+        """Chunk ingestion throughput of this job"""
+        elapsed = self.elapsed
+        return self.chunks_added / elapsed if elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the job for the API"""
+        return {
+            "job_id": self.job_id,
+            "folder_path": self.folder_path,
+            "status": self.status,
+            "progress": self.progress,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "courses_added": self.courses_added,
+            "courses_updated": self.courses_updated,
+            "courses_removed": self.courses_removed,
+            "files_unchanged": self.files_unchanged,
+            "chunks_added": self.chunks_added,
+            "chunks_per_sec": self.chunks_per_sec,
+            "elapsed": self.elapsed,
+            "errors": list(self.errors),
+        }
+
+
+class IngestionWorker:
+    """
+    Runs folder ingestion jobs one at a time on a background thread.
+
+    Jobs are queued by submit() and processed with
+    RAGSystem.add_course_folder, whose progress events update the job, so
+    the API can keep serving queries while new material is indexed.
+    """
+
+    def __init__(self, rag_system, max_finished_jobs: int = 100):
+        self.rag_system = rag_system
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[IngestionJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker thread if it is not already running"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="ingestion-worker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the worker after the job in progress finishes"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, folder_path: str, clear_existing: bool = False) -> IngestionJob:
+        """Queue a folder for ingestion and return its job"""
+        job = IngestionJob(
+            job_id=uuid.uuid4().hex,
+            folder_path=folder_path,
+            clear_existing=clear_existing,
+        )
+        with self._lock:
+            self.jobs[job.job_id] = job
+            self._prune_finished_jobs()
+        self._queue.put(job)
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """Look up a job by id"""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def job_counts(self) -> Dict[str, int]:
+        """Number of tracked jobs per status"""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> bool:
+        """Block until a job finishes; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job is None or job.finished:
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def _prune_finished_jobs(self):
+        """Drop the oldest finished jobs beyond max_finished_jobs"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[job_id]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            self._run_job(job)
+
+    def _run_job(self, job: IngestionJob):
+        job.status = "running"
+        job.started_at = time.time()
+
+        def on_progress(event: Dict[str, Any]):
+            if event["event"] == "start":
+                job.files_total = event["files_total"]
+                return
+            if event["event"] == "removed":
+                job.courses_removed += 1
+                return
+            job.files_done += 1
+            job.chunks_added += event.get("chunks", 0)
+            if event["status"] == "added":
+                job.courses_added += 1
+            elif event["status"] == "updated":
+                job.courses_updated += 1
+            elif event["status"] == "unchanged":
+                job.files_unchanged += 1
+            elif event["status"] == "error":
+                job.errors.append(f"{event['file']}: {event.get('error')}")
+
+        try:
+            self.rag_system.add_course_folder(
+                job.folder_path,
+                clear_existing=job.clear_existing,
+                on_progress=on_progress,
+            )
+            job.status = "completed"
+        except Exception as e:
+            job.errors.append(str(e))
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ManifestEntry:
+    """What was indexed from one source document"""
+
+    path: str  # Absolute path of the document
+    size: int  # File size in bytes when indexed
+    mtime: float  # Modification time when indexed
+    content_hash: str  # SHA-256 of the document text
+    course_title: str  # Course the document produced
+    chunk_ids: List[str] = field(default_factory=list)  # Content chunk ids written
+
+    def matches_stat(self, size: int, mtime: float) -> bool:
+        """Whether the file looks unchanged without reading it"""
+        return self.size == size and self.mtime == mtime
+
+
+def content_hash(text: str) -> str:
+    """Hash document text for change detection"""
+    return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class IngestionManifest:
+    """
+    Persistent record of indexed documents, stored as JSON next to the index.
+
+    Lets folder ingestion skip unchanged files without parsing them, replace
+    the chunks of edited files, and delete courses whose files were removed.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def key(file_path: str) -> str:
+        """Normalize a document path into a manifest key"""
+        return os.path.abspath(file_path)
+
+    def load(self):
+        """Load entries from disk; a missing or unreadable file means empty"""
+        with self._lock:
+            self.entries = {}
+            self._dirty = False
+            if not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for path, entry in data.get("entries", {}).items():
+                    self.entries[path] = ManifestEntry(**entry)
+            except (OSError, ValueError, TypeError) as e:
+                print(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+                self.entries = {}
+
+    def save(self):
+        """Atomically write entries to disk if they changed since the last save"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            data = {
+                "version": self.VERSION,
+                "entries": {path: asdict(e) for path, e in self.entries.items()},
+            }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, file_path: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            return self.entries.get(self.key(file_path))
+
+    def set(self, entry: ManifestEntry):
+        with self._lock:
+            self.entries[self.key(entry.path)] = entry
+            self._dirty = True
+
+    def remove(self, file_path: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            entry = self.entries.pop(self.key(file_path), None)
+            self._dirty = self._dirty or entry is not None
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._dirty = self._dirty or bool(self.entries)
+            self.entries = {}
+
+    def owner_of(self, course_title: str) -> Optional[str]:
+        """Path of the document that produced a course, if tracked"""
+        with self._lock:
+            for path, entry in self.entries.items():
+                if entry.course_title == course_title:
+                    return path
+        return None
+
+    def entries_in(self, folder_path: str) -> List[ManifestEntry]:
+        """Entries for documents directly inside a folder"""
+        folder = self.key(folder_path)
+        with self._lock:
+            return [
+                entry
+                for path, entry in self.entries.items()
+                if os.path.dirname(path) == folder
+            ]
@@ -0,0 +1,406 @@
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from document_processor import DocumentProcessor
+from ingestion_manifest import IngestionManifest, ManifestEntry, content_hash
+from models import Course, CourseChunk
+
+# Document processor owned by each parse worker process
+_worker_processor: Optional[DocumentProcessor] = None
+
+
+def _init_parse_worker(chunk_size: int, chunk_overlap: int):
+    """Create the per-process DocumentProcessor"""
+    global _worker_processor
+    _worker_processor = DocumentProcessor(chunk_size, chunk_overlap)
+
+
+def _parse_in_worker(content: str, filename: str) -> Tuple[Course, List[CourseChunk]]:
+    """Parse and chunk a document inside a parse worker process"""
+    return _worker_processor.process_course_text(content, filename)
+
+
+@dataclass
+class PipelineItem:
+    """A document moving through the ingestion stages"""
+
+    file_path: str
+    content: Optional[str] = None
+    course: Optional[Course] = None
+    chunks: List[CourseChunk] = field(default_factory=list)
+    embeddings: Optional[List[Any]] = None
+    # What the write stage should do: add, update, adopt, skip or unchanged
+    action: Optional[str] = None
+    error: Optional[str] = None
+    size: int = 0
+    mtime: float = 0.0
+    content_hash: str = ""
+    previous: Optional[ManifestEntry] = None  # Manifest entry from the last run
+
+    @property
+    def file_name(self) -> str:
+        return os.path.basename(self.file_path)
+
+
+# Marks the end of a stage's output
+_DONE = None
+
+
+class IngestionPipeline:
+    """
+    Staged document ingestion: read -> parse/chunk -> embed -> write.
+
+    Each stage runs on its own thread and hands documents to the next one
+    through a bounded queue, so reading, parsing, embedding and writing of
+    different documents overlap while memory stays bounded. Parsing and
+    chunking run in a process pool (parse_workers > 0) to use multiple
+    cores; embeddings are computed in batches of embed_batch_size and
+    handed to the vector store with the chunks.
+
+    With a manifest, files whose size and mtime are unchanged are skipped
+    without being read, files whose content hash is unchanged are skipped
+    without being parsed, and edited files replace their previous chunks.
+    """
+
+    def __init__(
+        self,
+        document_processor: DocumentProcessor,
+        vector_store,
+        chunk_size: int,
+        chunk_overlap: int,
+        parse_workers: int = 0,
+        embed_batch_size: int = 64,
+        queue_size: int = 8,
+        manifest: Optional[IngestionManifest] = None,
+    ):
+        self.document_processor = document_processor
+        self.vector_store = vector_store
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.parse_workers = parse_workers
+        self.embed_batch_size = embed_batch_size
+        self.queue_size = queue_size
+        self.manifest = manifest
+
+    def run(
+        self,
+        file_paths: List[str],
+        existing_titles: Set[str],
+        report: Callable[[Dict[str, Any]], None],
+    ) -> Tuple[int, int]:
+        """
+        Ingest documents, skipping courses whose title is already indexed.
+
+        Args:
+            file_paths: Documents to ingest, in priority order
+            existing_titles: Course titles already in the store (updated in place)
+            report: Receives one "file" progress event per document
+
+        Returns:
+            Tuple of (courses added or updated, chunks written)
+        """
+        read_q: "queue.Queue[Optional[PipelineItem]]" = queue.Queue(self.queue_size)
+        parsed_q: "queue.Queue[Optional[PipelineItem]]" = queue.Queue(self.queue_size)
+        embedded_q: "queue.Queue[Optional[PipelineItem]]" = queue.Queue(self.queue_size)
+        stop = threading.Event()
+
+        pool = self._create_pool(len(file_paths))
+        stages = [
+            threading.Thread(
+                target=self._guard,
+                args=(self._read_stage, stop, embedded_q, file_paths, read_q),
+                name="ingest-read",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._guard,
+                args=(self._parse_stage, stop, embedded_q, read_q, parsed_q, pool),
+                name="ingest-parse",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._guard,
+                args=(
+                    self._embed_stage,
+                    stop,
+                    embedded_q,
+                    parsed_q,
+                    embedded_q,
+                    existing_titles,
+                ),
+                name="ingest-embed",
+                daemon=True,
+            ),
+        ]
+        for stage in stages:
+            stage.start()
+
+        try:
+            return self._write_stage(embedded_q, report)
+        finally:
+            stop.set()
+            for stage in stages:
+                stage.join()
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _create_pool(self, file_count: int) -> Optional[ProcessPoolExecutor]:
+        """Start parse workers, or None to parse on the pipeline thread"""
+        workers = min(self.parse_workers, file_count)
+        if workers <= 1:
+            return None
+        # spawn avoids forking a process that already runs model/server threads
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_parse_worker,
+            initargs=(self.chunk_size, self.chunk_overlap),
+        )
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stop: threading.Event):
+        """Put onto a bounded queue, giving up once the pipeline is stopping"""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    @staticmethod
+    def _get(q: queue.Queue, stop: threading.Event):
+        """Get from a queue, returning the end marker once the pipeline stops"""
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _guard(self, stage, stop: threading.Event, final_q: queue.Queue, *args):
+        """Run a stage; on an unexpected crash, fail the whole run"""
+        try:
+            stage(stop, *args)
+        except Exception as e:
+            self._put(final_q, RuntimeError(f"Ingestion pipeline failed: {e}"), stop)
+
+    def _read_stage(
+        self, stop: threading.Event, file_paths: List[str], out_q: queue.Queue
+    ):
+        for file_path in file_paths:
+            if stop.is_set():
+                return
+            item = PipelineItem(file_path)
+            try:
+                self._read_item(item)
+            except Exception as e:
+                item.error = str(e)
+            self._put(out_q, item, stop)
+        self._put(out_q, _DONE, stop)
+
+    def _read_item(self, item: PipelineItem):
+        """Read a document unless the manifest shows it is unchanged"""
+        if self.manifest is not None:
+            stat = os.stat(item.file_path)
+            item.size, item.mtime = stat.st_size, stat.st_mtime
+            item.previous = self.manifest.get(item.file_path)
+            if item.previous and item.previous.matches_stat(item.size, item.mtime):
+                item.action = "unchanged"
+                return
+
+        item.content = self.document_processor.read_file(item.file_path)
+
+        if self.manifest is not None:
+            item.content_hash = content_hash(item.content)
+            if item.previous and item.previous.content_hash == item.content_hash:
+                # Touched but not edited; only the stat needs refreshing
+                item.action = "unchanged"
+                item.content = None
+
+    def _parse_stage(
+        self,
+        stop: threading.Event,
+        in_q: queue.Queue,
+        out_q: queue.Queue,
+        pool: Optional[ProcessPoolExecutor],
+    ):
+        # Futures in submission order, so results keep the input file order
+        pending: "deque[Tuple[PipelineItem, Optional[Future]]]" = deque()
+        max_pending = max(1, self.parse_workers) * 2
+
+        def emit_oldest():
+            item, future = pending.popleft()
+            if future is not None:
+                try:
+                    item.course, item.chunks = future.result()
+                except Exception as e:
+                    item.error = str(e)
+            item.content = None
+            self._put(out_q, item, stop)
+
+        while True:
+            item = self._get(in_q, stop)
+            if item is _DONE:
+                break
+            if item.error is not None or item.action is not None:
+                pending.append((item, None))
+            elif pool is not None:
+                future = pool.submit(_parse_in_worker, item.content, item.file_name)
+                pending.append((item, future))
+            else:
+                try:
+                    item.course, item.chunks = (
+                        self.document_processor.process_course_text(
+                            item.content, item.file_name
+                        )
+                    )
+                except Exception as e:
+                    item.error = str(e)
+                pending.append((item, None))
+            while len(pending) >= max_pending:
+                emit_oldest()
+
+        while pending and not stop.is_set():
+            emit_oldest()
+        self._put(out_q, _DONE, stop)
+
+    def _embed_stage(
+        self,
+        stop: threading.Event,
+        in_q: queue.Queue,
+        out_q: queue.Queue,
+        existing_titles: Set[str],
+    ):
+        # Titles written or adopted during this run; later duplicates are skipped
+        claimed_titles: Set[str] = set()
+        while True:
+            item = self._get(in_q, stop)
+            if item is _DONE:
+                break
+            if item.error is None and item.action is None:
+                item.action = self._decide_action(item, existing_titles, claimed_titles)
+                if item.action in ("add", "update"):
+                    try:
+                        item.embeddings = self._embed_chunks(item.chunks)
+                    except Exception as e:
+                        item.error = str(e)
+            self._put(out_q, item, stop)
+        self._put(out_q, _DONE, stop)
+
+    def _decide_action(
+        self, item: PipelineItem, existing_titles: Set[str], claimed_titles: Set[str]
+    ) -> str:
+        """Choose how a parsed document changes the index"""
+        if not item.course:
+            return "skip"
+        title = item.course.title
+        if title in claimed_titles:
+            return "skip"
+
+        if item.previous and item.previous.course_title == title:
+            action = "update"
+        elif title in existing_titles:
+            # Indexed before the manifest existed: record it without rewriting
+            if self.manifest is not None and self.manifest.owner_of(title) is None:
+                action = "adopt"
+            else:
+                return "skip"
+        else:
+            action = "update" if item.previous else "add"
+
+        claimed_titles.add(title)
+        existing_titles.add(title)
+        return action
+
+    def _embed_chunks(self, chunks: List[CourseChunk]) -> List[Any]:
+        """Embed chunk texts in batches of embed_batch_size"""
+        embeddings: List[Any] = []
+        for start in range(0, len(chunks), self.embed_batch_size):
+            batch = chunks[start : start + self.embed_batch_size]
+            embeddings.extend(
+                self.vector_store.embed_documents([chunk.content for chunk in batch])
+            )
+        return embeddings
+
+    def _write_stage(
+        self, in_q: queue.Queue, report: Callable[[Dict[str, Any]], None]
+    ) -> Tuple[int, int]:
+        total_courses = 0
+        total_chunks = 0
+        while True:
+            item = in_q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            if item.error is None:
+                try:
+                    self._write_item(item)
+                except Exception as e:
+                    item.error = str(e)
+
+            event = {"event": "file", "file": item.file_name, "chunks": 0}
+            if item.error is not None:
+                print(f"Error processing {item.file_name}: {item.error}")
+                event.update(status="error", error=item.error)
+            elif item.action in ("add", "update"):
+                total_courses += 1
+                total_chunks += len(item.chunks)
+                verb = "Added new" if item.action == "add" else "Updated"
+                print(f"{verb} course: {item.course.title} ({len(item.chunks)} chunks)")
+                event.update(
+                    status="added" if item.action == "add" else "updated",
+                    chunks=len(item.chunks),
+                )
+            elif item.action == "unchanged":
+                event.update(status="unchanged")
+            else:
+                if item.course:
+                    print(f"Course already exists: {item.course.title} - skipping")
+                event.update(status="skipped")
+            report(event)
+        return total_courses, total_chunks
+
+    def _write_item(self, item: PipelineItem):
+        """Apply an item's action to the vector store and manifest"""
+        if item.action == "unchanged":
+            if self.manifest is not None and not item.previous.matches_stat(
+                item.size, item.mtime
+            ):
+                item.previous.size, item.previous.mtime = item.size, item.mtime
+                self.manifest.set(item.previous)
+            return
+        if item.action == "skip":
+            return
+
+        chunk_ids = [self.vector_store.chunk_id(chunk) for chunk in item.chunks]
+        if item.action in ("add", "update"):
+            previous = item.previous
+            if previous and previous.course_title != item.course.title:
+                self.vector_store.delete_course(previous.course_title)
+            self.vector_store.add_course_metadata(item.course)
+            self.vector_store.add_course_content(
+                item.chunks, embeddings=item.embeddings
+            )
+            if previous:
+                stale_ids = sorted(set(previous.chunk_ids) - set(chunk_ids))
+                self.vector_store.delete_course_content(stale_ids)
+
+        if self.manifest is not None:
+            self.manifest.set(
+                ManifestEntry(
+                    path=self.manifest.key(item.file_path),
+                    size=item.size,
+                    mtime=item.mtime,
+                    content_hash=item.content_hash,
+                    course_title=item.course.title,
+                    chunk_ids=chunk_ids,
+                )
+            )
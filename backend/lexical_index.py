@@ -0,0 +1,174 @@
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+# Words too common in transcripts to help ranking; dropped from the index
+STOPWORDS = frozenset("""
+    a an and are as at be but by can do for from has have how i if in into is
+    it its of on or so that the their then there these this to was we what
+    when where which who why will with you your
+    """.split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefolded word tokens without stopwords; identifiers stay whole"""
+    return [t for t in re.findall(r"\w+", text.casefold()) if t not in STOPWORDS]
+
+
+@dataclass
+class _IndexedDocument:
+    text: str
+    metadata: Dict[str, Any]
+    term_counts: Counter
+    length: int
+
+
+class BM25Index:
+    """
+    In-memory inverted index ranking course chunks with Okapi BM25.
+
+    Complements embedding search on exact terms such as API names, lesson
+    titles and code identifiers. Documents are added and removed by chunk
+    id, mirroring the course_content collection, and searches can be
+    filtered on course_title and lesson_number like the Chroma queries.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._documents: Dict[str, _IndexedDocument] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._documents)
+
+    def add(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """Index documents, replacing any already indexed under the same id"""
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            for doc_id, text, metadata in zip(ids, documents, metadatas):
+                self._remove(doc_id)
+                term_counts = Counter(tokenize(text))
+                length = sum(term_counts.values())
+                self._documents[doc_id] = _IndexedDocument(
+                    text, dict(metadata or {}), term_counts, length
+                )
+                self._total_length += length
+                for term, count in term_counts.items():
+                    self._postings.setdefault(term, {})[doc_id] = count
+
+    def remove(self, ids: List[str]):
+        """Drop documents by id"""
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def remove_where(self, **metadata):
+        """Drop every document whose metadata matches all given values"""
+        with self._lock:
+            for doc_id in [
+                doc_id
+                for doc_id, doc in self._documents.items()
+                if self._matches(doc, metadata)
+            ]:
+                self._remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self._postings.clear()
+            self._total_length = 0
+
+    def _remove(self, doc_id: str):
+        """Remove one document; caller holds the lock"""
+        doc = self._documents.pop(doc_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc.length
+        for term in doc.term_counts:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    @staticmethod
+    def _matches(doc: _IndexedDocument, filters: Dict[str, Any]) -> bool:
+        return all(
+            value is None or doc.metadata.get(key) == value
+            for key, value in filters.items()
+        )
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        course_title: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents for a query.
+
+        Returns:
+            Up to limit (chunk id, BM25 score) pairs, best first; documents
+            sharing no term with the query are never returned
+        """
+        terms = set(tokenize(query))
+        filters = {"course_title": course_title, "lesson_number": lesson_number}
+        filtered = course_title is not None or lesson_number is not None
+        with self._lock:
+            count = len(self._documents)
+            if not count or not terms:
+                return []
+            average_length = self._total_length / count
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for doc_id, frequency in postings.items():
+                    doc = self._documents[doc_id]
+                    if filtered and not self._matches(doc, filters):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * doc.length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                        frequency * (self.k1 + 1) / (frequency + norm)
+                    )
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def get(self, doc_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Text and metadata of an indexed document"""
+        with self._lock:
+            doc = self._documents.get(doc_id)
+            return (doc.text, dict(doc.metadata)) if doc else None
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists: each id scores the sum of 1 / (k + rank).
+
+    Returns:
+        (id, fused score) pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
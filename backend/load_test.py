@@ -0,0 +1,318 @@
+"""
+Asyncio load generator for the RAG query API.
+
+Drives POST /api/query with a fixed number of concurrent workers and
+reports throughput, latency percentiles and a per-stage breakdown taken
+from the Server-Timing header. With --fake-anthropic the app and a
+simulated Anthropic backend are started in-process, so no API budget is
+spent; that app indexes ../docs into a temporary CHROMA_PATH and runs
+with the answer cache disabled unless --repeat is given. Run it from
+backend/ so the in-process app finds ../docs:
+
+    python load_test.py --fake-anthropic --concurrency 16 --requests 400
+    python load_test.py --url http://127.0.0.1:8000 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+from query_fixtures import DEFAULT_QUERIES
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (0-100) of a list, or None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """Parse "name;dur=12.5, other;dur=3" into seconds per stage"""
+    stages: Dict[str, float] = {}
+    for entry in (header or "").split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        for param in params:
+            if name and param.startswith("dur="):
+                try:
+                    stages[name] = float(param[4:]) / 1000.0
+                except ValueError:
+                    pass
+    return stages
+
+
+@dataclass
+class LoadTestResult:
+    """Outcome of a load test run"""
+
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)  # Successful requests
+    errors: Dict[str, int] = field(default_factory=dict)  # Count per status/type
+    stages: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies) + sum(self.errors.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """Throughput, latency percentiles and per-stage means and p95s"""
+        return {
+            "requests": self.requests,
+            "succeeded": len(self.latencies),
+            "errors": dict(self.errors),
+            "elapsed": self.elapsed,
+            "throughput": self.requests / self.elapsed if self.elapsed else 0.0,
+            "latency": {
+                "p50": percentile(self.latencies, 50),
+                "p95": percentile(self.latencies, 95),
+                "p99": percentile(self.latencies, 99),
+                "max": max(self.latencies) if self.latencies else None,
+            },
+            "stages": {
+                name: {
+                    "mean": statistics.fmean(values),
+                    "p95": percentile(values, 95),
+                    "count": len(values),
+                }
+                for name, values in sorted(self.stages.items())
+            },
+        }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    queries: List[str],
+    concurrency: int = 8,
+    total_requests: Optional[int] = 100,
+    duration: Optional[float] = None,
+    unique: bool = True,
+    path: str = "/api/query",
+) -> LoadTestResult:
+    """
+    Issue queries from concurrent workers until the request count or
+    duration is reached.
+
+    Args:
+        client: HTTP client whose base_url points at the app
+        queries: Questions sent in round-robin order
+        concurrency: Number of workers with one request in flight each
+        total_requests: Stop after this many requests (None: no limit)
+        duration: Stop starting requests after this many seconds
+        unique: Number each query so no two requests are identical. The
+            answer cache matches on embedding similarity, so numbered
+            queries can still hit it; disable it on the server to measure
+            uncached requests
+
+    Returns:
+        LoadTestResult with per-request latencies, errors and stages
+    """
+    if total_requests is None and duration is None:
+        raise ValueError("Either total_requests or duration is required")
+
+    result = LoadTestResult()
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def next_query() -> Optional[str]:
+        nonlocal issued
+        if total_requests is not None and issued >= total_requests:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        query = queries[issued % len(queries)]
+        issued += 1
+        return f"{query} (#{issued})" if unique else query
+
+    async def worker():
+        while (query := next_query()) is not None:
+            sent = time.perf_counter()
+            try:
+                response = await client.post(path, json={"query": query})
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+                result.errors[key] = result.errors.get(key, 0) + 1
+                continue
+            latency = time.perf_counter() - sent
+            if response.status_code != 200:
+                key = str(response.status_code)
+                result.errors[key] = result.errors.get(key, 0) + 1
+                continue
+            result.latencies.append(latency)
+            timings = parse_server_timing(response.headers.get("server-timing"))
+            for stage, seconds in timings.items():
+                result.stages.setdefault(stage, []).append(seconds)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+class BackgroundServer:
+    """Serve an ASGI app with uvicorn on a background thread"""
+
+    def __init__(self, app: Any, host: str = "127.0.0.1", port: int = 0):
+        import uvicorn
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=host, port=port, log_level="warning")
+        )
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> "BackgroundServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Server failed to start")
+            time.sleep(0.05)
+        return self
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.servers[0].sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout: float = 600.0):
+    """Poll the app's readiness endpoint while the initial ingest runs"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/readyz")
+            if response.status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError("App did not become ready")
+
+
+def _print_summary(summary: Dict[str, Any]):
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.1f} ms" if value is not None else "-"
+
+    print(f"Requests:   {summary['requests']} ({summary['succeeded']} ok)")
+    if summary["errors"]:
+        print(f"Errors:     {summary['errors']}")
+    print(f"Elapsed:    {summary['elapsed']:.2f} s")
+    print(f"Throughput: {summary['throughput']:.2f} req/s")
+    latency = summary["latency"]
+    print(
+        f"Latency:    p50 {ms(latency['p50'])}  p95 {ms(latency['p95'])}  "
+        f"p99 {ms(latency['p99'])}  max {ms(latency['max'])}"
+    )
+    if summary["stages"]:
+        print("Stages:")
+        for name, stage in summary["stages"].items():
+            print(
+                f"  {name:<32} mean {ms(stage['mean'])}  p95 {ms(stage['p95'])}"
+                f"  ({stage['count']})"
+            )
+
+
+async def _run(args) -> Dict[str, Any]:
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, "r", encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    async def drive(url: str) -> Dict[str, Any]:
+        async with httpx.AsyncClient(
+            base_url=url,
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=args.concurrency),
+        ) as client:
+            if args.fake_anthropic:
+                await _wait_until_ready(client)
+            result = await run_load(
+                client,
+                queries,
+                concurrency=args.concurrency,
+                total_requests=args.requests if args.duration is None else None,
+                duration=args.duration,
+                unique=not args.repeat,
+            )
+            return result.summary()
+
+    if not args.fake_anthropic:
+        return await drive(args.url)
+
+    from fake_anthropic import (
+        FakeAnthropic,
+        FakeAnthropicSettings,
+        LatencyModel,
+        create_app,
+    )
+
+    fake = FakeAnthropic(
+        FakeAnthropicSettings(
+            latency=LatencyModel.parse(args.latency),
+            script=args.script,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+    )
+    with (
+        BackgroundServer(create_app(fake)) as fake_server,
+        tempfile.TemporaryDirectory(prefix="load-test-chroma-") as chroma_path,
+    ):
+        # The SDK reads the base URL when app.py builds its clients
+        os.environ["ANTHROPIC_BASE_URL"] = fake_server.url
+        os.environ.setdefault("ANTHROPIC_API_KEY", "fake-key")
+        from config import config
+
+        # Keep the run off the real index and measure uncached requests;
+        # both are read when app.py builds the RAG system on import
+        config.CHROMA_PATH = chroma_path
+        if not args.repeat:
+            config.ANSWER_CACHE_SIZE = 0
+        from app import app
+
+        with BackgroundServer(app) as app_server:
+            summary = await drive(app_server.url)
+        summary["fake_anthropic"] = fake.stats()
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the RAG query API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--fake-anthropic", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=None)
+    parser.add_argument("--queries", help="File with one question per line")
+    parser.add_argument(
+        "--repeat", action="store_true", help="Send queries verbatim (cacheable)"
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--latency", default="lognormal:0.8:0.5")
+    parser.add_argument("--script", default="search")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="Print JSON summary")
+    args = parser.parse_args()
+
+    summary = asyncio.run(_run(args))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        _print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Sample questions about the course documents.
+
+Shared by the load generator and the compression benchmark, so neither
+tool imports the other.
+"""
+
+DEFAULT_QUERIES = [
+    "What is covered in lesson 1?",
+    "How do I build a retrieval system with embeddings?",
+    "Explain prompt caching",
+    "What are the lessons of the MCP course?",
+    "How does tool use work with Claude?",
+    "What is a vector database used for?",
+    "Summarize the computer use course",
+    "How should chunks be sized for semantic search?",
+]
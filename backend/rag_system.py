@@ -1,13 +1,28 @@
+import asyncio
+import hashlib
 import os
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
 from ai_generator import AIGenerator
+from anthropic_client import ClientSettings
+from answer_cache import AnswerCache, CachedAnswer
 from document_processor import DocumentProcessor
+from ingestion_manifest import IngestionManifest
+from ingestion_pipeline import IngestionPipeline
 from models import Course, CourseChunk, Lesson
+from retrieval_context import RetrievalContext
 from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
+from session_backend import create_session_backend
 from session_manager import SessionManager
+from session_summary import SessionSummarizer
+from token_budget import estimate_message_tokens, estimate_tokens, estimate_tools_tokens
 from vector_store import VectorStore
 
+# The system prompt is static, so its size is estimated once
+SYSTEM_PROMPT_TOKENS = estimate_tokens(AIGenerator.SYSTEM_PROMPT)
+
 
 class RAGSystem:
     """Main orchestrator for the Retrieval-Augmented Generation system"""
@@ -20,20 +35,91 @@ class RAGSystem:
             config.CHUNK_SIZE, config.CHUNK_OVERLAP
         )
         self.vector_store = VectorStore(
-            config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS
+            config.CHROMA_PATH,
+            config.EMBEDDING_MODEL,
+            config.MAX_RESULTS,
+            embedding_cache_size=config.EMBEDDING_CACHE_SIZE,
+            embedding_cache_path=(
+                os.path.join(config.CHROMA_PATH, "embedding_cache.sqlite3")
+                if config.EMBEDDING_CACHE_DISK
+                else None
+            ),
+            embedding_cache_disk_entries=config.EMBEDDING_CACHE_DISK_ENTRIES,
+            write_batch_size=config.CONTENT_WRITE_BATCH_SIZE,
+            search_mode=config.SEARCH_MODE,
+            vector_compression=config.VECTOR_COMPRESSION,
+            pca_dimensions=config.VECTOR_PCA_DIMENSIONS,
+            rescore_factor=config.VECTOR_RESCORE_FACTOR,
+            backend=config.VECTOR_BACKEND,
         )
         self.ai_generator = AIGenerator(
-            config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL
+            config.ANTHROPIC_API_KEY,
+            config.ANTHROPIC_MODEL,
+            prompt_caching=config.PROMPT_CACHING,
+            client_settings=ClientSettings.from_config(config),
+        )
+        self.session_manager = SessionManager(
+            config.MAX_HISTORY,
+            max_sessions=config.SESSION_MAX_COUNT,
+            ttl_seconds=config.SESSION_TTL,
+            sweep_interval=config.SESSION_SWEEP_INTERVAL,
+            backend=create_session_backend(
+                config.SESSION_BACKEND, config.SESSION_DB_PATH
+            ),
+            cache_ttl=config.SESSION_CACHE_TTL,
+            write_interval=config.SESSION_WRITE_INTERVAL,
+            summarizer=(
+                SessionSummarizer(
+                    self.ai_generator.summarize_conversation,
+                    config.SESSION_SUMMARY_TOKENS,
+                )
+                if config.SESSION_COMPACTION
+                else None
+            ),
+        )
+        # Record of indexed files so folder re-ingestion only touches changes
+        self.ingestion_manifest = IngestionManifest(
+            os.path.join(config.CHROMA_PATH, "ingest_manifest.json")
+        )
+        self.ingestion_pipeline = IngestionPipeline(
+            self.document_processor,
+            self.vector_store,
+            config.CHUNK_SIZE,
+            config.CHUNK_OVERLAP,
+            parse_workers=config.INGEST_PARSE_WORKERS,
+            embed_batch_size=config.INGEST_EMBED_BATCH_SIZE,
+            queue_size=config.INGEST_QUEUE_SIZE,
+            manifest=self.ingestion_manifest,
+        )
+
+        # Bounded pool for blocking vector work issued from async queries
+        self.query_executor = ThreadPoolExecutor(
+            max_workers=config.QUERY_WORKERS, thread_name_prefix="rag-query"
         )
-        self.session_manager = SessionManager(config.MAX_HISTORY)
 
         # Initialize search tools
-        self.tool_manager = ToolManager()
+        self.tool_manager = ToolManager(
+            executor=self.query_executor, default_timeout=config.TOOL_TIMEOUT
+        )
         self.search_tool = CourseSearchTool(self.vector_store)
         self.outline_tool = CourseOutlineTool(self.vector_store)
         self.tool_manager.register_tool(self.search_tool)
         self.tool_manager.register_tool(self.outline_tool)
 
+        # Semantic cache of first-turn answers, invalidated by index writes
+        self.answer_cache = (
+            AnswerCache(
+                max_entries=config.ANSWER_CACHE_SIZE,
+                ttl_seconds=config.ANSWER_CACHE_TTL,
+                similarity_threshold=config.ANSWER_CACHE_SIMILARITY,
+            )
+            if config.ANSWER_CACHE_SIZE > 0
+            else None
+        )
+        self.answer_cache_scope = (
+            self._answer_cache_scope() if self.answer_cache else ""
+        )
+
     def add_course_document(self, file_path: str) -> Tuple[Course, int]:
         """
         Add a single course document to the knowledge base.
@@ -62,63 +148,91 @@ class RAGSystem:
             return None, 0
 
     def add_course_folder(
-        self, folder_path: str, clear_existing: bool = False
+        self,
+        folder_path: str,
+        clear_existing: bool = False,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Tuple[int, int]:
         """
         Add all course documents from a folder.
 
+        Re-running on the same folder is incremental: unchanged files are
+        skipped, edited files replace their chunks and courses whose files
+        were deleted are removed from the index.
+
         Args:
             folder_path: Path to folder containing course documents
             clear_existing: Whether to clear existing data first
+            on_progress: Optional callback receiving progress events:
+                {"event": "start", "files_total": n} once, then
+                {"event": "file", "file": name, "status": "added" | "updated"
+                | "unchanged" | "skipped" | "error", "chunks": n,
+                "error": message} per document, then
+                {"event": "removed", "file": name, "course": title} for each
+                course whose file is gone
 
         Returns:
-            Tuple of (total courses added, total chunks created)
+            Tuple of (total courses added or updated, total chunks created)
         """
-        total_courses = 0
-        total_chunks = 0
+
+        def report(event: Dict[str, Any]):
+            if on_progress:
+                on_progress(event)
 
         # Clear existing data if requested
         if clear_existing:
             print("Clearing existing data for fresh rebuild...")
             self.vector_store.clear_all_data()
+            self.ingestion_manifest.clear()
+            self.ingestion_manifest.save()
 
         if not os.path.exists(folder_path):
             print(f"Folder {folder_path} does not exist")
+            report({"event": "start", "files_total": 0})
             return 0, 0
 
         # Get existing course titles to avoid re-processing
         existing_course_titles = set(self.vector_store.get_existing_course_titles())
 
-        # Process each file in the folder
-        for file_name in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, file_name)
-            if os.path.isfile(file_path) and file_name.lower().endswith(
-                (".pdf", ".docx", ".txt")
-            ):
-                try:
-                    # Check if this course might already exist
-                    # We'll process the document to get the course ID, but only add if new
-                    course, course_chunks = (
-                        self.document_processor.process_course_document(file_path)
-                    )
-
-                    if course and course.title not in existing_course_titles:
-                        # This is a new course - add it to the vector store
-                        self.vector_store.add_course_metadata(course)
-                        self.vector_store.add_course_content(course_chunks)
-                        total_courses += 1
-                        total_chunks += len(course_chunks)
-                        print(
-                            f"Added new course: {course.title} ({len(course_chunks)} chunks)"
-                        )
-                        existing_course_titles.add(course.title)
-                    elif course:
-                        print(f"Course already exists: {course.title} - skipping")
-                except Exception as e:
-                    print(f"Error processing {file_name}: {e}")
+        file_names = [
+            file_name
+            for file_name in os.listdir(folder_path)
+            if os.path.isfile(os.path.join(folder_path, file_name))
+            and file_name.lower().endswith((".pdf", ".docx", ".txt"))
+        ]
+        report({"event": "start", "files_total": len(file_names)})
+
+        try:
+            # Read, parse, embed and write the documents as overlapping stages
+            total_courses, total_chunks = self.ingestion_pipeline.run(
+                [os.path.join(folder_path, file_name) for file_name in file_names],
+                existing_course_titles,
+                report,
+            )
+            self._remove_deleted_documents(folder_path, report)
+        finally:
+            self.ingestion_manifest.save()
 
         return total_courses, total_chunks
 
+    def _remove_deleted_documents(
+        self, folder_path: str, report: Callable[[Dict[str, Any]], None]
+    ):
+        """Drop courses whose source files no longer exist in the folder"""
+        for entry in self.ingestion_manifest.entries_in(folder_path):
+            if os.path.exists(entry.path):
+                continue
+            self.vector_store.delete_course(entry.course_title)
+            self.ingestion_manifest.remove(entry.path)
+            print(f"Removed course: {entry.course_title} (file deleted)")
+            report(
+                {
+                    "event": "removed",
+                    "file": os.path.basename(entry.path),
+                    "course": entry.course_title,
+                }
+            )
+
     def query(
         self, query: str, session_id: Optional[str] = None
     ) -> Tuple[str, List[str], List[str]]:
@@ -132,35 +246,336 @@ class RAGSystem:
         Returns:
             Tuple of (response, sources list, source_links list)
         """
+        response, context = self.query_with_context(query, session_id)
+        sources, source_links = context.get_sources()
+        return response, sources, source_links
+
+    def query_with_context(
+        self, query: str, session_id: Optional[str] = None
+    ) -> Tuple[str, RetrievalContext]:
+        """
+        Process a user query and return the response with its request context.
+
+        Sources, tool calls and stage timings are collected on a context that
+        belongs to this request only, so concurrent queries cannot see or
+        overwrite each other's citations. First-turn questions similar
+        enough to one answered before are served from the answer cache
+        without calling Anthropic.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Returns:
+            Tuple of (response, RetrievalContext for this request)
+        """
+        context = RetrievalContext()
+
         # Create prompt for the AI with clear instructions
         prompt = f"""Answer this question about course materials: {query}"""
 
         # Get conversation history if session exists
-        history = None
-        if session_id:
-            history = self.session_manager.get_conversation_history(session_id)
+        history = self._get_history(session_id, prompt, context)
+
+        # Answer repeated questions from the cache
+        with context.timed("cache_lookup"):
+            cached, embedding, generation = self._lookup_answer(query, history)
+        if cached:
+            return self._serve_cached(cached, query, session_id, context), context
 
         # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
+        with context.timed("generate"):
+            response = self.ai_generator.generate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                context=context,
+            )
+        self._store_answer(embedding, generation, response, context)
+
+        # Update conversation history
+        if session_id:
+            self.session_manager.add_exchange(session_id, query, response)
+
+        return response, context
+
+    async def aquery(
+        self, query: str, session_id: Optional[str] = None
+    ) -> Tuple[str, List[str], List[str]]:
+        """
+        Async variant of query that never blocks the event loop.
+
+        Anthropic calls go through the async client and tool execution runs on
+        query_executor, so many questions can be in flight on one worker.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Returns:
+            Tuple of (response, sources list, source_links list)
+        """
+        response, context = await self.aquery_with_context(query, session_id)
+        sources, source_links = context.get_sources()
+        return response, sources, source_links
+
+    async def acreate_session(self) -> str:
+        """Create a session on query_executor; a shared store writes to SQLite"""
+        return await self._in_executor(self.session_manager.create_session)
+
+    async def aquery_with_context(
+        self, query: str, session_id: Optional[str] = None
+    ) -> Tuple[str, RetrievalContext]:
+        """Async variant of query_with_context"""
+        context = RetrievalContext()
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        history = await self._in_executor(
+            self._get_history, session_id, prompt, context
+        )
+
+        with context.timed("cache_lookup"):
+            cached, embedding, generation = await self._alookup_answer(query, history)
+        if cached:
+            answer = await self._in_executor(
+                self._serve_cached, cached, query, session_id, context
+            )
+            return answer, context
+
+        with context.timed("generate"):
+            response = await self.ai_generator.agenerate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=self.tool_manager.get_tool_definitions(),
+                tool_manager=self.tool_manager,
+                context=context,
+            )
+        self._store_answer(embedding, generation, response, context)
+
+        if session_id:
+            await self._in_executor(
+                self.session_manager.add_exchange, session_id, query, response
+            )
+
+        return response, context
+
+    async def astream_query(
+        self, query: str, session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user query and stream progress, sources and answer tokens.
+
+        Passes through the AIGenerator.astream_response events and adds a
+        "sources" event as soon as each tool round finishes retrieval. The
+        last event is "done" with the answer, sources and source links.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Yields:
+            Event dicts keyed by "type"
+        """
+        context = RetrievalContext()
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        history = await self._in_executor(
+            self._get_history, session_id, prompt, context
+        )
+
+        cached, embedding, generation = await self._alookup_answer(query, history)
+        if cached:
+            answer = await self._in_executor(
+                self._serve_cached, cached, query, session_id, context
+            )
+            yield {"type": "token", "round": 1, "text": answer}
+            yield {
+                "type": "done",
+                "answer": answer,
+                "sources": list(cached.sources),
+                "source_links": list(cached.source_links),
+                "prompt_tokens": dict(context.prompt_tokens),
+            }
+            return
+
+        answer = ""
+        async for event in self.ai_generator.astream_response(
             query=prompt,
             conversation_history=history,
             tools=self.tool_manager.get_tool_definitions(),
             tool_manager=self.tool_manager,
+            context=context,
+        ):
+            if event["type"] == "done":
+                answer = event["answer"]
+                continue
+            yield event
+            if event["type"] == "tool_results":
+                sources, source_links = context.get_sources()
+                yield {
+                    "type": "sources",
+                    "sources": sources,
+                    "source_links": source_links,
+                }
+        self._store_answer(embedding, generation, answer, context)
+
+        if session_id:
+            await self._in_executor(
+                self.session_manager.add_exchange, session_id, query, answer
+            )
+
+        sources, source_links = context.get_sources()
+        yield {
+            "type": "done",
+            "answer": answer,
+            "sources": sources,
+            "source_links": source_links,
+            "prompt_tokens": dict(context.prompt_tokens),
+        }
+
+    def _answer_cache_scope(self) -> str:
+        """Fingerprint the session-independent prompt an answer depends on"""
+        tool_names = sorted(
+            tool["name"] for tool in self.tool_manager.get_tool_definitions()
         )
+        parts = [self.config.ANTHROPIC_MODEL, AIGenerator.SYSTEM_PROMPT, *tool_names]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
 
-        # Get sources and source links from the search tool
-        sources = self.tool_manager.get_last_sources()
-        source_links = self.tool_manager.get_last_source_links()
+    def _get_history(
+        self, session_id: Optional[str], prompt: str, context: RetrievalContext
+    ) -> Optional[Union[str, List[Dict[str, str]]]]:
+        """
+        Conversation history for a session in the AI generator's layout.
 
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
+        With prompt caching the history is passed as API messages so it can
+        follow the cached system prompt; otherwise as formatted text. The
+        history gets whatever CONTEXT_TOKEN_BUDGET leaves after the system
+        prompt, tool definitions, query and TOOL_RESULT_TOKEN_RESERVE, and
+        the estimated tokens of each section are recorded on the context.
+        """
+        sections = {
+            "system": SYSTEM_PROMPT_TOKENS,
+            "tools": estimate_tools_tokens(self.tool_manager.get_tool_definitions()),
+            "query": estimate_tokens(prompt),
+        }
+        max_tokens = None
+        if self.config.CONTEXT_TOKEN_BUDGET > 0:
+            max_tokens = max(
+                0,
+                self.config.CONTEXT_TOKEN_BUDGET
+                - self.config.TOOL_RESULT_TOKEN_RESERVE
+                - sum(sections.values()),
+            )
 
-        # Update conversation history
+        history = None
+        if session_id and self.config.PROMPT_CACHING:
+            history = self.session_manager.get_history_messages(
+                session_id, max_tokens=max_tokens
+            )
+            sections["history"] = sum(map(estimate_message_tokens, history or []))
+        elif session_id:
+            history = self.session_manager.get_conversation_history(
+                session_id, max_tokens=max_tokens
+            )
+            sections["history"] = estimate_tokens(history or "")
+        else:
+            sections["history"] = 0
+        context.record_prompt_tokens(sections)
+        return history
+
+    def _lookup_answer(
+        self, query: str, history: Optional[Union[str, List[Dict[str, str]]]]
+    ) -> Tuple[Optional[CachedAnswer], Optional[Any], int]:
+        """
+        Look up a cached answer for a query.
+
+        Only first-turn questions are cached, since conversation history can
+        change what a follow-up question means.
+
+        Returns:
+            Tuple of (cached answer or None, query embedding or None, index
+            generation the lookup was made against)
+        """
+        if self.answer_cache is None or history:
+            return None, None, 0
+        generation = self.vector_store.generation
+        embedding = self.vector_store.embed_query(query)
+        cached = self.answer_cache.lookup(
+            embedding, self.answer_cache_scope, generation
+        )
+        return cached, embedding, generation
+
+    async def _alookup_answer(
+        self, query: str, history: Optional[Union[str, List[Dict[str, str]]]]
+    ) -> Tuple[Optional[CachedAnswer], Optional[Any], int]:
+        """Async variant of _lookup_answer that embeds off the event loop"""
+        if self.answer_cache is None or history:
+            return None, None, 0
+        return await self._in_executor(self._lookup_answer, query, history)
+
+    async def _in_executor(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run blocking work on query_executor, e.g. session reads and writes,
+        which go through SQLite when the session store is shared
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.query_executor, partial(fn, *args))
+
+    def _store_answer(
+        self,
+        embedding: Optional[Any],
+        generation: int,
+        response: str,
+        context: RetrievalContext,
+    ):
+        """Cache a generated answer unless a tool failed while producing it"""
+        if embedding is None or not response:
+            return
+        if any(call.error for call in context.tool_calls):
+            return
+        sources, source_links = context.get_sources()
+        self.answer_cache.store(
+            embedding,
+            self.answer_cache_scope,
+            generation,
+            response,
+            sources,
+            source_links,
+        )
+
+    def _serve_cached(
+        self,
+        cached: CachedAnswer,
+        query: str,
+        session_id: Optional[str],
+        context: RetrievalContext,
+    ) -> str:
+        """Fill the request context from a cached answer and record the turn"""
+        context.cache_hit = True
+        context.add_sources(cached.sources, cached.source_links)
         if session_id:
-            self.session_manager.add_exchange(session_id, query, response)
+            self.session_manager.add_exchange(session_id, query, cached.answer)
+        return cached.answer
 
-        # Return response with sources and links from tool searches
-        return response, sources, source_links
+    def get_answer_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the answer cache"""
+        if self.answer_cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.answer_cache.stats()}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Cache hit/miss counters and the compressed vector index footprint"""
+        return {
+            "answers": self.get_answer_cache_stats(),
+            "embeddings": self.vector_store.embedding_cache.stats(),
+            "prompt": self.ai_generator.get_usage_stats(),
+            "compression": self.vector_store.get_compression_stats(),
+        }
+
+    def warm_up_steps(self) -> List[Tuple[str, Callable[[], Any]]]:
+        """Steps that load models and indexes before the first query needs them"""
+        return self.vector_store.warm_up_steps()
 
     def get_course_analytics(self) -> Dict:
         """Get analytics about the course catalog"""
@@ -0,0 +1,136 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from token_budget import estimate_tokens
+
+
+@dataclass
+class ToolInvocation:
+    """Record of a single tool call made while answering a query"""
+
+    name: str  # Tool name as registered with the ToolManager
+    arguments: Dict[str, Any]  # Input the model passed to the tool
+    result: Optional[str]  # Text returned to the model (None if it raised)
+    duration: float  # Wall-clock seconds spent in the tool
+    error: Optional[str] = None  # Exception message if the tool raised
+
+
+@dataclass
+class RetrievalContext:
+    """
+    Per-request state collected while answering one query.
+
+    A fresh context is created for every RAGSystem query and threaded
+    through ToolManager.execute_tool, so concurrent queries never share
+    sources, tool results or timings. Tools in the same round may run on
+    different threads, so all mutation goes through the internal lock.
+
+    Work that may be abandoned, such as a tool call with a time limit, runs
+    on a fork that is merged back only if it finishes in time; closing the
+    fork makes it drop whatever the abandoned work records afterwards.
+    """
+
+    sources: List[str] = field(default_factory=list)
+    source_links: List[Optional[str]] = field(default_factory=list)
+    tool_calls: List[ToolInvocation] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    usage: Dict[str, int] = field(default_factory=dict)  # API token counts
+    # Estimated prompt tokens per section: system, tools, history, query and
+    # tool_results
+    prompt_tokens: Dict[str, int] = field(default_factory=dict)
+    cache_hit: bool = False  # Answer was served from the answer cache
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+    _closed: bool = field(default=False, repr=False, compare=False)
+
+    def fork(self) -> "RetrievalContext":
+        """An empty context for work whose results may be discarded"""
+        return RetrievalContext()
+
+    def close(self) -> None:
+        """Ignore every later write, e.g. from a tool call that timed out"""
+        with self._lock:
+            self._closed = True
+
+    def merge(self, other: "RetrievalContext") -> None:
+        """Fold a fork's sources, tool calls, timings and token counts in"""
+        with other._lock:
+            sources, source_links = list(other.sources), list(other.source_links)
+            tool_calls = list(other.tool_calls)
+            counters = [
+                (self.timings, dict(other.timings)),
+                (self.usage, dict(other.usage)),
+                (self.prompt_tokens, dict(other.prompt_tokens)),
+            ]
+        with self._lock:
+            if self._closed:
+                return
+            self.sources.extend(sources)
+            self.source_links.extend(source_links)
+            self.tool_calls.extend(tool_calls)
+            for target, values in counters:
+                for name, value in values.items():
+                    target[name] = target.get(name, 0) + value
+
+    def add_sources(
+        self, sources: List[str], source_links: List[Optional[str]]
+    ) -> None:
+        """Append sources from a retrieval, one entry per search result"""
+        with self._lock:
+            if self._closed:
+                return
+            self.sources.extend(sources)
+            self.source_links.extend(source_links)
+
+    def get_sources(self) -> Tuple[List[str], List[Optional[str]]]:
+        """Return a snapshot of (sources, source_links)"""
+        with self._lock:
+            return list(self.sources), list(self.source_links)
+
+    def record_tool_call(self, invocation: ToolInvocation) -> None:
+        """Store a completed tool call and add its duration to the timings"""
+        with self._lock:
+            if self._closed:
+                return
+            self.tool_calls.append(invocation)
+            key = f"tool:{invocation.name}"
+            self.timings[key] = self.timings.get(key, 0.0) + invocation.duration
+            self.prompt_tokens["tool_results"] = self.prompt_tokens.get(
+                "tool_results", 0
+            ) + estimate_tokens(invocation.result or invocation.error or "")
+
+    def record_timing(self, stage: str, seconds: float) -> None:
+        """Accumulate wall-clock seconds spent in a named stage"""
+        with self._lock:
+            if self._closed:
+                return
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def record_usage(self, counts: Dict[str, int]) -> None:
+        """Accumulate token counts reported by one API response"""
+        with self._lock:
+            if self._closed:
+                return
+            for name, value in counts.items():
+                self.usage[name] = self.usage.get(name, 0) + value
+
+    def record_prompt_tokens(self, sections: Dict[str, int]) -> None:
+        """Accumulate estimated prompt tokens per section"""
+        with self._lock:
+            if self._closed:
+                return
+            for name, value in sections.items():
+                self.prompt_tokens[name] = self.prompt_tokens.get(name, 0) + value
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block and record it under the given stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(stage, time.perf_counter() - start)
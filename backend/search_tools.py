@@ -1,12 +1,21 @@
+import asyncio
+import functools
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Protocol
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Protocol, Tuple
 
+from metrics import tool_seconds
+from retrieval_context import RetrievalContext, ToolInvocation
 from vector_store import SearchResults, VectorStore
 
 
 class Tool(ABC):
     """Abstract base class for all tools"""
 
+    # Seconds one async call may run before it is abandoned (None: manager default)
+    timeout: Optional[float] = None
+
     @abstractmethod
     def get_tool_definition(self) -> Dict[str, Any]:
         """Return Anthropic tool definition for this tool"""
@@ -17,6 +26,28 @@ class Tool(ABC):
         """Execute the tool with given parameters"""
         pass
 
+    def execute_with_context(self, context: RetrievalContext, **kwargs) -> str:
+        """Execute the tool, recording any per-request state on the context"""
+        return self.execute(**kwargs)
+
+    async def aexecute(
+        self,
+        context: Optional[RetrievalContext] = None,
+        executor: Optional[Executor] = None,
+        **kwargs,
+    ) -> str:
+        """
+        Execute the tool from async code.
+
+        The default runs the blocking execute on the given executor; tools
+        doing native async I/O override this to avoid the thread hop.
+        """
+        if context is None:
+            call = functools.partial(self.execute, **kwargs)
+        else:
+            call = functools.partial(self.execute_with_context, context, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(executor, call)
+
 
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
@@ -60,6 +91,9 @@ class CourseSearchTool(Tool):
         """
         Execute the search tool with given parameters.
 
+        Sources are kept on last_sources/last_source_links for direct callers;
+        the query pipeline uses execute_with_context instead.
+
         Args:
             query: What to search for
             course_name: Optional course filter
@@ -68,6 +102,30 @@ class CourseSearchTool(Tool):
         Returns:
             Formatted search results or error message
         """
+        result, sources, source_links = self._search(query, course_name, lesson_number)
+        self.last_sources = sources
+        self.last_source_links = source_links
+        return result
+
+    def execute_with_context(
+        self,
+        context: RetrievalContext,
+        query: str,
+        course_name: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> str:
+        """Execute the search, adding its sources to the request context"""
+        result, sources, source_links = self._search(query, course_name, lesson_number)
+        context.add_sources(sources, source_links)
+        return result
+
+    def _search(
+        self,
+        query: str,
+        course_name: Optional[str],
+        lesson_number: Optional[int],
+    ) -> Tuple[str, List[str], List[Optional[str]]]:
+        """Run the search and return (formatted text, sources, source_links)"""
 
         # Use the vector store's unified search interface
         results = self.store.search(
@@ -76,7 +134,7 @@ class CourseSearchTool(Tool):
 
         # Handle errors
         if results.error:
-            return results.error
+            return results.error, [], []
 
         # Handle empty results
         if results.is_empty():
@@ -85,12 +143,14 @@ class CourseSearchTool(Tool):
                 filter_info += f" in course '{course_name}'"
             if lesson_number:
                 filter_info += f" in lesson {lesson_number}"
-            return f"No relevant content found{filter_info}."
+            return f"No relevant content found{filter_info}.", [], []
 
         # Format and return results
         return self._format_results(results)
 
-    def _format_results(self, results: SearchResults) -> str:
+    def _format_results(
+        self, results: SearchResults
+    ) -> Tuple[str, List[str], List[Optional[str]]]:
         """Format search results with course and lesson context"""
         formatted = []
         sources = []  # Track sources for the UI
@@ -120,11 +180,7 @@ class CourseSearchTool(Tool):
 
             formatted.append(f"{header}\n{doc}")
 
-        # Store sources and links for retrieval
-        self.last_sources = sources
-        self.last_source_links = source_links
-
-        return "\n\n".join(formatted)
+        return "\n\n".join(formatted), sources, source_links
 
 
 class CourseOutlineTool(Tool):
@@ -165,23 +221,16 @@ class CourseOutlineTool(Tool):
         if not course_title:
             return f"No course found matching '{course_name}'"
 
-        # Get course metadata
+        # Get course metadata with its lessons already decoded
         try:
-            results = self.store.course_catalog.get(ids=[course_title])
-            if not results or not results["metadatas"]:
+            metadata = self.store.get_course_metadata(course_title)
+            if not metadata:
                 return f"Course metadata not found for '{course_title}'"
 
-            metadata = results["metadatas"][0]
-
-            # Parse lessons from JSON
-            import json
-
-            lessons_json = metadata.get("lessons_json")
-            if not lessons_json:
+            lessons = metadata.get("lessons")
+            if not lessons:
                 return f"No lesson information available for '{course_title}'"
 
-            lessons = json.loads(lessons_json)
-
             # Format the outline
             outline = []
             outline.append(f"**Course Title:** {metadata.get('title', course_title)}")
@@ -203,8 +252,16 @@ class CourseOutlineTool(Tool):
 class ToolManager:
     """Manages available tools for the AI"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        default_timeout: Optional[float] = None,
+    ):
         self.tools = {}
+        # Executor used by aexecute_tool; None means the loop's default pool
+        self.executor = executor
+        # Per-call time limit for tools that do not set their own timeout
+        self.default_timeout = default_timeout
 
     def register_tool(self, tool: Tool):
         """Register any tool that implements the Tool interface"""
@@ -218,15 +275,98 @@ class ToolManager:
         """Get all tool definitions for Anthropic tool calling"""
         return [tool.get_tool_definition() for tool in self.tools.values()]
 
-    def execute_tool(self, tool_name: str, **kwargs) -> str:
-        """Execute a tool by name with given parameters"""
+    def execute_tool(
+        self, tool_name: str, context: Optional[RetrievalContext] = None, **kwargs
+    ) -> str:
+        """
+        Execute a tool by name with given parameters.
+
+        When a request context is given, the tool records its sources on it
+        and the call (arguments, result, duration) is added to the context.
+        """
+        if tool_name not in self.tools:
+            return f"Tool '{tool_name}' not found"
+
+        tool = self.tools[tool_name]
+        start = time.perf_counter()
+        try:
+            if context is None:
+                result = tool.execute(**kwargs)
+            else:
+                result = tool.execute_with_context(context, **kwargs)
+        except Exception as e:
+            self._record(context, tool_name, kwargs, None, start, str(e))
+            raise
+        self._record(context, tool_name, kwargs, result, start)
+        return result
+
+    async def aexecute_tool(
+        self, tool_name: str, context: Optional[RetrievalContext] = None, **kwargs
+    ) -> str:
+        """
+        Execute a tool without blocking the event loop.
+
+        Blocking tools run on the manager's executor, so several calls from
+        one round can be awaited concurrently. A call running longer than
+        get_tool_timeout raises TimeoutError; the worker thread of an
+        abandoned blocking call finishes in the background, recording into
+        a closed fork of the context so its sources are dropped.
+        """
         if tool_name not in self.tools:
             return f"Tool '{tool_name}' not found"
 
-        return self.tools[tool_name].execute(**kwargs)
+        tool = self.tools[tool_name]
+        timeout = self.get_tool_timeout(tool_name)
+        fork = context.fork() if context is not None else None
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                tool.aexecute(fork, executor=self.executor, **kwargs), timeout
+            )
+        except asyncio.TimeoutError:
+            if fork is not None:
+                fork.close()
+            error = f"Tool '{tool_name}' timed out after {timeout}s"
+            self._record(context, tool_name, kwargs, None, start, error)
+            raise TimeoutError(error) from None
+        except Exception as e:
+            if fork is not None:
+                context.merge(fork)
+            self._record(context, tool_name, kwargs, None, start, str(e))
+            raise
+        if fork is not None:
+            context.merge(fork)
+        self._record(context, tool_name, kwargs, result, start)
+        return result
+
+    def get_tool_timeout(self, tool_name: str) -> Optional[float]:
+        """Time limit for one call of a tool, or None for no limit"""
+        tool = self.tools.get(tool_name)
+        if tool is not None and tool.timeout is not None:
+            return tool.timeout
+        return self.default_timeout
+
+    @staticmethod
+    def _record(
+        context: Optional[RetrievalContext],
+        tool_name: str,
+        kwargs: Dict[str, Any],
+        result: Optional[str],
+        start: float,
+        error: Optional[str] = None,
+    ):
+        """Record a finished tool call in the metrics and request context"""
+        duration = time.perf_counter() - start
+        tool_seconds.observe(
+            duration, tool=tool_name, outcome="error" if error else "ok"
+        )
+        if context is not None:
+            context.record_tool_call(
+                ToolInvocation(tool_name, kwargs, result, duration, error)
+            )
 
     def get_last_sources(self) -> list:
-        """Get sources from the last search operation"""
+        """Get sources from the last direct (context-free) search operation"""
         # Check all tools for last_sources attribute
         for tool in self.tools.values():
             if hasattr(tool, "last_sources") and tool.last_sources:
@@ -234,7 +374,7 @@ class ToolManager:
         return []
 
     def get_last_source_links(self) -> list:
-        """Get source links from the last search operation"""
+        """Get source links from the last direct (context-free) search operation"""
         # Check all tools for last_source_links attribute
         for tool in self.tools.values():
             if hasattr(tool, "last_source_links") and tool.last_source_links:
@@ -0,0 +1,330 @@
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+BACKENDS = ("memory", "sqlite")
+
+
+@dataclass
+class SessionWrite:
+    """
+    One pending change to a session.
+
+    Appends the (role, content) messages (none just records the session
+    and its access time) and replaces the running summary if one is given,
+    or removes the session entirely when delete is set.
+    """
+
+    session_id: str
+    timestamp: float
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+    delete: bool = False
+    summary: Optional[str] = None
+
+
+def apply_writes(
+    stored: Optional[Tuple[float, List[Tuple[str, str]], str]],
+    writes: List[SessionWrite],
+    max_messages: int,
+) -> Optional[Tuple[float, List[Tuple[str, str]], str]]:
+    """Apply one session's writes to its loaded state, as write_batch would"""
+    for write in writes:
+        if write.delete:
+            stored = None
+            continue
+        last_access, messages, summary = stored or (write.timestamp, [], "")
+        messages = messages + write.messages
+        stored = (
+            max(last_access, write.timestamp),
+            messages[max(0, len(messages) - max_messages) :],
+            summary if write.summary is None else write.summary,
+        )
+    return stored
+
+
+class SessionBackend(Protocol):
+    """Storage shared by every worker that serves the same sessions"""
+
+    def load(
+        self, session_id: str
+    ) -> Optional[Tuple[float, List[Tuple[str, str]], str]]: ...
+
+    def write_batch(self, writes: List[SessionWrite], max_messages: int): ...
+
+    def expire(self, cutoff: float) -> List[str]: ...
+
+    def count(self) -> int: ...
+
+    def close(self): ...
+
+
+class SQLiteSessionBackend:
+    """
+    Sessions in an SQLite database in WAL mode.
+
+    WAL lets readers in every worker process run alongside the single
+    writer, so one database file on a shared volume serves all the
+    workers of a host. A batch of writes is committed in one transaction.
+    """
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, last_access REAL NOT NULL, "
+                "summary TEXT NOT NULL DEFAULT '')"
+            )
+            columns = [
+                row[1] for row in self._db.execute("PRAGMA table_info(sessions)")
+            ]
+            if "summary" not in columns:
+                # Databases created before sessions had summaries
+                self._db.execute(
+                    "ALTER TABLE sessions ADD COLUMN summary TEXT NOT NULL DEFAULT ''"
+                )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS messages "
+                "(session_id TEXT NOT NULL, seq INTEGER NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, "
+                "PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_last_access "
+                "ON sessions (last_access)"
+            )
+            self._db.commit()
+
+    def load(
+        self, session_id: str
+    ) -> Optional[Tuple[float, List[Tuple[str, str]], str]]:
+        """Last access time, messages and summary of a session, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT last_access, summary FROM sessions WHERE id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._db.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? "
+                "ORDER BY seq",
+                (session_id,),
+            ).fetchall()
+        return row[0], [(role, content) for role, content in rows], row[1]
+
+    def write_batch(self, writes: List[SessionWrite], max_messages: int):
+        """Apply writes in order in one transaction, keeping max_messages each"""
+        if not writes:
+            return
+        with self._lock, self._db:
+            for write in writes:
+                if write.delete:
+                    self._db.execute(
+                        "DELETE FROM messages WHERE session_id = ?",
+                        (write.session_id,),
+                    )
+                    self._db.execute(
+                        "DELETE FROM sessions WHERE id = ?", (write.session_id,)
+                    )
+                    continue
+                self._db.execute(
+                    "INSERT INTO sessions (id, last_access) VALUES (?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET "
+                    "last_access = max(last_access, excluded.last_access)",
+                    (write.session_id, write.timestamp),
+                )
+                if write.summary is not None:
+                    self._db.execute(
+                        "UPDATE sessions SET summary = ? WHERE id = ?",
+                        (write.summary, write.session_id),
+                    )
+                if not write.messages:
+                    continue
+                (last_seq,) = self._db.execute(
+                    "SELECT coalesce(max(seq), 0) FROM messages WHERE session_id = ?",
+                    (write.session_id,),
+                ).fetchone()
+                self._db.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (write.session_id, last_seq + i, role, content)
+                        for i, (role, content) in enumerate(write.messages, start=1)
+                    ],
+                )
+                self._db.execute(
+                    "DELETE FROM messages WHERE session_id = ? AND seq <= ?",
+                    (write.session_id, last_seq + len(write.messages) - max_messages),
+                )
+
+    def expire(self, cutoff: float) -> List[str]:
+        """Remove sessions last used before cutoff; returns their ids"""
+        with self._lock, self._db:
+            expired = [
+                row[0]
+                for row in self._db.execute(
+                    "SELECT id FROM sessions WHERE last_access < ?", (cutoff,)
+                )
+            ]
+            self._db.execute(
+                "DELETE FROM messages WHERE session_id IN "
+                "(SELECT id FROM sessions WHERE last_access < ?)",
+                (cutoff,),
+            )
+            self._db.execute("DELETE FROM sessions WHERE last_access < ?", (cutoff,))
+            return expired
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM sessions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def create_session_backend(backend: str, path: str) -> Optional[SessionBackend]:
+    """Open a shared session backend; None keeps sessions in process memory"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown session backend: {backend}")
+    if backend == "sqlite":
+        return SQLiteSessionBackend(path)
+    return None
+
+
+class BatchedSessionWriter:
+    """
+    Queues session writes and commits them in batches on a background thread.
+
+    Requests only append to an in-memory queue; the thread commits whatever
+    has accumulated every flush_interval seconds, or as soon as max_batch
+    writes are waiting, in one transaction. A batch that fails, e.g. on a
+    busy timeout while other workers write, goes back to the front of the
+    queue and is retried with exponential backoff; after max_attempts
+    failures in a row it is dropped and counted in dropped_writes.
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        max_messages: int,
+        flush_interval: float = 0.05,
+        max_batch: int = 256,
+        max_attempts: int = 5,
+    ):
+        self.backend = backend
+        self.max_messages = max_messages
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+        self._pending: List[SessionWrite] = []
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.writes = 0
+        self.errors = 0
+        self.dropped = 0
+        self._failures = 0  # Consecutive failed flushes
+
+    def put(self, write: SessionWrite):
+        """Queue a write, starting the flush thread on first use"""
+        with self._condition:
+            self._pending.append(write)
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(
+                    target=self._run, name="session-writer", daemon=True
+                )
+                self._thread.start()
+            if len(self._pending) >= self.max_batch:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped and not self._pending:
+                    return
+                if self._failures and not self._stopped:
+                    self._condition.wait(self.flush_interval * 2**self._failures)
+                elif len(self._pending) < self.max_batch and not self._stopped:
+                    self._condition.wait(self.flush_interval)
+            self.flush()
+
+    def load(
+        self, session_id: str
+    ) -> Optional[Tuple[float, List[Tuple[str, str]], str]]:
+        """
+        A session as stored, with this writer's queued writes applied.
+
+        Nothing is flushed; holding the flush lock only keeps a batch from
+        committing between reading the backend and reading the queue.
+        """
+        with self._flush_lock:
+            stored = self.backend.load(session_id)
+            with self._condition:
+                writes = [w for w in self._pending if w.session_id == session_id]
+        return apply_writes(stored, writes, self.max_messages)
+
+    def flush(self):
+        """Commit every queued write now, on the calling thread"""
+        with self._flush_lock:
+            with self._condition:
+                writes, self._pending = self._pending, []
+            if not writes:
+                return
+            try:
+                self.backend.write_batch(writes, self.max_messages)
+            except sqlite3.Error as e:
+                self.errors += 1
+                self._failures += 1
+                if self._failures >= self.max_attempts:
+                    self._failures = 0
+                    self.dropped += len(writes)
+                    print(f"Dropping {len(writes)} session updates: {e}")
+                else:
+                    # Retried first so each session's writes stay in order
+                    with self._condition:
+                        self._pending[:0] = writes
+                    print(f"Error writing {len(writes)} session updates: {e}")
+                return
+            self._failures = 0
+            self.batches += 1
+            self.writes += len(writes)
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Flush the queue and stop the thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_writes": self.pending,
+            "batches": self.batches,
+            "writes": self.writes,
+            "write_errors": self.errors,
+            "dropped_writes": self.dropped,
+        }
@@ -1,5 +1,18 @@
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from session_backend import BatchedSessionWriter, SessionBackend, SessionWrite
+from session_summary import SessionSummarizer, extractive_summary
+from token_budget import MESSAGE_OVERHEAD_TOKENS, estimate_tokens, fit_messages
+
+# How a running summary is presented ahead of the recent turns
+SUMMARY_HEADING = "Summary of our earlier conversation:"
+SUMMARY_ACKNOWLEDGEMENT = "Understood, I will keep that context in mind."
 
 
 @dataclass
@@ -10,56 +23,376 @@ class Message:
     content: str  # The message content
 
 
+class MessageHistory(deque):
+    """
+    Ring buffer of a session's most recent messages.
+
+    Appending past maxlen drops the oldest message in O(1). Each history
+    carries its own lock, so concurrent requests on one session never
+    interleave their exchanges, and records when it was last used and when
+    it was loaded from a shared backend. With compaction, summary holds the
+    turns that fell out of the buffer and unsummarized the ones still
+    waiting to be folded into it.
+    """
+
+    def __init__(self, maxlen: int, last_access: float, summary: str = ""):
+        super().__init__(maxlen=maxlen)
+        self.lock = threading.Lock()
+        self.last_access = last_access
+        self.loaded_at = last_access
+        self.summary = summary
+        self.unsummarized: List[Message] = []
+
+
 class SessionManager:
-    """Manages conversation sessions and message history"""
+    """
+    Manages conversation sessions and message history.
+
+    Sessions idle for longer than ttl_seconds expire, either when next
+    looked up or when the background sweeper runs, and the least recently
+    used sessions are evicted beyond max_sessions, so abandoned sessions
+    cannot grow memory without bound.
+
+    With a shared backend every worker sees the same sessions: ids are
+    random rather than per-process counters, writes are queued and
+    committed in batches, and the in-memory sessions act as a read cache
+    that is reloaded from the backend once older than cache_ttl seconds.
 
-    def __init__(self, max_history: int = 5):
+    With a summarizer, turns pushed out of the max_history window are
+    folded into a running summary off the request path, and the summary is
+    sent ahead of the recent turns, so long sessions keep their context at
+    a bounded prompt size.
+    """
+
+    def __init__(
+        self,
+        max_history: int = 5,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 3600.0,
+        sweep_interval: float = 60.0,
+        backend: Optional[SessionBackend] = None,
+        cache_ttl: float = 60.0,
+        write_interval: float = 0.05,
+        summarizer: Optional[SessionSummarizer] = None,
+        clock: Callable[[], float] = time.time,
+    ):
         self.max_history = max_history
-        self.sessions: Dict[str, List[Message]] = {}
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        # Wall-clock by default: access times are shared between processes
+        self.clock = clock
+        self.backend = backend
+        self.cache_ttl = cache_ttl
+        self.summarizer = summarizer
+        self.writer = (
+            BatchedSessionWriter(backend, max_history * 2, write_interval)
+            if backend is not None
+            else None
+        )
+        self.sessions: "OrderedDict[str, MessageHistory]" = OrderedDict()
         self.session_counter = 0
+        self._lock = threading.Lock()
+        self._stop_sweeper = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.cache_hits = 0
+        self.cache_loads = 0
+
+    def _expired(self, history: MessageHistory, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - history.last_access > self.ttl_seconds
+
+    def _install(self, session_id: str, history: MessageHistory) -> MessageHistory:
+        """Register a history, evicting the least recently used if full"""
+        self.sessions[session_id] = history
+        self.sessions.move_to_end(session_id)
+        while len(self.sessions) > max(1, self.max_sessions):
+            self.sessions.popitem(last=False)
+            self.evictions += 1
+        return history
+
+    def _new_history(self, session_id: str, now: float) -> MessageHistory:
+        self.created += 1
+        if self.writer is not None:
+            self.writer.put(SessionWrite(session_id, now))
+        return self._install(session_id, MessageHistory(self.max_history * 2, now))
+
+    def _get(self, session_id: str, create: bool = False) -> Optional[MessageHistory]:
+        """Look up a live session and mark it as used"""
+        now = self.clock()
+        with self._lock:
+            history = self.sessions.get(session_id)
+            if history is not None and self._expired(history, now):
+                del self.sessions[session_id]
+                self.expirations += 1
+                history = None
+            if history is not None and (
+                self.backend is None or now - history.loaded_at <= self.cache_ttl
+            ):
+                history.last_access = now
+                self.sessions.move_to_end(session_id)
+                if self.backend is not None:
+                    self.cache_hits += 1
+                    self.writer.put(SessionWrite(session_id, now))
+                return history
+            if self.backend is None:
+                return self._new_history(session_id, now) if create else None
+
+        # Another worker may have changed the session since it was cached;
+        # writes still queued here are merged in rather than flushed
+        stored = self.writer.load(session_id)
+        with self._lock:
+            self.cache_loads += 1
+            if stored is None or now - stored[0] > self.ttl_seconds > 0:
+                self.sessions.pop(session_id, None)
+                return self._new_history(session_id, now) if create else None
+            history = MessageHistory(self.max_history * 2, now, stored[2])
+            history.extend(Message(role, content) for role, content in stored[1])
+            self.writer.put(SessionWrite(session_id, now))
+            return self._install(session_id, history)
 
     def create_session(self) -> str:
         """Create a new conversation session"""
-        self.session_counter += 1
-        session_id = f"session_{self.session_counter}"
-        self.sessions[session_id] = []
+        with self._lock:
+            if self.backend is not None:
+                # Unique across every worker sharing the backend
+                session_id = f"session_{uuid.uuid4().hex}"
+            else:
+                self.session_counter += 1
+                session_id = f"session_{self.session_counter}"
+            self._new_history(session_id, self.clock())
         return session_id
 
+    def _persist(self, session_id: str, messages: List[Message]):
+        if self.writer is not None:
+            self.writer.put(
+                SessionWrite(
+                    session_id,
+                    self.clock(),
+                    [(msg.role, msg.content) for msg in messages],
+                )
+            )
+
+    def _append(self, session_id: str, history: MessageHistory, messages: List):
+        """Append messages (history lock held), compacting what falls out"""
+        overflow = len(history) + len(messages) - (history.maxlen or 0)
+        dropped = list(history)[:overflow] if self.summarizer and overflow > 0 else []
+        history.extend(messages)
+        self._persist(session_id, messages)
+        if dropped:
+            history.unsummarized.extend(dropped)
+            self.summarizer.submit(lambda: self._compact(session_id, history, dropped))
+
+    def _compact(
+        self, session_id: str, history: MessageHistory, dropped: List[Message]
+    ):
+        """Fold dropped messages into the running summary (background thread)"""
+        with history.lock:
+            previous = history.summary
+        summary = self.summarizer.compact(
+            previous, [{"role": msg.role, "content": msg.content} for msg in dropped]
+        )
+        with history.lock:
+            history.summary = summary
+            del history.unsummarized[: len(dropped)]
+        if self.writer is not None:
+            self.writer.put(SessionWrite(session_id, self.clock(), summary=summary))
+
     def add_message(self, session_id: str, role: str, content: str):
         """Add a message to the conversation history"""
-        if session_id not in self.sessions:
-            self.sessions[session_id] = []
-
+        history = self._get(session_id, create=True)
         message = Message(role=role, content=content)
-        self.sessions[session_id].append(message)
-
-        # Keep conversation history within limits
-        if len(self.sessions[session_id]) > self.max_history * 2:
-            self.sessions[session_id] = self.sessions[session_id][
-                -self.max_history * 2 :
-            ]
+        with history.lock:
+            self._append(session_id, history, [message])
 
     def add_exchange(self, session_id: str, user_message: str, assistant_message: str):
         """Add a complete question-answer exchange"""
-        self.add_message(session_id, "user", user_message)
-        self.add_message(session_id, "assistant", assistant_message)
+        history = self._get(session_id, create=True)
+        messages = [
+            Message(role="user", content=user_message),
+            Message(role="assistant", content=assistant_message),
+        ]
+        with history.lock:
+            self._append(session_id, history, messages)
 
-    def get_conversation_history(self, session_id: Optional[str]) -> Optional[str]:
-        """Get formatted conversation history for a session"""
-        if not session_id or session_id not in self.sessions:
-            return None
+    def _snapshot(self, session_id: Optional[str]) -> Tuple[str, List[Message]]:
+        """A session's summary and messages; empty if unknown or expired"""
+        if not session_id:
+            return "", []
+        history = self._get(session_id)
+        if history is None:
+            return "", []
+        with history.lock:
+            summary, pending = history.summary, list(history.unsummarized)
+            messages = list(history)
+        if pending:
+            # Compaction is still running; cover its turns extractively
+            summary = extractive_summary(
+                summary,
+                [{"role": msg.role, "content": msg.content} for msg in pending],
+                self.summarizer.max_tokens,
+            )
+        return summary, messages
 
-        messages = self.sessions[session_id]
-        if not messages:
+    def _history(
+        self, session_id: Optional[str], max_tokens: Optional[int]
+    ) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        A session's summary and messages as dicts, within max_tokens.
+
+        The summary is budgeted first, then the oldest exchanges that do not
+        fit are left out.
+        """
+        summary, stored = self._snapshot(session_id)
+        messages = [{"role": msg.role, "content": msg.content} for msg in stored]
+        if max_tokens is not None:
+            if summary:
+                summary_tokens = (
+                    estimate_tokens(summary)
+                    + estimate_tokens(SUMMARY_HEADING + SUMMARY_ACKNOWLEDGEMENT)
+                    + 2 * MESSAGE_OVERHEAD_TOKENS
+                )
+                if summary_tokens > max_tokens:
+                    summary = ""
+                else:
+                    max_tokens -= summary_tokens
+            messages = fit_messages(messages, max_tokens)
+        return summary, messages
+
+    def get_conversation_history(
+        self, session_id: Optional[str], max_tokens: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Get formatted conversation history for a session.
+
+        Args:
+            session_id: Session to read
+            max_tokens: Estimated token budget; the oldest exchanges that do
+                not fit are left out (default: no limit)
+        """
+        summary, messages = self._history(session_id, max_tokens)
+        if not messages and not summary:
             return None
 
         # Format messages for context
         formatted_messages = []
+        if summary:
+            formatted_messages.append(f"{SUMMARY_HEADING}\n{summary}")
         for msg in messages:
-            formatted_messages.append(f"{msg.role.title()}: {msg.content}")
+            formatted_messages.append(f"{msg['role'].title()}: {msg['content']}")
 
         return "\n".join(formatted_messages)
 
+    def get_history_messages(
+        self, session_id: Optional[str], max_tokens: Optional[int] = None
+    ) -> Optional[List[Dict[str, str]]]:
+        """Get conversation history as API messages, within max_tokens if given"""
+        summary, messages = self._history(session_id, max_tokens)
+        if summary:
+            # Keeps user/assistant alternation ahead of the recent turns
+            messages = [
+                {"role": "user", "content": f"{SUMMARY_HEADING}\n{summary}"},
+                {"role": "assistant", "content": SUMMARY_ACKNOWLEDGEMENT},
+            ] + messages
+        return messages or None
+
     def clear_session(self, session_id: str):
         """Remove a session entirely to free memory"""
-        self.sessions.pop(session_id, None)
+        with self._lock:
+            self.sessions.pop(session_id, None)
+        if self.writer is not None:
+            self.writer.put(SessionWrite(session_id, self.clock(), delete=True))
+
+    def sweep_expired(self) -> int:
+        """Remove every session idle past the TTL; returns how many expired"""
+        if self.ttl_seconds <= 0:
+            return 0
+        now = self.clock()
+        with self._lock:
+            # Sessions are kept in access order, so expired ones come first
+            expired = []
+            for session_id, history in self.sessions.items():
+                if not self._expired(history, now):
+                    break
+                expired.append(session_id)
+            for session_id in expired:
+                del self.sessions[session_id]
+            self.expirations += len(expired)
+        if self.backend is None:
+            return len(expired)
+        self.writer.flush()
+        # Outside the lock: the delete may wait on other workers' writes
+        shared = self.backend.expire(now - self.ttl_seconds)
+        # Sessions expired above are in the database too; count them once
+        removed = len(set(shared).union(expired))
+        with self._lock:
+            self.expirations += removed - len(expired)
+        return removed
+
+    def _sweep_loop(self):
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            self.sweep_expired()
+
+    def start_sweeper(self):
+        """Start the background thread that expires idle sessions"""
+        if self.sweep_interval <= 0 or (self._sweeper and self._sweeper.is_alive()):
+            return
+        self._stop_sweeper.clear()
+        self._sweeper = threading.Thread(
+            target=self._sweep_loop, name="session-sweeper", daemon=True
+        )
+        self._sweeper.start()
+
+    def stop_sweeper(self, timeout: Optional[float] = None):
+        """Stop the sweeper thread"""
+        if self._sweeper and self._sweeper.is_alive():
+            self._stop_sweeper.set()
+            self._sweeper.join(timeout)
+        self._sweeper = None
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop background threads and commit queued writes to the backend"""
+        self.stop_sweeper(timeout)
+        if self.summarizer is not None:
+            self.summarizer.shutdown()
+        if self.writer is not None:
+            self.writer.stop(timeout)
+            self.backend.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy, approximate memory and eviction counters for monitoring"""
+        with self._lock:
+            histories = list(self.sessions.values())
+            counters = {
+                "sessions": len(histories),
+                "max_sessions": self.max_sessions,
+                "occupancy": len(histories) / max(1, self.max_sessions),
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+        messages = 0
+        memory_bytes = 0
+        for history in histories:
+            with history.lock:
+                messages += len(history)
+                memory_bytes += sys.getsizeof(history) + sum(
+                    sys.getsizeof(msg) + sys.getsizeof(msg.content) for msg in history
+                )
+        counters["messages"] = messages
+        counters["memory_bytes"] = memory_bytes
+        if self.backend is not None:
+            counters["backend"] = type(self.backend).__name__
+            counters["shared_sessions"] = self.backend.count()
+            counters["cache_hits"] = self.cache_hits
+            counters["cache_loads"] = self.cache_loads
+            counters.update(self.writer.stats())
+        if self.summarizer is not None:
+            counters.update(self.summarizer.stats())
+        return counters
@@ -0,0 +1,102 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from token_budget import estimate_tokens
+
+# Model summarizer: (previous summary, messages to fold in, max tokens) -> summary
+SummarizeFunction = Callable[[str, List[Dict[str, str]], int], str]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _first_sentence(text: str, max_chars: int = 200) -> str:
+    sentence = _SENTENCE_END.split(text.strip(), maxsplit=1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rstrip() + "..."
+    return " ".join(sentence.split())
+
+
+def extractive_summary(
+    previous_summary: str, messages: List[Dict[str, str]], max_tokens: int
+) -> str:
+    """
+    Fold messages into a summary without calling a model.
+
+    Keeps each question and the first sentence of each answer as one
+    line, and drops the oldest lines once the summary exceeds max_tokens.
+    """
+    lines = [line for line in previous_summary.splitlines() if line.strip()]
+    for message in messages:
+        gist = _first_sentence(message["content"])
+        if not gist:
+            continue
+        prefix = "Asked" if message["role"] == "user" else "Answered"
+        lines.append(f"- {prefix}: {gist}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class SessionSummarizer:
+    """
+    Folds turns that fall out of a session's window into a running summary.
+
+    Compaction runs on a single background thread, so it never adds latency
+    to the request that pushed the turns out, and jobs for a session run
+    in the order they were submitted. The model summarizer is used when
+    given; if it fails, or none is configured, the summary is extractive.
+    """
+
+    def __init__(
+        self,
+        summarize: Optional[SummarizeFunction] = None,
+        max_tokens: int = 300,
+    ):
+        self.summarize = summarize
+        self.max_tokens = max_tokens
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="session-summary"
+        )
+        self._lock = threading.Lock()
+        self.compactions = 0
+        self.model_summaries = 0
+        self.fallbacks = 0
+
+    def compact(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        """Summarize messages into the previous summary on the calling thread"""
+        summary = None
+        if self.summarize is not None:
+            try:
+                summary = self.summarize(previous_summary, messages, self.max_tokens)
+            except Exception as e:
+                print(f"Session summarization failed, using extractive summary: {e}")
+        with self._lock:
+            self.compactions += 1
+            if summary:
+                self.model_summaries += 1
+            else:
+                self.fallbacks += 1
+        return summary or extractive_summary(
+            previous_summary, messages, self.max_tokens
+        )
+
+    def submit(self, job: Callable[[], None]):
+        """Run a compaction job on the background thread"""
+        self._executor.submit(job)
+
+    def wait(self):
+        """Block until every job submitted so far has finished"""
+        self._executor.submit(lambda: None).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "compactions": self.compactions,
+                "model_summaries": self.model_summaries,
+                "fallback_summaries": self.fallbacks,
+            }
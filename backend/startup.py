@@ -0,0 +1,181 @@
+"""
+Startup profiling, lazy module imports and background warm-up.
+
+The profile records how long each startup phase took, measured from the
+moment this module was first imported. For a per-module breakdown of
+import time, run the app with python -X importtime.
+"""
+
+import importlib
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StartupProfile:
+    """Timeline of named startup phases"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self._origin = clock()
+        self._phases: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        """Seconds since the profile was created"""
+        return self._clock() - self._origin
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        start: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        """
+        Add a finished phase.
+
+        Args:
+            name: Phase name
+            seconds: Phase duration
+            start: Offset from the profile origin (default: now - seconds)
+            error: Error message if the phase failed
+        """
+        if start is None:
+            start = self.elapsed() - seconds
+        entry = {"name": name, "start": start, "seconds": seconds}
+        if error is not None:
+            entry["error"] = error
+        with self._lock:
+            self._phases.append(entry)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one phase"""
+        start = self.elapsed()
+        try:
+            yield
+        except BaseException as e:
+            self.record(name, self.elapsed() - start, start, error=str(e))
+            raise
+        self.record(name, self.elapsed() - start, start)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = [dict(phase) for phase in self._phases]
+        return {"uptime": self.elapsed(), "phases": phases}
+
+
+# Process-wide profile, started when the app first imports this module
+startup_profile = StartupProfile()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module stand-in that imports the real module on first attribute access.
+
+    Keeps heavy dependencies such as chromadb out of import time; the
+    deferred import is recorded in the startup profile.
+    """
+
+    def __init__(self, name: str, profile: StartupProfile = startup_profile):
+        super().__init__(name)
+        self._module: Optional[types.ModuleType] = None
+        self._profile = profile
+        self._lock = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        with self._lock:
+            if self._module is None:
+                with self._profile.phase(f"import {self.__name__}"):
+                    self._module = importlib.import_module(self.__name__)
+            return self._module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+
+class WarmUp:
+    """
+    Runs named warm-up steps in order on a background thread.
+
+    Each step is timed in the startup profile. A failing step is recorded
+    and the remaining steps still run, so one missing component does not
+    leave the others cold. Failed steps are then retried with exponential
+    backoff, so a transient error such as a model download hiccup does not
+    keep the process unready; by default they are retried until they pass.
+    """
+
+    def __init__(
+        self,
+        steps: List[Tuple[str, Callable[[], Any]]],
+        profile: StartupProfile = startup_profile,
+        max_attempts: Optional[int] = None,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.steps = steps
+        self.profile = profile
+        self.max_attempts = max_attempts  # Runs per step (None: until it passes)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self.status = "pending"  # pending, running, retrying, completed or failed
+        self.errors: Dict[str, str] = {}
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def start(self) -> "WarmUp":
+        """Start the steps on a daemon thread; later calls do nothing"""
+        if self._thread is None:
+            self.status = "running"
+            self._thread = threading.Thread(
+                target=self.run, name="warm-up", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def run(self):
+        """Run every step on the calling thread, retrying the failed ones"""
+        self.status = "running"
+        pending = list(self.steps)
+        attempt = 1
+        while True:
+            failed = []
+            for name, step in pending:
+                phase = f"warm-up: {name}"
+                if attempt > 1:
+                    phase += f" (attempt {attempt})"
+                try:
+                    with self.profile.phase(phase):
+                        step()
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    failed.append((name, step))
+                    print(f"Warm-up step '{name}' failed: {e}")
+                else:
+                    self.errors.pop(name, None)
+            pending = failed
+            if not pending or (
+                self.max_attempts is not None and attempt >= self.max_attempts
+            ):
+                break
+            self.status = "retrying"
+            self._sleep(min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+            attempt += 1
+        self.status = "failed" if self.errors else "completed"
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the steps have run; False if the timeout expired"""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "errors": dict(self.errors)}
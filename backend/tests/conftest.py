@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 import tempfile
@@ -161,6 +162,7 @@ def mock_tool_manager():
         }
     ]
     mock.execute_tool.return_value = "Mock search result"
+    mock.get_tool_timeout.return_value = None
     mock.get_last_sources.return_value = ["Test Course - Lesson 1"]
     mock.get_last_source_links.return_value = ["https://example.com/lesson1"]
     return mock
@@ -177,6 +179,7 @@ def test_config():
         CHUNK_OVERLAP=100,
         MAX_RESULTS=5,  # Set to proper value, not 0
         MAX_HISTORY=2,
+        ANSWER_CACHE_SIZE=0,
         CHROMA_PATH="./test_chroma_db",
     )
 
@@ -192,6 +195,7 @@ def broken_config():
         CHUNK_OVERLAP=100,
         MAX_RESULTS=0,  # This is the broken setting
         MAX_HISTORY=2,
+        ANSWER_CACHE_SIZE=0,
         CHROMA_PATH="./test_chroma_db",
     )
 
@@ -276,6 +280,7 @@ def test_app():
     from fastapi import FastAPI
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.middleware.trustedhost import TrustedHostMiddleware
+    from fastapi.responses import StreamingResponse
     from pydantic import BaseModel
     from typing import List, Optional
     
@@ -350,6 +355,43 @@ def test_app():
         mock_rag.session_manager.clear_session(request.session_id)
         return {"status": "success", "message": "Session cleared successfully"}
     
+    async def fake_stream_query(query, session_id):
+        yield {"type": "round", "round": 1, "final": False}
+        yield {"type": "tool_use", "round": 1, "tools": ["search_course_content"]}
+        yield {"type": "tool_results", "round": 1}
+        yield {
+            "type": "sources",
+            "sources": ["Building Towards Computer Use with Anthropic - Lesson 1"],
+            "source_links": ["https://example.com/lesson1"],
+        }
+        yield {"type": "token", "text": "This is a test "}
+        yield {"type": "token", "text": "streamed response."}
+        yield {
+            "type": "done",
+            "answer": "This is a test streamed response.",
+            "sources": ["Building Towards Computer Use with Anthropic - Lesson 1"],
+            "source_links": ["https://example.com/lesson1"],
+        }
+
+    mock_rag.astream_query = fake_stream_query
+
+    def format_sse(event, data):
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+    @app.post("/api/query/stream")
+    async def stream_query(request: QueryRequest):
+        session_id = request.session_id or mock_rag.session_manager.create_session()
+
+        async def event_stream():
+            yield format_sse("session", {"session_id": session_id})
+            async for event in mock_rag.astream_query(request.query, session_id):
+                event_type = event.pop("type")
+                if event_type == "done":
+                    event["session_id"] = session_id
+                yield format_sse(event_type, event)
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
     @app.get("/")
     async def root():
         return {"message": "Course Materials RAG System API"}
@@ -357,6 +399,15 @@ def test_app():
     return app
 
 
+@pytest.fixture
+def app_module(monkeypatch):
+    """The real app module, imported from backend/ so its static mount resolves"""
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import app
+
+    return app
+
+
 @pytest.fixture
 def client(test_app):
     """Create a test client for the FastAPI app"""
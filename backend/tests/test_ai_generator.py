@@ -1,6 +1,7 @@
+import asyncio
 import os
 import sys
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -8,6 +9,17 @@ import pytest
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ai_generator import AIGenerator
+from metrics import anthropic_round_seconds
+from retrieval_context import RetrievalContext
+
+
+def _tool_block(name, tool_id, tool_input):
+    block = Mock()
+    block.type = "tool_use"
+    block.name = name
+    block.id = tool_id
+    block.input = tool_input
+    return block
 
 
 class TestAIGenerator:
@@ -24,7 +36,7 @@ class TestAIGenerator:
 
     def test_generate_response_without_tools(self, mock_anthropic_client):
         """Test basic response generation without tools"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_anthropic.return_value = mock_anthropic_client
 
             generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
@@ -47,7 +59,7 @@ class TestAIGenerator:
 
     def test_generate_response_with_conversation_history(self, mock_anthropic_client):
         """Test response generation with conversation history"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_anthropic.return_value = mock_anthropic_client
 
             generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
@@ -64,11 +76,35 @@ class TestAIGenerator:
             call_args = mock_anthropic_client.messages.create.call_args[1]
             assert "Previous conversation context" in call_args["system"]
 
+    def test_summarize_conversation(self, mock_anthropic_client):
+        """Test folding turns into a running summary with one plain call"""
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
+            mock_anthropic.return_value = mock_anthropic_client
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            summary = generator.summarize_conversation(
+                "- Asked about MCP",
+                [
+                    {"role": "user", "content": "What is RAG?"},
+                    {"role": "assistant", "content": "Retrieval-augmented."},
+                ],
+                max_tokens=120,
+            )
+
+            assert summary == "This is a test response from Claude."
+            call_args = mock_anthropic_client.messages.create.call_args[1]
+            assert call_args["system"] == AIGenerator.SUMMARY_PROMPT
+            assert call_args["max_tokens"] == 120
+            assert "tools" not in call_args
+            content = call_args["messages"][0]["content"]
+            assert "- Asked about MCP" in content
+            assert "User: What is RAG?" in content
+
     def test_generate_response_with_tools_no_tool_use(
         self, mock_anthropic_client, mock_tool_manager
     ):
         """Test response generation with tools available but not used"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_anthropic.return_value = mock_anthropic_client
 
             generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
@@ -89,7 +125,7 @@ class TestAIGenerator:
 
     def test_generate_response_with_tool_use(self, mock_tool_manager):
         """Test response generation when Claude requests tool use"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -132,7 +168,7 @@ class TestAIGenerator:
 
     def test_generate_response_tool_use_multiple_tools(self, mock_tool_manager):
         """Test response generation when Claude requests multiple tools"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -185,7 +221,7 @@ class TestAIGenerator:
 
     def test_handle_tool_execution_conversation_flow(self, mock_tool_manager):
         """Test that tool execution properly maintains conversation flow"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -231,7 +267,7 @@ class TestAIGenerator:
 
     def test_generate_response_tool_execution_error(self, mock_tool_manager):
         """Test handling when tool execution fails"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -286,7 +322,7 @@ class TestAIGenerator:
 
     def test_api_parameters_consistency(self, mock_anthropic_client):
         """Test that API parameters are consistent across calls"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_anthropic.return_value = mock_anthropic_client
 
             generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
@@ -308,7 +344,7 @@ class TestAIGenerator:
 
     def test_no_tool_manager_with_tool_use(self):
         """Test behavior when tools are requested but no tool_manager provided"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -335,7 +371,7 @@ class TestAIGenerator:
 
     def test_empty_tool_results(self, mock_tool_manager):
         """Test handling when no tool calls are made in tool_use response"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -370,7 +406,7 @@ class TestAIGenerator:
 
     def test_sequential_tool_calling_two_rounds(self, mock_tool_manager):
         """Test sequential tool calling over 2 rounds"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -434,7 +470,7 @@ class TestAIGenerator:
 
     def test_sequential_tool_calling_early_termination(self, mock_tool_manager):
         """Test that sequential tool calling terminates early when AI doesn't use tools"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -480,7 +516,7 @@ class TestAIGenerator:
 
     def test_sequential_tool_calling_tool_failure_stops_rounds(self, mock_tool_manager):
         """Test that tool execution failure stops sequential rounds"""
-        with patch("ai_generator.anthropic.Anthropic") as mock_anthropic:
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
             mock_client = Mock()
             mock_anthropic.return_value = mock_client
 
@@ -529,3 +565,570 @@ class TestAIGenerator:
                 "Error: Tool execution failed"
                 in tool_result_message["content"][0]["content"]
             )
+
+    def test_tools_in_one_round_run_concurrently(self, mock_tool_manager):
+        """Test that a round's tool calls overlap and keep request order"""
+        import threading
+
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
+            mock_client = Mock()
+            mock_anthropic.return_value = mock_client
+
+            round1_response = Mock()
+            round1_response.stop_reason = "tool_use"
+            round1_response.content = [
+                _tool_block("search_course_content", "tool_1", {"query": "a"}),
+                _tool_block("search_course_content", "tool_2", {"query": "b"}),
+            ]
+            final_response = Mock()
+            final_response.stop_reason = "end_turn"
+            final_response.content = [Mock()]
+            final_response.content[0].text = "Combined answer."
+            mock_client.messages.create.side_effect = [round1_response, final_response]
+
+            # Both calls must be in flight at once to pass the barrier
+            barrier = threading.Barrier(2, timeout=5)
+
+            def execute(name, query):
+                barrier.wait()
+                return f"result {query}"
+
+            mock_tool_manager.execute_tool.side_effect = execute
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            response = generator.generate_response(
+                "Compare a and b",
+                tools=mock_tool_manager.get_tool_definitions(),
+                tool_manager=mock_tool_manager,
+            )
+
+            assert response == "Combined answer."
+            final_call_args = mock_client.messages.create.call_args_list[1][1]
+            tool_results = final_call_args["messages"][-1]["content"]
+            assert [r["tool_use_id"] for r in tool_results] == ["tool_1", "tool_2"]
+            assert [r["content"] for r in tool_results] == ["result a", "result b"]
+
+    def test_tool_timeout_reported_as_error(self, mock_tool_manager):
+        """Test that a tool exceeding its timeout is reported to the model"""
+        import threading
+
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
+            mock_client = Mock()
+            mock_anthropic.return_value = mock_client
+
+            round1_response = Mock()
+            round1_response.stop_reason = "tool_use"
+            round1_response.content = [
+                _tool_block("search_course_content", "tool_1", {"query": "slow"})
+            ]
+            final_response = Mock()
+            final_response.content = [Mock()]
+            final_response.content[0].text = "Search took too long."
+            mock_client.messages.create.side_effect = [round1_response, final_response]
+
+            release = threading.Event()
+            mock_tool_manager.get_tool_timeout.return_value = 0.05
+            mock_tool_manager.execute_tool.side_effect = lambda *a, **k: release.wait(5)
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            try:
+                response = generator.generate_response(
+                    "Search slowly",
+                    tools=mock_tool_manager.get_tool_definitions(),
+                    tool_manager=mock_tool_manager,
+                )
+            finally:
+                release.set()
+
+            assert response == "Search took too long."
+            # A failed round ends tool use: round 1 plus the final answer
+            assert mock_client.messages.create.call_count == 2
+            final_call_args = mock_client.messages.create.call_args_list[1][1]
+            content = final_call_args["messages"][-1]["content"][0]["content"]
+            assert "timed out after 0.05s" in content
+
+    def test_timed_out_tool_cannot_add_sources_later(self, mock_tool_manager):
+        """Test that a tool finishing after its timeout leaves the context alone"""
+        import threading
+
+        with patch("anthropic_client.anthropic.Anthropic") as mock_anthropic:
+            mock_client = Mock()
+            mock_anthropic.return_value = mock_client
+
+            round1_response = Mock()
+            round1_response.stop_reason = "tool_use"
+            round1_response.content = [
+                _tool_block("search_course_content", "tool_1", {"query": "fast"}),
+                _tool_block("search_course_content", "tool_2", {"query": "slow"}),
+            ]
+            final_response = Mock()
+            final_response.content = [Mock()]
+            final_response.content[0].text = "Partial answer."
+            mock_client.messages.create.side_effect = [round1_response, final_response]
+
+            release, finished = threading.Event(), threading.Event()
+
+            def execute(name, query, context):
+                if query == "slow":
+                    release.wait(5)
+                context.add_sources([f"{query} source"], [None])
+                if query == "slow":
+                    finished.set()
+                return f"result {query}"
+
+            mock_tool_manager.get_tool_timeout.return_value = 0.05
+            mock_tool_manager.execute_tool.side_effect = execute
+
+            context = RetrievalContext()
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            try:
+                response = generator.generate_response(
+                    "Search fast and slow",
+                    tools=mock_tool_manager.get_tool_definitions(),
+                    tool_manager=mock_tool_manager,
+                    context=context,
+                )
+            finally:
+                release.set()
+            assert finished.wait(5)
+
+            assert response == "Partial answer."
+            assert context.get_sources() == (["fast source"], [None])
+            assert [call.error for call in context.tool_calls] == [
+                "Tool 'search_course_content' timed out after 0.05s"
+            ]
+
+
+class TestAsyncAIGenerator:
+    """Test cases for the async generation path"""
+
+    def test_agenerate_response_without_tools(self, mock_anthropic_client):
+        """Test async response generation awaits the async client"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_client.messages.create = AsyncMock(
+                return_value=mock_anthropic_client.messages.create.return_value
+            )
+            mock_async_anthropic.return_value = mock_async_client
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+
+            response = asyncio.run(generator.agenerate_response("What is AI?"))
+
+            assert response == "This is a test response from Claude."
+            mock_async_client.messages.create.assert_awaited_once()
+            call_args = mock_async_client.messages.create.call_args[1]
+            assert call_args["messages"] == [{"role": "user", "content": "What is AI?"}]
+            assert "tools" not in call_args
+
+    def test_agenerate_response_with_tool_use(self, mock_tool_manager):
+        """Test async tool rounds dispatch through aexecute_tool"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_anthropic.return_value = mock_async_client
+
+            initial_response = Mock()
+            initial_response.stop_reason = "tool_use"
+            initial_response.content = [Mock()]
+            initial_response.content[0].type = "tool_use"
+            initial_response.content[0].name = "search_course_content"
+            initial_response.content[0].id = "tool_123"
+            initial_response.content[0].input = {"query": "test query"}
+
+            final_response = Mock()
+            final_response.stop_reason = "end_turn"
+            final_response.content = [Mock()]
+            final_response.content[0].text = "Async answer."
+
+            mock_async_client.messages.create = AsyncMock(
+                side_effect=[initial_response, final_response]
+            )
+            mock_tool_manager.aexecute_tool = AsyncMock(return_value="Async result")
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+
+            response = asyncio.run(
+                generator.agenerate_response(
+                    "What is in lesson 1?",
+                    tools=mock_tool_manager.get_tool_definitions(),
+                    tool_manager=mock_tool_manager,
+                )
+            )
+
+            assert response == "Async answer."
+            mock_tool_manager.aexecute_tool.assert_awaited_once_with(
+                "search_course_content", query="test query"
+            )
+            mock_tool_manager.execute_tool.assert_not_called()
+
+            final_call_args = mock_async_client.messages.create.call_args_list[1][1]
+            tool_result = final_call_args["messages"][2]["content"][0]
+            assert tool_result["content"] == "Async result"
+
+    def test_agenerate_response_tool_failure_stops_rounds(self, mock_tool_manager):
+        """Test that an async tool failure forces the final tool-less call"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_anthropic.return_value = mock_async_client
+
+            round1_response = Mock()
+            round1_response.stop_reason = "tool_use"
+            round1_response.content = [Mock()]
+            round1_response.content[0].type = "tool_use"
+            round1_response.content[0].name = "search_course_content"
+            round1_response.content[0].id = "tool_1"
+            round1_response.content[0].input = {"query": "test query"}
+
+            final_response = Mock()
+            final_response.content = [Mock()]
+            final_response.content[0].text = "Search failed."
+
+            mock_async_client.messages.create = AsyncMock(
+                side_effect=[round1_response, final_response]
+            )
+            mock_tool_manager.aexecute_tool = AsyncMock(
+                side_effect=Exception("Tool failed")
+            )
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+
+            response = asyncio.run(
+                generator.agenerate_response(
+                    "Search for something",
+                    tools=mock_tool_manager.get_tool_definitions(),
+                    tool_manager=mock_tool_manager,
+                )
+            )
+
+            assert response == "Search failed."
+            assert mock_async_client.messages.create.await_count == 2
+            final_call_args = mock_async_client.messages.create.call_args_list[1][1]
+            assert "tools" not in final_call_args
+
+    def test_agenerate_response_gathers_tool_calls(self, mock_tool_manager):
+        """Test that async tool calls of one round are awaited together"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_anthropic.return_value = mock_async_client
+
+            initial_response = Mock()
+            initial_response.stop_reason = "tool_use"
+            initial_response.content = [
+                _tool_block("search_course_content", "tool_1", {"query": "slow"}),
+                _tool_block("search_course_content", "tool_2", {"query": "fast"}),
+            ]
+            final_response = Mock()
+            final_response.stop_reason = "end_turn"
+            final_response.content = [Mock()]
+            final_response.content[0].text = "Async answer."
+            mock_async_client.messages.create = AsyncMock(
+                side_effect=[initial_response, final_response]
+            )
+
+            in_flight = []
+            peak = []
+
+            async def aexecute(name, query):
+                in_flight.append(query)
+                peak.append(len(in_flight))
+                await asyncio.sleep(0.05 if query == "slow" else 0.01)
+                in_flight.remove(query)
+                return f"result {query}"
+
+            mock_tool_manager.aexecute_tool = AsyncMock(side_effect=aexecute)
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            response = asyncio.run(
+                generator.agenerate_response(
+                    "Compare",
+                    tools=mock_tool_manager.get_tool_definitions(),
+                    tool_manager=mock_tool_manager,
+                )
+            )
+
+            assert response == "Async answer."
+            assert max(peak) == 2
+            final_call_args = mock_async_client.messages.create.call_args_list[1][1]
+            tool_results = final_call_args["messages"][2]["content"]
+            assert [r["content"] for r in tool_results] == [
+                "result slow",
+                "result fast",
+            ]
+
+    def test_aclose_closes_pooled_clients_and_threads(self):
+        """Test that aclose shuts down both HTTP clients and the executors"""
+        generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+        tool_executor = generator._get_tool_executor()
+        hedge_executor = generator.caller._get_executor()
+
+        asyncio.run(generator.aclose())
+
+        assert generator.client.is_closed()
+        assert generator.async_client.is_closed()
+        assert tool_executor._shutdown and hedge_executor._shutdown
+        assert generator._tool_executor is None
+
+
+class FakeMessageStream:
+    """Minimal stand-in for anthropic's AsyncMessageStream"""
+
+    def __init__(self, texts, final_message):
+        self._texts = texts
+        self._final_message = final_message
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        async def _iterate():
+            for text in self._texts:
+                yield text
+
+        return _iterate()
+
+    async def get_final_message(self):
+        return self._final_message
+
+
+async def _collect(async_iterator):
+    return [event async for event in async_iterator]
+
+
+class TestStreamingAIGenerator:
+    """Test cases for the streaming generation path"""
+
+    def test_astream_response_direct_answer(self):
+        """Test that tokens are streamed and the answer is assembled"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_anthropic.return_value = mock_async_client
+
+            final_message = Mock()
+            final_message.stop_reason = "end_turn"
+            mock_async_client.messages.stream.return_value = FakeMessageStream(
+                ["Hello", ", world"], final_message
+            )
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            events = asyncio.run(_collect(generator.astream_response("Hi")))
+
+            assert [e["type"] for e in events] == ["round", "token", "token", "done"]
+            assert events[1]["text"] == "Hello"
+            assert events[-1]["answer"] == "Hello, world"
+
+    def test_astream_response_marks_tool_rounds(self, mock_tool_manager):
+        """Test that tool rounds emit tool_use and tool_results events"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_anthropic.return_value = mock_async_client
+
+            tool_block = Mock()
+            tool_block.type = "tool_use"
+            tool_block.name = "search_course_content"
+            tool_block.id = "tool_1"
+            tool_block.input = {"query": "mcp"}
+            tool_message = Mock()
+            tool_message.stop_reason = "tool_use"
+            tool_message.content = [tool_block]
+
+            final_message = Mock()
+            final_message.stop_reason = "end_turn"
+
+            mock_async_client.messages.stream.side_effect = [
+                FakeMessageStream(["Let me search."], tool_message),
+                FakeMessageStream(["MCP is a protocol."], final_message),
+            ]
+            mock_tool_manager.aexecute_tool = AsyncMock(return_value="MCP content")
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            events = asyncio.run(
+                _collect(
+                    generator.astream_response(
+                        "What is MCP?",
+                        tools=mock_tool_manager.get_tool_definitions(),
+                        tool_manager=mock_tool_manager,
+                    )
+                )
+            )
+
+            assert [e["type"] for e in events] == [
+                "round",
+                "token",
+                "discard",
+                "tool_use",
+                "tool_results",
+                "round",
+                "token",
+                "done",
+            ]
+            # The preamble of the tool round is withdrawn, not in the answer
+            assert events[1] == {"type": "token", "round": 1, "text": "Let me search."}
+            assert events[2] == {"type": "discard", "round": 1}
+            assert events[3]["tools"] == ["search_course_content"]
+            assert events[-1]["answer"] == "MCP is a protocol."
+            mock_tool_manager.aexecute_tool.assert_awaited_once_with(
+                "search_course_content", query="mcp"
+            )
+
+    def test_failed_stream_round_is_recorded_as_error(self):
+        """Test that a stream that raises is timed with outcome error"""
+        with patch("anthropic_client.anthropic.AsyncAnthropic") as mock_async_anthropic:
+            mock_async_client = Mock()
+            mock_async_anthropic.return_value = mock_async_client
+            mock_async_client.messages.stream.side_effect = RuntimeError("overloaded")
+            before = anthropic_round_seconds.count(mode="stream", outcome="error")
+
+            generator = AIGenerator("test-api-key", "claude-sonnet-4-20250514")
+            with pytest.raises(RuntimeError):
+                asyncio.run(_collect(generator.astream_response("Hi")))
+
+            after = anthropic_round_seconds.count(mode="stream", outcome="error")
+            assert after == before + 1
+
+
+class FakeMessages:
+    """Records create() calls and replays canned responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def create(self, **params):
+        self.calls.append(params)
+        return self.responses.pop(0)
+
+
+def _response(stop_reason, content, **usage):
+    response = Mock()
+    response.stop_reason = stop_reason
+    response.content = content
+    response.usage = Mock(
+        input_tokens=usage.get("input_tokens", 0),
+        cache_read_input_tokens=usage.get("cache_read_input_tokens", 0),
+        cache_creation_input_tokens=usage.get("cache_creation_input_tokens", 0),
+        output_tokens=usage.get("output_tokens", 0),
+    )
+    return response
+
+
+class TestPromptCaching:
+    """Test cases for the prompt caching layout"""
+
+    def _generator(self, responses, prompt_caching=True):
+        with patch("anthropic_client.anthropic.Anthropic"):
+            generator = AIGenerator(
+                "test-api-key",
+                "claude-sonnet-4-20250514",
+                prompt_caching=prompt_caching,
+            )
+        generator.client = Mock()
+        generator.client.messages = FakeMessages(responses)
+        return generator
+
+    def test_static_prefix_and_history_messages(self, mock_tool_manager):
+        """Test that history moves into messages behind a stable system prompt"""
+        text = Mock()
+        text.text = "Answer."
+        generator = self._generator([_response("end_turn", [text])])
+        history = [
+            {"role": "user", "content": "Earlier question"},
+            {"role": "assistant", "content": "Earlier answer"},
+        ]
+
+        generator.generate_response(
+            "New question",
+            conversation_history=history,
+            tools=mock_tool_manager.get_tool_definitions(),
+            tool_manager=mock_tool_manager,
+        )
+
+        params = generator.client.messages.calls[0]
+        assert params["system"] == [
+            {
+                "type": "text",
+                "text": AIGenerator.SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        assert params["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in mock_tool_manager.get_tool_definitions()[-1]
+        assert params["messages"][:2] == history
+        assert params["messages"][2] == {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": "New question",
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+        }
+
+    def test_breakpoint_moves_to_latest_tool_results(self, mock_tool_manager):
+        """Test that each round marks only its last message"""
+        text = Mock()
+        text.text = "Answer."
+        generator = self._generator(
+            [
+                _response(
+                    "tool_use",
+                    [_tool_block("search_course_content", "tool_1", {"query": "q"})],
+                    input_tokens=50,
+                    cache_creation_input_tokens=900,
+                ),
+                _response(
+                    "end_turn",
+                    [text],
+                    input_tokens=80,
+                    cache_read_input_tokens=900,
+                    output_tokens=20,
+                ),
+            ]
+        )
+        context = RetrievalContext()
+
+        generator.generate_response(
+            "Question",
+            tools=mock_tool_manager.get_tool_definitions(),
+            tool_manager=mock_tool_manager,
+            context=context,
+        )
+
+        messages = generator.client.messages.calls[1]["messages"]
+        assert messages[0] == {"role": "user", "content": "Question"}
+        tool_result = messages[-1]["content"][-1]
+        assert tool_result["type"] == "tool_result"
+        assert tool_result["cache_control"] == {"type": "ephemeral"}
+
+        assert context.usage == {
+            "input_tokens": 130,
+            "cache_read_input_tokens": 900,
+            "cache_creation_input_tokens": 900,
+            "output_tokens": 20,
+        }
+        stats = generator.get_usage_stats()
+        assert stats["requests"] == 2
+        assert stats["cache_read_ratio"] == pytest.approx(900 / 1930)
+
+    def test_disabled_keeps_history_in_system_prompt(self):
+        """Test that the legacy layout folds message history into the system text"""
+        text = Mock()
+        text.text = "Answer."
+        generator = self._generator(
+            [_response("end_turn", [text])], prompt_caching=False
+        )
+
+        generator.generate_response(
+            "New question",
+            conversation_history=[{"role": "user", "content": "Earlier question"}],
+        )
+
+        params = generator.client.messages.calls[0]
+        assert params["system"].endswith(
+            "Previous conversation:\nUser: Earlier question"
+        )
+        assert params["messages"] == [{"role": "user", "content": "New question"}]
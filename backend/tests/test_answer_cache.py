@@ -0,0 +1,84 @@
+"""
+Tests for the semantic answer cache.
+"""
+
+import pytest
+
+from answer_cache import AnswerCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return AnswerCache(
+        max_entries=2, ttl_seconds=60, similarity_threshold=0.9, clock=clock
+    )
+
+
+def store(cache, embedding, answer="answer", generation=0, scope="scope"):
+    cache.store(embedding, scope, generation, answer, ["Course A"], ["link"])
+
+
+class TestAnswerCache:
+    """Tests for AnswerCache lookups, eviction and statistics"""
+
+    def test_similar_query_hits(self, cache):
+        store(cache, [1.0, 0.0])
+
+        hit = cache.lookup([0.99, 0.05], "scope", 0)
+
+        assert hit.answer == "answer"
+        assert hit.sources == ["Course A"]
+        assert cache.stats()["hits"] == 1
+
+    def test_dissimilar_query_misses(self, cache):
+        store(cache, [1.0, 0.0])
+
+        assert cache.lookup([0.0, 1.0], "scope", 0) is None
+        assert cache.stats()["misses"] == 1
+
+    def test_best_match_wins(self, cache):
+        store(cache, [1.0, 0.0], answer="first")
+        store(cache, [0.95, 0.3], answer="second")
+
+        assert cache.lookup([0.9, 0.35], "scope", 0).answer == "second"
+
+    def test_scope_must_match(self, cache):
+        store(cache, [1.0, 0.0], scope="other")
+        assert cache.lookup([1.0, 0.0], "scope", 0) is None
+
+    def test_new_generation_invalidates(self, cache):
+        store(cache, [1.0, 0.0], generation=1)
+
+        assert cache.lookup([1.0, 0.0], "scope", 2) is None
+        assert len(cache) == 0
+        assert cache.stats()["invalidations"] == 1
+
+    def test_entries_expire(self, cache, clock):
+        store(cache, [1.0, 0.0])
+        clock.now = 61
+
+        assert cache.lookup([1.0, 0.0], "scope", 0) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_least_recently_used_is_evicted(self, cache):
+        store(cache, [1.0, 0.0], answer="a")
+        store(cache, [0.0, 1.0], answer="b")
+        cache.lookup([1.0, 0.0], "scope", 0)  # "a" becomes most recent
+        store(cache, [-1.0, 0.0], answer="c")
+
+        assert cache.lookup([1.0, 0.0], "scope", 0).answer == "a"
+        assert cache.lookup([0.0, 1.0], "scope", 0) is None
+        assert cache.stats()["evictions"] == 1
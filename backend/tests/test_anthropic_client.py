@@ -0,0 +1,192 @@
+import asyncio
+import os
+import sys
+import threading
+from unittest.mock import Mock, patch
+
+import anthropic
+import httpx
+import pytest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from anthropic_client import (
+    ClientSettings,
+    LatencyTracker,
+    ResilientCaller,
+    build_clients,
+    is_retryable,
+)
+
+
+def _status_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, request=request, headers=headers or {})
+    return anthropic.APIStatusError("error", response=response, body=None)
+
+
+def _caller(**settings):
+    sleeps = []
+    caller = ResilientCaller(ClientSettings(**settings), sleep=sleeps.append)
+    return caller, sleeps
+
+
+class TestRetries:
+    """Test cases for jittered retries"""
+
+    def test_retries_transient_errors(self):
+        """Test that overload errors are retried until a request succeeds"""
+        caller, sleeps = _caller(max_retries=3)
+        fn = Mock(side_effect=[_status_error(529), _status_error(500), "ok"])
+
+        assert caller.call(fn, model="m") == "ok"
+        assert fn.call_count == 3
+        fn.assert_called_with(model="m")
+        assert len(sleeps) == 2
+        assert caller.stats()["retries"] == 2
+        assert caller.stats()["failures"] == 0
+
+    def test_client_errors_are_not_retried(self):
+        """Test that a 400 is raised immediately"""
+        caller, sleeps = _caller(max_retries=3)
+        fn = Mock(side_effect=_status_error(400))
+
+        with pytest.raises(anthropic.APIStatusError):
+            caller.call(fn)
+        assert fn.call_count == 1
+        assert sleeps == []
+        assert caller.stats()["failures"] == 1
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last transient error is raised once retries run out"""
+        caller, sleeps = _caller(max_retries=2)
+        fn = Mock(side_effect=_status_error(429))
+
+        with pytest.raises(anthropic.APIStatusError):
+            caller.call(fn)
+        assert fn.call_count == 3
+        assert caller.stats()["retries"] == 2
+
+    def test_backoff_is_capped_and_honours_retry_after(self):
+        """Test backoff bounds and the Retry-After header"""
+        caller, _ = _caller(backoff_base=1.0, backoff_max=4.0)
+        for attempt in range(6):
+            assert 0 <= caller.backoff(attempt, _status_error(500)) <= 4.0
+        assert caller.backoff(0, _status_error(429, {"retry-after": "3"})) >= 3.0
+        assert caller.backoff(0, _status_error(429, {"retry-after": "60"})) == 4.0
+
+    def test_async_retries(self):
+        """Test retries on the async path"""
+        sleeps = []
+
+        async def record_sleep(seconds):
+            sleeps.append(seconds)
+
+        caller = ResilientCaller(ClientSettings(), async_sleep=record_sleep)
+        responses = [_status_error(503), "ok"]
+
+        async def create(**params):
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        assert asyncio.run(caller.acall(create)) == "ok"
+        assert len(sleeps) == 1
+
+    def test_is_retryable(self):
+        request = httpx.Request("POST", "https://api.anthropic.com")
+        assert is_retryable(anthropic.APIConnectionError(request=request))
+        assert is_retryable(_status_error(529))
+        assert not is_retryable(_status_error(401))
+        assert not is_retryable(ValueError("bad input"))
+
+
+class TestHedging:
+    """Test cases for hedged requests"""
+
+    def _warm(self, caller, seconds=0.01, samples=5):
+        for _ in range(samples):
+            caller.latency.record(seconds)
+
+    def test_no_hedge_until_enough_samples(self):
+        caller, _ = _caller(hedge_percentile=95, hedge_min_samples=5)
+        assert caller.hedge_delay() is None
+        self._warm(caller)
+        assert caller.hedge_delay() == pytest.approx(0.01)
+
+    def test_slow_request_is_hedged(self):
+        """Test that the backup request wins when the primary stalls"""
+        caller, _ = _caller(hedge_percentile=95, hedge_min_samples=5)
+        self._warm(caller)
+        release = threading.Event()
+        calls = []
+
+        def create(**params):
+            calls.append(params)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        try:
+            assert caller.call(create, model="m") == "fast"
+        finally:
+            release.set()
+            caller.close()
+
+        assert calls == [{"model": "m"}, {"model": "m"}]
+        stats = caller.stats()
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_async_hedge_cancels_loser(self):
+        """Test that the slower async request is cancelled"""
+        caller, _ = _caller(hedge_percentile=95, hedge_min_samples=5)
+        self._warm(caller)
+        cancelled = []
+        calls = []
+
+        async def create(**params):
+            calls.append(params)
+            if len(calls) == 1:
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return "slow"
+            return "fast"
+
+        assert asyncio.run(caller.acall(create)) == "fast"
+        assert cancelled == [True]
+        assert caller.stats()["hedge_wins"] == 1
+
+
+class TestClientSetup:
+    """Test cases for client construction and latency tracking"""
+
+    def test_build_clients_disables_sdk_retries(self):
+        """Test that clients are pooled and leave retries to the caller"""
+        settings = ClientSettings(max_connections=7, request_timeout=12.0)
+        with (
+            patch("anthropic_client.anthropic.Anthropic") as sync_cls,
+            patch("anthropic_client.anthropic.AsyncAnthropic") as async_cls,
+        ):
+            build_clients("key", settings)
+
+        for cls in (sync_cls, async_cls):
+            kwargs = cls.call_args.kwargs
+            assert kwargs["max_retries"] == 0
+            assert kwargs["timeout"].read == 12.0
+            assert kwargs["http_client"] is not None
+
+    def test_latency_percentile(self):
+        tracker = LatencyTracker(window=3)
+        assert tracker.percentile(50) is None
+        for seconds in (5.0, 1.0, 2.0, 3.0):
+            tracker.record(seconds)
+        assert len(tracker) == 3
+        assert tracker.percentile(50) == 2.0
+        assert tracker.percentile(100) == 3.0
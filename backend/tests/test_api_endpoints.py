@@ -1,7 +1,8 @@
 import pytest
+import asyncio
 import json
 from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 
 @pytest.mark.api
@@ -59,6 +60,31 @@ class TestAPIEndpoints:
         # Should still process (empty query is valid from API perspective)
         assert response.status_code == 200
 
+    def test_query_stream_endpoint(self, client, sample_query_request):
+        """Test /api/query/stream emits SSE progress, sources, tokens and done"""
+        response = client.post("/api/query/stream", json=sample_query_request)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            event_line, data_line = block.split("\n")
+            events.append(
+                (event_line[len("event: ") :], json.loads(data_line[len("data: ") :]))
+            )
+
+        names = [name for name, _ in events]
+        assert names[0] == "session"
+        assert names.index("sources") < names.index("token")
+        assert names[-1] == "done"
+
+        tokens = "".join(data["text"] for name, data in events if name == "token")
+        done = events[-1][1]
+        assert tokens == done["answer"]
+        assert done["session_id"] == "test-session-123"
+        assert done["source_links"] == ["https://example.com/lesson1"]
+
     def test_courses_endpoint(self, client):
         """Test /api/courses endpoint returns course statistics"""
         response = client.get("/api/courses")
@@ -227,4 +253,101 @@ class TestAPIIntegration:
         assert response1.status_code == 200
         assert response2.status_code == 200
         # With current mock, they'll return the same session_id
-        # In real implementation, they should be different
\ No newline at end of file
+        # In real implementation, they should be different
+
+
+class TestAppLifecycle:
+    """Test the real app's startup and shutdown hooks"""
+
+    def test_shutdown_closes_anthropic_clients(self, app_module):
+        rag = Mock()
+        rag.ai_generator.aclose = AsyncMock()
+        with (
+            patch.object(app_module, "rag_system", rag),
+            patch.object(app_module, "ingestion_worker") as worker,
+        ):
+            asyncio.run(app_module.shutdown_event())
+
+        worker.stop.assert_called_once()
+        rag.session_manager.close.assert_called_once()
+        rag.ai_generator.aclose.assert_awaited_once()
+
+
+class TestStreamRoute:
+    """Test the real /api/query/stream route with the RAG system patched"""
+
+    @staticmethod
+    def _events(response):
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            event_line, data_line = block.split("\n")
+            events.append(
+                (event_line[len("event: ") :], json.loads(data_line[len("data: ") :]))
+            )
+        return events
+
+    def _post(self, app_module, events, fail=None, **body):
+        rag = Mock()
+        rag.acreate_session = AsyncMock(return_value="s1")
+
+        async def astream_query(query, session_id):
+            for event in events:
+                yield dict(event)
+            if fail:
+                raise fail
+
+        rag.astream_query = Mock(side_effect=astream_query)
+        with patch.object(app_module, "rag_system", rag):
+            response = TestClient(app_module.app).post(
+                "/api/query/stream", json={"query": "What is MCP?", **body}
+            )
+        return rag, response
+
+    def test_emits_session_then_events_then_done(self, app_module):
+        rag, response = self._post(
+            app_module,
+            [
+                {"type": "progress", "round": 1},
+                {"type": "sources", "sources": ["MCP - Lesson 1"]},
+                {"type": "token", "text": "MCP is a protocol."},
+                {"type": "done", "answer": "MCP is a protocol."},
+            ],
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["cache-control"] == "no-cache"
+        assert self._events(response) == [
+            ("session", {"session_id": "s1"}),
+            ("progress", {"round": 1}),
+            ("sources", {"sources": ["MCP - Lesson 1"]}),
+            ("token", {"text": "MCP is a protocol."}),
+            ("done", {"answer": "MCP is a protocol.", "session_id": "s1"}),
+        ]
+        rag.acreate_session.assert_awaited_once()
+        rag.astream_query.assert_called_once_with("What is MCP?", "s1")
+
+    def test_keeps_given_session(self, app_module):
+        rag, response = self._post(
+            app_module, [{"type": "done", "answer": "A"}], session_id="existing"
+        )
+
+        assert self._events(response) == [
+            ("session", {"session_id": "existing"}),
+            ("done", {"answer": "A", "session_id": "existing"}),
+        ]
+        rag.acreate_session.assert_not_called()
+
+    def test_failure_mid_stream_becomes_error_event(self, app_module):
+        _, response = self._post(
+            app_module,
+            [{"type": "token", "text": "Partial"}],
+            fail=RuntimeError("API rate limit exceeded"),
+        )
+
+        assert response.status_code == 200
+        assert self._events(response) == [
+            ("session", {"session_id": "s1"}),
+            ("token", {"text": "Partial"}),
+            ("error", {"detail": "API rate limit exceeded"}),
+        ]
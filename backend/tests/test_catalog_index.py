@@ -0,0 +1,77 @@
+"""
+Tests for the in-memory course catalog index.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from catalog_index import CourseCatalogIndex
+
+TITLES = [
+    "MCP: Build Rich-Context AI Apps with Anthropic",
+    "Building Towards Computer Use with Anthropic",
+    "Advanced Retrieval for AI with Chroma",
+]
+
+# One-hot title embeddings keep similarity easy to reason about
+EMBEDDINGS = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+
+@pytest.fixture
+def index():
+    return CourseCatalogIndex(TITLES, EMBEDDINGS)
+
+
+class TestCourseCatalogIndex:
+    """Tests for CourseCatalogIndex.resolve"""
+
+    def test_exact_title_ignores_case_and_spacing(self, index):
+        embed = Mock()
+        name = "  advanced retrieval FOR ai with   chroma"
+        assert index.resolve(name, embed) == TITLES[2]
+        embed.assert_not_called()
+
+    def test_unique_substring(self, index):
+        embed = Mock()
+        assert index.resolve("MCP", embed) == TITLES[0]
+        assert index.resolve("computer use", embed) == TITLES[1]
+        embed.assert_not_called()
+
+    def test_all_words_match_out_of_order(self, index):
+        embed = Mock()
+        assert index.resolve("chroma retrieval", embed) == TITLES[2]
+        embed.assert_not_called()
+
+    def test_ambiguous_substring_ranked_by_embedding(self, index):
+        embed = Mock(return_value=[0.1, 0.9, 0.0])
+        assert index.resolve("Anthropic", embed) == TITLES[1]
+        embed.assert_called_once_with("Anthropic")
+
+    def test_embedding_fallback(self, index):
+        embed = Mock(return_value=[0.2, 0.1, 0.9])
+        assert index.resolve("vector databases", embed) == TITLES[2]
+
+    def test_without_embeddings_falls_back_to_shortest_or_none(self):
+        index = CourseCatalogIndex(TITLES)
+        assert index.resolve("Anthropic", Mock()) == TITLES[1]
+        assert index.resolve("vector databases", Mock()) is None
+
+    def test_empty_index(self):
+        assert CourseCatalogIndex([]).resolve("MCP", Mock()) is None
+
+    def test_lesson_table(self):
+        metadata = {
+            "title": TITLES[0],
+            "course_link": "https://example.com/mcp",
+            "lessons_json": '[{"lesson_number": 0, "lesson_title": "Intro", '
+            '"lesson_link": "https://example.com/mcp/0"}]',
+        }
+        index = CourseCatalogIndex(TITLES[:1], metadatas=[metadata])
+
+        assert index.lesson(TITLES[0], 0)["lesson_link"] == "https://example.com/mcp/0"
+        assert index.lesson(TITLES[0], 1) is None
+        course = index.course(TITLES[0])
+        assert course["course_link"] == "https://example.com/mcp"
+        assert course["lessons"][0]["lesson_title"] == "Intro"
+        assert "lessons_json" not in course
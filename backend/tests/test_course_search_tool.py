@@ -1,5 +1,7 @@
+import asyncio
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
 import pytest
@@ -7,7 +9,7 @@ import pytest
 # Add parent directory to path to import modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from search_tools import CourseSearchTool
+from search_tools import CourseOutlineTool, CourseSearchTool, ToolManager
 from vector_store import SearchResults
 
 
@@ -285,3 +287,102 @@ class TestCourseSearchTool:
 
         assert tool.last_sources == expected_sources
         assert tool.last_source_links == expected_links
+
+
+class TestCourseOutlineTool:
+    """Test cases for CourseOutlineTool"""
+
+    def test_outline_uses_decoded_course_metadata(self, mock_vector_store):
+        mock_vector_store._resolve_course_name.return_value = "Test Course"
+        mock_vector_store.get_course_metadata.return_value = {
+            "title": "Test Course",
+            "course_link": "https://example.com/course",
+            "lessons": [
+                {"lesson_number": 1, "lesson_title": "Intro"},
+                {"lesson_number": 2, "lesson_title": "Tools"},
+            ],
+        }
+        tool = CourseOutlineTool(mock_vector_store)
+
+        result = tool.execute("test")
+
+        assert "**Course Title:** Test Course" in result
+        assert "**Total Lessons:** 2" in result
+        assert "Lesson 2: Tools" in result
+        mock_vector_store.get_course_metadata.assert_called_once_with("Test Course")
+
+    def test_outline_unknown_course(self, mock_vector_store):
+        mock_vector_store._resolve_course_name.return_value = None
+        tool = CourseOutlineTool(mock_vector_store)
+
+        assert tool.execute("nope") == "No course found matching 'nope'"
+
+
+class TestToolManager:
+    """Test cases for ToolManager dispatch"""
+
+    def test_aexecute_tool_runs_on_executor(self, mock_vector_store):
+        """Test that async dispatch runs the tool on the configured executor"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tool-test")
+        manager = ToolManager(executor=executor)
+        tool = CourseSearchTool(mock_vector_store)
+        manager.register_tool(tool)
+
+        import threading
+
+        seen_threads = []
+        original_search = mock_vector_store.search.side_effect
+
+        def record_thread(**kwargs):
+            seen_threads.append(threading.current_thread().name)
+            return mock_vector_store.search.return_value
+
+        mock_vector_store.search.side_effect = record_thread
+        try:
+            result = asyncio.run(
+                manager.aexecute_tool("search_course_content", query="test")
+            )
+        finally:
+            mock_vector_store.search.side_effect = original_search
+            executor.shutdown()
+
+        assert "Sample document content" in result
+        assert seen_threads and seen_threads[0].startswith("tool-test")
+
+    def test_aexecute_unknown_tool(self):
+        """Test async dispatch of an unregistered tool"""
+        manager = ToolManager()
+        result = asyncio.run(manager.aexecute_tool("missing_tool"))
+        assert result == "Tool 'missing_tool' not found"
+
+    def test_aexecute_tool_timeout(self, mock_vector_store):
+        """Test that a tool exceeding its timeout raises and records the error"""
+        import time
+
+        from retrieval_context import RetrievalContext
+
+        tool = CourseSearchTool(mock_vector_store)
+        tool.timeout = 0.05
+        mock_vector_store.search.side_effect = lambda **kwargs: time.sleep(0.5)
+        manager = ToolManager(default_timeout=10.0)
+        manager.register_tool(tool)
+        context = RetrievalContext()
+
+        with pytest.raises(TimeoutError, match="timed out after 0.05s"):
+            asyncio.run(
+                manager.aexecute_tool("search_course_content", context, query="x")
+            )
+
+        assert len(context.tool_calls) == 1
+        assert "timed out" in context.tool_calls[0].error
+
+    def test_get_tool_timeout_falls_back_to_default(self, mock_vector_store):
+        """Test that tools without their own timeout use the manager default"""
+        manager = ToolManager(default_timeout=3.0)
+        manager.register_tool(CourseSearchTool(mock_vector_store))
+        outline = CourseOutlineTool(mock_vector_store)
+        outline.timeout = 1.0
+        manager.register_tool(outline)
+
+        assert manager.get_tool_timeout("search_course_content") == 3.0
+        assert manager.get_tool_timeout("get_course_outline") == 1.0
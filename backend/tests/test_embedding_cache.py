@@ -0,0 +1,100 @@
+"""
+Tests for the two-tier query embedding cache.
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def embedding_function():
+    return Mock(side_effect=lambda texts: [[float(len(t)), 1.0] for t in texts])
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache memory and disk tiers"""
+
+    def test_repeated_text_is_embedded_once(self, embedding_function):
+        cache = EmbeddingCache(embedding_function, "model")
+
+        first = cache.embed(["what is MCP"])
+        second = cache.embed(["what is MCP"])
+
+        assert first == second == [[11.0, 1.0]]
+        assert embedding_function.call_count == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_only_missing_texts_are_embedded(self, embedding_function):
+        cache = EmbeddingCache(embedding_function, "model")
+        cache.embed(["a"])
+
+        result = cache.embed(["a", "bb", "ccc"])
+
+        assert result == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+        embedding_function.assert_called_with(["bb", "ccc"])
+
+    def test_least_recently_used_is_evicted(self, embedding_function):
+        cache = EmbeddingCache(embedding_function, "model", max_entries=2)
+        cache.embed(["a"])
+        cache.embed(["b"])
+        cache.embed(["a"])
+        cache.embed(["c"])
+
+        cache.embed(["a"])
+        assert embedding_function.call_count == 3
+        cache.embed(["b"])
+        assert embedding_function.call_count == 4
+
+    def test_disk_tier_survives_restart(self, tmp_path, embedding_function):
+        path = str(tmp_path / "cache" / "embeddings.sqlite3")
+        EmbeddingCache(embedding_function, "model", disk_path=path).embed(["query"])
+
+        cache = EmbeddingCache(embedding_function, "model", disk_path=path)
+        result = cache.embed(["query"])
+
+        assert embedding_function.call_count == 1
+        np.testing.assert_array_equal(result[0], [5.0, 1.0])
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_model_name_is_part_of_the_key(self, tmp_path, embedding_function):
+        path = str(tmp_path / "embeddings.sqlite3")
+        EmbeddingCache(embedding_function, "model-a", disk_path=path).embed(["q"])
+
+        EmbeddingCache(embedding_function, "model-b", disk_path=path).embed(["q"])
+
+        assert embedding_function.call_count == 2
+
+    def test_repeats_in_one_batch_are_embedded_once(self, embedding_function):
+        cache = EmbeddingCache(embedding_function, "model")
+
+        result = cache.embed(["a", "bb", "a"])
+
+        assert result == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+        embedding_function.assert_called_once_with(["a", "bb"])
+        assert cache.stats()["misses"] == 2
+
+    def test_disk_tier_prunes_least_recently_used(self, tmp_path, embedding_function):
+        path = str(tmp_path / "embeddings.sqlite3")
+        clock = iter(range(100)).__next__
+        cache = EmbeddingCache(
+            embedding_function,
+            "model",
+            max_entries=0,
+            disk_path=path,
+            max_disk_entries=3,
+            clock=clock,
+        )
+        cache.embed(["a", "b", "c"])
+        cache.embed(["a"])  # Disk hit refreshes "a"
+        cache.embed(["d"])  # Over the cap: prune to 2 rows
+
+        assert cache.stats()["disk_evictions"] == 2
+        embedding_function.reset_mock()
+        cache.embed(["a", "d"])
+        embedding_function.assert_not_called()
+        cache.embed(["b"])
+        embedding_function.assert_called_once_with(["b"])
@@ -0,0 +1,109 @@
+import os
+import sys
+
+import anthropic
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_anthropic import (
+    FakeAnthropic,
+    FakeAnthropicSettings,
+    LatencyModel,
+    create_app,
+)
+
+TOOLS = [
+    {
+        "name": "search_course_content",
+        "description": "Search course materials",
+        "input_schema": {"type": "object", "properties": {}},
+    }
+]
+
+
+def _sdk_client(fake):
+    """Real SDK client whose HTTP requests are served by the fake app"""
+    return anthropic.Anthropic(
+        api_key="fake-key",
+        base_url="http://testserver",
+        max_retries=0,
+        http_client=TestClient(create_app(fake)),
+    )
+
+
+class TestFakeAnthropic:
+    """Test cases for the simulated Messages API"""
+
+    def test_scripted_tool_round_then_answer(self):
+        """Test that the SDK parses a scripted tool call and the final answer"""
+        client = _sdk_client(FakeAnthropic(FakeAnthropicSettings(script="search")))
+        messages = [{"role": "user", "content": "What is MCP?"}]
+
+        first = client.messages.create(
+            model="m", max_tokens=10, messages=messages, tools=TOOLS
+        )
+        assert first.stop_reason == "tool_use"
+        assert first.content[0].name == "search_course_content"
+        assert first.content[0].input == {"query": "What is MCP?"}
+
+        messages += [
+            {"role": "assistant", "content": [b.model_dump() for b in first.content]},
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": first.content[0].id,
+                        "content": "MCP is a protocol",
+                    }
+                ],
+            },
+        ]
+        second = client.messages.create(
+            model="m", max_tokens=10, messages=messages, tools=TOOLS
+        )
+        assert second.stop_reason == "end_turn"
+        assert second.content[0].text == "Simulated answer to: What is MCP?"
+
+    def test_injected_errors_surface_as_sdk_errors(self):
+        """Test that injected overload errors reach the SDK with their status"""
+        fake = FakeAnthropic(FakeAnthropicSettings(error_rate=1.0, retry_after=2))
+        client = _sdk_client(fake)
+
+        with pytest.raises(anthropic.APIStatusError) as exc_info:
+            client.messages.create(
+                model="m", max_tokens=10, messages=[{"role": "user", "content": "x"}]
+            )
+        assert exc_info.value.status_code == 529
+        assert exc_info.value.response.headers["retry-after"] == "2"
+        assert fake.stats()["errors_injected"] == 1
+
+    def test_prompt_cache_emulation(self):
+        """Test that a repeated cache-marked prefix is reported as cache reads"""
+        client = _sdk_client(FakeAnthropic(FakeAnthropicSettings(script="direct")))
+        system = [
+            {"type": "text", "text": "x" * 400, "cache_control": {"type": "ephemeral"}}
+        ]
+        usages = [
+            client.messages.create(
+                model="m",
+                max_tokens=10,
+                system=system,
+                messages=[{"role": "user", "content": f"question {i}"}],
+            ).usage
+            for i in range(2)
+        ]
+        assert usages[0].cache_creation_input_tokens > 0
+        assert usages[0].cache_read_input_tokens == 0
+        assert (
+            usages[1].cache_read_input_tokens == usages[0].cache_creation_input_tokens
+        )
+
+    def test_latency_model_parse(self):
+        assert LatencyModel.parse("fixed:0.5") == LatencyModel("fixed", 0.5, 0.0)
+        assert LatencyModel.parse("uniform:0.1:0.3").kind == "uniform"
+        with pytest.raises(ValueError):
+            LatencyModel.parse("gamma:1")
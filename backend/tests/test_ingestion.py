@@ -0,0 +1,151 @@
+"""
+Unit tests for the background ingestion worker and its job bookkeeping.
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from ingestion import IngestionJob, IngestionWorker
+
+
+def fake_add_course_folder(events, error=None):
+    """Build an add_course_folder stand-in that replays progress events"""
+
+    def add_course_folder(folder_path, clear_existing=False, on_progress=None):
+        for event in events:
+            on_progress(event)
+        if error:
+            raise error
+        return 0, 0
+
+    return add_course_folder
+
+
+@pytest.fixture
+def worker():
+    rag = Mock()
+    w = IngestionWorker(rag)
+    w.start()
+    yield w
+    w.stop(timeout=5)
+
+
+class TestIngestionJob:
+    """Tests for IngestionJob progress reporting."""
+
+    def test_progress_before_start(self):
+        job = IngestionJob(job_id="j", folder_path="/docs")
+        assert job.progress == 0.0
+        assert job.chunks_per_sec == 0.0
+
+    def test_progress_and_throughput(self):
+        job = IngestionJob(job_id="j", folder_path="/docs", status="completed")
+        job.files_total = 4
+        job.files_done = 2
+        job.chunks_added = 100
+        job.started_at = 10.0
+        job.finished_at = 12.0
+        assert job.progress == 0.5
+        assert job.chunks_per_sec == 50.0
+        assert job.to_dict()["chunks_per_sec"] == 50.0
+
+    def test_empty_finished_job_is_complete(self):
+        job = IngestionJob(job_id="j", folder_path="/docs", status="completed")
+        assert job.progress == 1.0
+
+
+class TestIngestionWorker:
+    """Tests for queueing and running ingestion jobs."""
+
+    def test_job_runs_and_tracks_progress(self, worker):
+        worker.rag_system.add_course_folder.side_effect = fake_add_course_folder(
+            [
+                {"event": "start", "files_total": 3},
+                {"event": "file", "file": "a.txt", "status": "added", "chunks": 5},
+                {"event": "file", "file": "b.txt", "status": "skipped", "chunks": 0},
+                {
+                    "event": "file",
+                    "file": "c.txt",
+                    "status": "error",
+                    "chunks": 0,
+                    "error": "bad encoding",
+                },
+            ]
+        )
+
+        job = worker.submit("/docs", clear_existing=True)
+        assert worker.wait(job.job_id, timeout=5)
+
+        job = worker.get_job(job.job_id)
+        assert job.status == "completed"
+        assert job.files_total == 3
+        assert job.files_done == 3
+        assert job.courses_added == 1
+        assert job.chunks_added == 5
+        assert job.errors == ["c.txt: bad encoding"]
+        worker.rag_system.add_course_folder.assert_called_once()
+        assert worker.rag_system.add_course_folder.call_args[1]["clear_existing"]
+
+    def test_incremental_events_are_counted(self, worker):
+        worker.rag_system.add_course_folder.side_effect = fake_add_course_folder(
+            [
+                {"event": "start", "files_total": 2},
+                {"event": "file", "file": "a.txt", "status": "updated", "chunks": 4},
+                {"event": "file", "file": "b.txt", "status": "unchanged", "chunks": 0},
+                {"event": "removed", "file": "c.txt", "course": "Course C"},
+            ]
+        )
+
+        job = worker.submit("/docs")
+        assert worker.wait(job.job_id, timeout=5)
+
+        assert job.files_done == 2
+        assert job.courses_updated == 1
+        assert job.files_unchanged == 1
+        assert job.courses_removed == 1
+        assert job.chunks_added == 4
+
+    def test_failed_job_records_error(self, worker):
+        worker.rag_system.add_course_folder.side_effect = fake_add_course_folder(
+            [], error=RuntimeError("store unavailable")
+        )
+
+        job = worker.submit("/docs")
+        assert worker.wait(job.job_id, timeout=5)
+
+        assert job.status == "failed"
+        assert job.errors == ["store unavailable"]
+
+    def test_jobs_run_sequentially(self, worker):
+        running = []
+        overlap = threading.Event()
+
+        def add_course_folder(folder_path, clear_existing=False, on_progress=None):
+            running.append(folder_path)
+            if len(running) > 1:
+                overlap.set()
+            on_progress({"event": "start", "files_total": 0})
+            running.remove(folder_path)
+            return 0, 0
+
+        worker.rag_system.add_course_folder.side_effect = add_course_folder
+        jobs = [worker.submit(f"/docs/{i}") for i in range(3)]
+        for job in jobs:
+            assert worker.wait(job.job_id, timeout=5)
+
+        assert not overlap.is_set()
+        assert all(job.status == "completed" for job in jobs)
+
+    def test_unknown_job(self, worker):
+        assert worker.get_job("missing") is None
+
+    def test_finished_jobs_are_pruned(self):
+        w = IngestionWorker(Mock(), max_finished_jobs=2)
+        for i in range(4):
+            job = w.submit(f"/docs/{i}")
+            job.status = "completed"
+        w.submit("/docs/last")
+        # Two finished jobs are kept plus the newly queued one
+        assert len(w.jobs) == 3
@@ -0,0 +1,64 @@
+"""
+Tests for the persistent ingestion manifest.
+"""
+
+import os
+
+from ingestion_manifest import IngestionManifest, ManifestEntry, content_hash
+
+
+def make_entry(path, title="Course A"):
+    return ManifestEntry(
+        path=str(path),
+        size=10,
+        mtime=1.5,
+        content_hash=content_hash("text"),
+        course_title=title,
+        chunk_ids=["Course_A_0", "Course_A_1"],
+    )
+
+
+class TestIngestionManifest:
+    """Tests for IngestionManifest persistence and lookups"""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "index" / "manifest.json"
+        manifest = IngestionManifest(str(path))
+        entry = make_entry(tmp_path / "a.txt")
+        manifest.set(entry)
+        manifest.save()
+
+        reloaded = IngestionManifest(str(path))
+        assert reloaded.get(str(tmp_path / "a.txt")) == entry
+
+    def test_save_is_skipped_when_unchanged(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        manifest = IngestionManifest(str(path))
+        manifest.clear()
+        manifest.save()
+        assert not path.exists()
+
+    def test_unreadable_file_is_treated_as_empty(self, tmp_path):
+        path = tmp_path / "manifest.json"
+        path.write_text("{not json")
+        assert IngestionManifest(str(path)).entries == {}
+
+    def test_matches_stat(self, tmp_path):
+        entry = make_entry(tmp_path / "a.txt")
+        assert entry.matches_stat(10, 1.5)
+        assert not entry.matches_stat(10, 2.0)
+        assert not entry.matches_stat(11, 1.5)
+
+    def test_owner_and_folder_lookups(self, tmp_path):
+        manifest = IngestionManifest(str(tmp_path / "manifest.json"))
+        manifest.set(make_entry(tmp_path / "a.txt", "Course A"))
+        manifest.set(make_entry(tmp_path / "sub" / "b.txt", "Course B"))
+
+        assert manifest.owner_of("Course A") == os.path.abspath(tmp_path / "a.txt")
+        assert manifest.owner_of("Missing") is None
+        assert [e.course_title for e in manifest.entries_in(str(tmp_path))] == [
+            "Course A"
+        ]
+
+        manifest.remove(str(tmp_path / "a.txt"))
+        assert manifest.owner_of("Course A") is None
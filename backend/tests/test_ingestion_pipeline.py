@@ -0,0 +1,219 @@
+"""
+Tests for the staged read -> parse -> embed -> write ingestion pipeline.
+"""
+
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from document_processor import DocumentProcessor
+from ingestion_manifest import IngestionManifest
+from ingestion_pipeline import IngestionPipeline
+from vector_store import VectorStore
+
+from .conftest import SAMPLE_COURSE_TEXT
+
+
+def write_courses(folder, titles):
+    paths = []
+    for i, title in enumerate(titles):
+        path = folder / f"course{i}.txt"
+        path.write_text(
+            SAMPLE_COURSE_TEXT.replace(
+                "Building Towards Computer Use with Anthropic", title
+            )
+        )
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def vector_store():
+    store = Mock()
+    store.embed_documents.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    store.chunk_id.side_effect = VectorStore.chunk_id
+    return store
+
+
+def make_pipeline(vector_store, **kwargs):
+    return IngestionPipeline(
+        DocumentProcessor(800, 100), vector_store, 800, 100, **kwargs
+    )
+
+
+class TestIngestionPipeline:
+    """Tests for IngestionPipeline.run"""
+
+    def test_ingests_new_courses_in_order(self, tmp_path, vector_store):
+        paths = write_courses(tmp_path, ["Course A", "Course B"])
+        events = []
+
+        courses, chunks = make_pipeline(vector_store).run(paths, set(), events.append)
+
+        assert courses == 2
+        assert chunks == sum(e["chunks"] for e in events)
+        assert [e["file"] for e in events] == ["course0.txt", "course1.txt"]
+        assert all(e["status"] == "added" for e in events)
+
+        titles = [
+            c[0][0].title for c in vector_store.add_course_metadata.call_args_list
+        ]
+        assert titles == ["Course A", "Course B"]
+
+        # Precomputed embeddings are handed over with the chunks
+        chunks_arg = vector_store.add_course_content.call_args_list[0][0][0]
+        embeddings = vector_store.add_course_content.call_args_list[0][1]["embeddings"]
+        assert len(embeddings) == len(chunks_arg)
+
+    def test_embeddings_are_batched(self, tmp_path, vector_store):
+        paths = write_courses(tmp_path, ["Course A"])
+
+        make_pipeline(vector_store, embed_batch_size=1).run(paths, set(), Mock())
+
+        chunk_count = len(vector_store.add_course_content.call_args[0][0])
+        assert vector_store.embed_documents.call_count == chunk_count
+        assert all(
+            len(call[0][0]) == 1 for call in vector_store.embed_documents.call_args_list
+        )
+
+    def test_skips_existing_and_duplicate_titles(self, tmp_path, vector_store):
+        paths = write_courses(tmp_path, ["Existing", "Course A", "Course A"])
+        existing = {"Existing"}
+        events = []
+
+        courses, _ = make_pipeline(vector_store).run(paths, existing, events.append)
+
+        assert courses == 1
+        assert [e["status"] for e in events] == ["skipped", "added", "skipped"]
+        assert existing == {"Existing", "Course A"}
+        vector_store.embed_documents.assert_called()
+
+    def test_errors_are_reported_per_file(self, tmp_path, vector_store):
+        paths = write_courses(tmp_path, ["Course A", "Course B"])
+        vector_store.add_course_content.side_effect = [RuntimeError("disk full"), None]
+        events = []
+
+        courses, _ = make_pipeline(vector_store).run(
+            [str(tmp_path / "missing.txt")] + paths, set(), events.append
+        )
+
+        assert courses == 1
+        assert [e["status"] for e in events] == ["error", "error", "added"]
+        assert events[1]["error"] == "disk full"
+
+    def test_stage_crash_fails_run(self, tmp_path, vector_store):
+        paths = write_courses(tmp_path, ["Course A"])
+        pipeline = make_pipeline(vector_store)
+        pipeline._parse_stage = Mock(side_effect=ValueError("parser crashed"))
+
+        with pytest.raises(RuntimeError, match="parser crashed"):
+            pipeline.run(paths, set(), Mock())
+
+    @pytest.mark.slow
+    def test_process_pool_parsing(self, tmp_path, vector_store):
+        paths = write_courses(tmp_path, ["Course A", "Course B", "Course C"])
+        events = []
+
+        courses, chunks = make_pipeline(vector_store, parse_workers=2).run(
+            paths, set(), events.append
+        )
+
+        assert courses == 3
+        assert chunks > 0
+        assert [e["file"] for e in events] == [
+            "course0.txt",
+            "course1.txt",
+            "course2.txt",
+        ]
+
+
+class TestIncrementalIngestion:
+    """Tests for manifest-driven re-ingestion"""
+
+    @pytest.fixture
+    def manifest(self, tmp_path):
+        return IngestionManifest(str(tmp_path / "manifest.json"))
+
+    def run_folder(self, pipeline, paths):
+        events = []
+        result = pipeline.run(paths, set(), events.append)
+        return result, [e["status"] for e in events]
+
+    def test_unchanged_files_are_not_reparsed(self, tmp_path, vector_store, manifest):
+        paths = write_courses(tmp_path, ["Course A", "Course B"])
+        pipeline = make_pipeline(vector_store, manifest=manifest)
+        self.run_folder(pipeline, paths)
+        vector_store.reset_mock()
+
+        pipeline.document_processor = Mock(wraps=pipeline.document_processor)
+        result, statuses = self.run_folder(pipeline, paths)
+
+        assert result == (0, 0)
+        assert statuses == ["unchanged", "unchanged"]
+        pipeline.document_processor.read_file.assert_not_called()
+        vector_store.add_course_content.assert_not_called()
+
+    def test_touched_file_with_same_content_is_unchanged(
+        self, tmp_path, vector_store, manifest
+    ):
+        paths = write_courses(tmp_path, ["Course A"])
+        pipeline = make_pipeline(vector_store, manifest=manifest)
+        self.run_folder(pipeline, paths)
+        os.utime(paths[0], (1, 1))
+
+        result, statuses = self.run_folder(pipeline, paths)
+
+        assert statuses == ["unchanged"]
+        assert manifest.get(paths[0]).mtime == 1
+
+    def test_edited_file_replaces_its_chunks(self, tmp_path, vector_store, manifest):
+        paths = write_courses(tmp_path, ["Course A"])
+        pipeline = make_pipeline(vector_store, manifest=manifest)
+        self.run_folder(pipeline, paths)
+        old_ids = manifest.get(paths[0]).chunk_ids
+
+        # Keep only the first lesson so some chunks become stale
+        text = open(paths[0]).read()
+        with open(paths[0], "w") as f:
+            f.write(text[: text.index("Lesson 2:")])
+        vector_store.reset_mock()
+
+        (courses, _), statuses = self.run_folder(pipeline, paths)
+
+        assert courses == 1
+        assert statuses == ["updated"]
+        vector_store.add_course_content.assert_called_once()
+        new_ids = manifest.get(paths[0]).chunk_ids
+        stale_ids = vector_store.delete_course_content.call_args[0][0]
+        assert stale_ids and stale_ids == sorted(set(old_ids) - set(new_ids))
+        vector_store.delete_course.assert_not_called()
+
+    def test_retitled_file_drops_old_course(self, tmp_path, vector_store, manifest):
+        paths = write_courses(tmp_path, ["Course A"])
+        pipeline = make_pipeline(vector_store, manifest=manifest)
+        self.run_folder(pipeline, paths)
+        text = open(paths[0]).read()
+        with open(paths[0], "w") as f:
+            f.write(text.replace("Course A", "Course B"))
+
+        _, statuses = self.run_folder(pipeline, paths)
+
+        assert statuses == ["updated"]
+        vector_store.delete_course.assert_called_once_with("Course A")
+        assert manifest.get(paths[0]).course_title == "Course B"
+
+    def test_untracked_existing_course_is_adopted(
+        self, tmp_path, vector_store, manifest
+    ):
+        paths = write_courses(tmp_path, ["Existing"])
+        events = []
+
+        courses, _ = make_pipeline(vector_store, manifest=manifest).run(
+            paths, {"Existing"}, events.append
+        )
+
+        assert courses == 0
+        assert events[0]["status"] == "skipped"
+        vector_store.embed_documents.assert_not_called()
+        assert manifest.owner_of("Existing") == manifest.key(paths[0])
@@ -0,0 +1,72 @@
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def _index():
+    index = BM25Index()
+    index.add(
+        ["a", "b", "c"],
+        [
+            "Use client.messages.create to call the API",
+            "The API returns a message with content blocks",
+            "Lesson about prompt caching and the cache_control field",
+        ],
+        [
+            {"course_title": "API", "lesson_number": 1},
+            {"course_title": "API", "lesson_number": 2},
+            {"course_title": "Caching", "lesson_number": 1},
+        ],
+    )
+    return index
+
+
+class TestBM25Index:
+    """Test cases for the BM25 inverted index"""
+
+    def test_tokenize_keeps_identifiers(self):
+        assert tokenize("The cache_control field") == ["cache_control", "field"]
+
+    def test_rare_term_ranks_first(self):
+        index = _index()
+        ranked = index.search("cache_control")
+        assert [doc_id for doc_id, _ in ranked] == ["c"]
+
+    def test_scores_prefer_more_matching_terms(self):
+        index = _index()
+        ranked = index.search("API messages create")
+        assert ranked[0][0] == "a"
+        assert {doc_id for doc_id, _ in ranked} == {"a", "b"}
+
+    def test_filters(self):
+        index = _index()
+        assert index.search("API", course_title="Caching") == []
+        assert [d for d, _ in index.search("API", lesson_number=2)] == ["b"]
+
+    def test_upsert_and_remove(self):
+        index = _index()
+        index.add(["a"], ["Nothing relevant here"], [{"course_title": "API"}])
+        assert [d for d, _ in index.search("create")] == []
+        assert len(index) == 3
+
+        index.remove(["a"])
+        index.remove_where(course_title="Caching")
+        assert len(index) == 1
+        assert index.get("b")[1] == {"course_title": "API", "lesson_number": 2}
+        assert index.search("cache_control") == []
+
+    def test_stopword_only_query(self):
+        assert _index().search("the and of") == []
+
+
+class TestReciprocalRankFusion:
+    """Test cases for rank fusion"""
+
+    def test_items_in_both_rankings_win(self):
+        fused = reciprocal_rank_fusion([["x", "y"], ["y", "z"]], k=60)
+        assert [doc_id for doc_id, _ in fused] == ["y", "x", "z"]
+        assert fused[0][1] == 1 / 62 + 1 / 61
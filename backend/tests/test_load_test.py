@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+
+import httpx
+from fastapi import FastAPI, Response
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_test import parse_server_timing, percentile, run_load
+
+
+def _toy_app():
+    app = FastAPI()
+    app.state.queries = []
+
+    @app.post("/api/query")
+    async def query(body: dict, response: Response):
+        app.state.queries.append(body["query"])
+        if "fail" in body["query"]:
+            response.status_code = 500
+            return {"detail": "boom"}
+        response.headers["Server-Timing"] = "generate;dur=20.0, tool-search;dur=5"
+        return {"answer": "ok"}
+
+    return app
+
+
+class TestLoadTest:
+    """Test cases for the load generator"""
+
+    def test_run_load_collects_latencies_errors_and_stages(self):
+        app = _toy_app()
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://app"
+            ) as client:
+                return await run_load(
+                    client, ["hello", "fail"], concurrency=3, total_requests=10
+                )
+
+        result = asyncio.run(run())
+        summary = result.summary()
+
+        assert summary["requests"] == 10
+        assert summary["succeeded"] == 5
+        assert summary["errors"] == {"500": 5}
+        assert summary["stages"]["generate"]["mean"] == 0.02
+        assert summary["stages"]["tool-search"]["count"] == 5
+        assert summary["latency"]["p50"] is not None
+        # Queries are numbered so the answer cache cannot serve them
+        assert len(set(app.state.queries)) == 10
+
+    def test_parse_server_timing(self):
+        assert parse_server_timing("a;dur=12.5, b;desc=x;dur=3") == {
+            "a": 0.0125,
+            "b": 0.003,
+        }
+        assert parse_server_timing(None) == {}
+
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) is None
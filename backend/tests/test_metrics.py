@@ -0,0 +1,115 @@
+"""
+Tests for the Prometheus metrics registry and the instrumented components.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from embedding_cache import EmbeddingCache
+from metrics import MetricsRegistry, embedding_seconds, tool_seconds
+from search_tools import Tool, ToolManager
+
+
+class EchoTool(Tool):
+    def get_tool_definition(self):
+        return {"name": "echo", "description": "Echo", "input_schema": {}}
+
+    def execute(self, text: str = "", fail: bool = False) -> str:
+        if fail:
+            raise RuntimeError("boom")
+        return text
+
+
+class TestMetricsRegistry:
+    """Tests for counters, histograms and the text exposition format"""
+
+    def test_counter_renders_per_label_set(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("jobs_total", "Jobs run", ["status"])
+        counter.inc(status="ok")
+        counter.inc(2, status="ok")
+        counter.inc(status="failed")
+
+        assert counter.value(status="ok") == 3
+        assert registry.render().splitlines() == [
+            "# HELP jobs_total Jobs run",
+            "# TYPE jobs_total counter",
+            'jobs_total{status="failed"} 1',
+            'jobs_total{status="ok"} 3',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1])
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+
+        lines = registry.render().splitlines()
+        assert lines[2:] == [
+            'latency_seconds_bucket{le="0.1"} 1',
+            'latency_seconds_bucket{le="1"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 4.25",
+            "latency_seconds_count 4",
+        ]
+        assert histogram.count() == 4
+
+    def test_time_skips_blocks_that_raise(self):
+        histogram = MetricsRegistry().histogram("work_seconds", "Work")
+        with histogram.time():
+            pass
+        with pytest.raises(RuntimeError):
+            with histogram.time():
+                raise RuntimeError("boom")
+        assert histogram.count() == 1
+
+    def test_labels_must_match_label_names(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("query_seconds", "Queries", ["collection"])
+        with pytest.raises(ValueError):
+            histogram.observe(0.1)
+        with pytest.raises(ValueError):
+            registry.counter("query_seconds", "Duplicate")
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls", ["path"]).inc(path='a"b\\c')
+        assert 'calls_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_collectors_are_read_at_scrape_time(self):
+        registry = MetricsRegistry()
+        sessions = {"count": 1}
+        registry.register_collector(
+            lambda: [("sessions", "gauge", "Sessions", [({}, sessions["count"])])]
+        )
+        registry.register_collector(Mock(side_effect=RuntimeError("down")))
+
+        sessions["count"] = 5
+        assert "sessions 5" in registry.render().splitlines()
+
+
+class TestInstrumentation:
+    """Tests that components report into the shared instruments"""
+
+    def test_tool_calls_are_timed_by_name_and_outcome(self):
+        manager = ToolManager()
+        manager.register_tool(EchoTool())
+        ok_before = tool_seconds.count(tool="echo", outcome="ok")
+        error_before = tool_seconds.count(tool="echo", outcome="error")
+
+        assert manager.execute_tool("echo", text="hi") == "hi"
+        with pytest.raises(RuntimeError):
+            manager.execute_tool("echo", fail=True)
+
+        assert tool_seconds.count(tool="echo", outcome="ok") == ok_before + 1
+        assert tool_seconds.count(tool="echo", outcome="error") == error_before + 1
+
+    def test_only_cache_misses_are_timed_as_embeddings(self):
+        cache = EmbeddingCache(Mock(side_effect=lambda t: [[1.0]] * len(t)), "m")
+        before = embedding_seconds.count(kind="query")
+
+        cache.embed(["what is MCP"])
+        cache.embed(["what is MCP"])
+
+        assert embedding_seconds.count(kind="query") == before + 1
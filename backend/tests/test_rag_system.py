@@ -1,7 +1,9 @@
+import asyncio
 import os
 import sys
 import tempfile
-from unittest.mock import MagicMock, Mock, patch
+import threading
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 import pytest
 
@@ -12,6 +14,16 @@ from models import Course, CourseChunk, Lesson
 from rag_system import RAGSystem
 
 
+def respond_with_sources(response, sources, source_links):
+    """Build a generate_response side effect that cites sources on the context"""
+
+    def side_effect(**kwargs):
+        kwargs["context"].add_sources(sources, source_links)
+        return response
+
+    return side_effect
+
+
 class TestRAGSystem:
     """Test cases for RAGSystem end-to-end integration"""
 
@@ -52,6 +64,17 @@ class TestRAGSystem:
                 broken_config.CHROMA_PATH,
                 broken_config.EMBEDDING_MODEL,
                 0,  # This is the broken MAX_RESULTS=0 value
+                embedding_cache_size=broken_config.EMBEDDING_CACHE_SIZE,
+                embedding_cache_path=os.path.join(
+                    broken_config.CHROMA_PATH, "embedding_cache.sqlite3"
+                ),
+                embedding_cache_disk_entries=broken_config.EMBEDDING_CACHE_DISK_ENTRIES,
+                write_batch_size=broken_config.CONTENT_WRITE_BATCH_SIZE,
+                search_mode=broken_config.SEARCH_MODE,
+                vector_compression=broken_config.VECTOR_COMPRESSION,
+                pca_dimensions=broken_config.VECTOR_PCA_DIMENSIONS,
+                rescore_factor=broken_config.VECTOR_RESCORE_FACTOR,
+                backend=broken_config.VECTOR_BACKEND,
             )
 
     def test_query_successful_with_tool_use(self, test_config):
@@ -63,22 +86,18 @@ class TestRAGSystem:
             patch("rag_system.SessionManager") as mock_session,
         ):
 
-            # Setup mocks
-            mock_ai_gen.return_value.generate_response.return_value = (
-                "Based on the course content, here's the answer."
+            # Setup mocks - the generator cites sources on the request context
+            mock_ai_gen.return_value.generate_response.side_effect = (
+                respond_with_sources(
+                    "Based on the course content, here's the answer.",
+                    ["Course 1 - Lesson 1"],
+                    ["https://example.com/lesson1"],
+                )
             )
             mock_session.return_value.get_conversation_history.return_value = None
 
             rag_system = RAGSystem(test_config)
 
-            # Mock tool manager to return sources
-            rag_system.tool_manager.get_last_sources = Mock(
-                return_value=["Course 1 - Lesson 1"]
-            )
-            rag_system.tool_manager.get_last_source_links = Mock(
-                return_value=["https://example.com/lesson1"]
-            )
-
             # Execute query
             response, sources, source_links = rag_system.query(
                 "What is covered in lesson 1?"
@@ -94,6 +113,7 @@ class TestRAGSystem:
             call_args = mock_ai_gen.return_value.generate_response.call_args[1]
             assert "tools" in call_args
             assert "tool_manager" in call_args
+            assert "context" in call_args
 
     def test_query_with_session_history(self, test_config):
         """Test query processing with conversation history"""
@@ -460,8 +480,8 @@ class TestRAGSystem:
             assert "search_course_content" in tool_names
             assert "get_course_outline" in tool_names
 
-    def test_source_tracking_and_reset(self, test_config):
-        """Test that sources are properly tracked and reset after queries"""
+    def test_source_tracking_is_request_scoped(self, test_config):
+        """Test that each query collects sources on its own context"""
         with (
             patch("rag_system.DocumentProcessor"),
             patch("rag_system.VectorStore"),
@@ -469,26 +489,29 @@ class TestRAGSystem:
             patch("rag_system.SessionManager"),
         ):
 
-            mock_ai_gen.return_value.generate_response.return_value = "Test response"
+            contexts = []
 
-            rag_system = RAGSystem(test_config)
+            def side_effect(**kwargs):
+                contexts.append(kwargs["context"])
+                n = len(contexts)
+                kwargs["context"].add_sources([f"Source {n}"], [f"Link {n}"])
+                return f"Response {n}"
 
-            # Mock tool manager methods
-            rag_system.tool_manager.get_last_sources = Mock(return_value=["Source 1"])
-            rag_system.tool_manager.get_last_source_links = Mock(
-                return_value=["Link 1"]
-            )
-            rag_system.tool_manager.reset_sources = Mock()
+            mock_ai_gen.return_value.generate_response.side_effect = side_effect
 
-            # Execute query
-            response, sources, source_links = rag_system.query("Test query")
+            rag_system = RAGSystem(test_config)
 
-            # Assert sources were retrieved
-            assert sources == ["Source 1"]
-            assert source_links == ["Link 1"]
+            first = rag_system.query("First query")
+            second = rag_system.query("Second query")
 
-            # Verify sources were reset after retrieval
-            rag_system.tool_manager.reset_sources.assert_called_once()
+            # Each query sees only the sources cited while answering it
+            assert first == ("Response 1", ["Source 1"], ["Link 1"])
+            assert second == ("Response 2", ["Source 2"], ["Link 2"])
+            assert contexts[0] is not contexts[1]
+
+            # Generation time is recorded on the request context
+            response, context = rag_system.query_with_context("Third query")
+            assert "generate" in context.timings
 
     def test_end_to_end_query_flow_integration(self, test_config):
         """Test complete end-to-end query processing flow"""
@@ -502,17 +525,15 @@ class TestRAGSystem:
             # Setup comprehensive mocks
             mock_session.return_value.create_session.return_value = "new_session_123"
             mock_session.return_value.get_conversation_history.return_value = None
-            mock_ai_gen.return_value.generate_response.return_value = (
-                "Comprehensive answer based on course materials."
+            mock_ai_gen.return_value.generate_response.side_effect = (
+                respond_with_sources(
+                    "Comprehensive answer based on course materials.",
+                    ["Complete Course - Lesson 5"],
+                    ["https://example.com/lesson5"],
+                )
             )
 
             rag_system = RAGSystem(test_config)
-            rag_system.tool_manager.get_last_sources = Mock(
-                return_value=["Complete Course - Lesson 5"]
-            )
-            rag_system.tool_manager.get_last_source_links = Mock(
-                return_value=["https://example.com/lesson5"]
-            )
 
             # Execute complete flow
             response, sources, source_links = rag_system.query(
@@ -532,3 +553,265 @@ class TestRAGSystem:
             )
             assert "tools" in call_args
             assert "tool_manager" in call_args
+
+    def test_aquery_uses_async_generator(self, test_config):
+        """Test that aquery awaits the async generator and updates the session"""
+        with (
+            patch("rag_system.DocumentProcessor"),
+            patch("rag_system.VectorStore"),
+            patch("rag_system.AIGenerator") as mock_ai_gen,
+            patch("rag_system.SessionManager") as mock_session,
+        ):
+
+            mock_ai_gen.return_value.agenerate_response = AsyncMock(
+                side_effect=respond_with_sources(
+                    "Async response.", ["Source 1"], ["Link 1"]
+                )
+            )
+            mock_session.return_value.get_conversation_history.return_value = None
+
+            rag_system = RAGSystem(test_config)
+
+            response, sources, source_links = asyncio.run(
+                rag_system.aquery("What is AI?", session_id="session123")
+            )
+
+            assert response == "Async response."
+            assert sources == ["Source 1"]
+            assert source_links == ["Link 1"]
+            mock_ai_gen.return_value.generate_response.assert_not_called()
+            call_args = mock_ai_gen.return_value.agenerate_response.call_args[1]
+            assert call_args["tool_manager"] is rag_system.tool_manager
+            mock_session.return_value.add_exchange.assert_called_once_with(
+                "session123", "What is AI?", "Async response."
+            )
+
+    def test_async_session_calls_run_on_query_executor(self, test_config):
+        """Test that async paths keep session store calls off the event loop"""
+        with (
+            patch("rag_system.DocumentProcessor"),
+            patch("rag_system.VectorStore"),
+            patch("rag_system.AIGenerator") as mock_ai_gen,
+            patch("rag_system.SessionManager") as mock_session,
+        ):
+            mock_ai_gen.return_value.agenerate_response = AsyncMock(
+                return_value="Async response."
+            )
+            threads = []
+            session_manager = mock_session.return_value
+            session_manager.create_session.side_effect = (
+                lambda: threads.append(threading.current_thread().name) or "session123"
+            )
+            session_manager.add_exchange.side_effect = lambda *args: threads.append(
+                threading.current_thread().name
+            )
+            session_manager.get_conversation_history.return_value = None
+            rag_system = RAGSystem(test_config)
+
+            async def run():
+                session_id = await rag_system.acreate_session()
+                await rag_system.aquery("What is AI?", session_id=session_id)
+
+            asyncio.run(run())
+
+            assert len(threads) == 2
+            assert all(name.startswith("rag-query") for name in threads)
+
+    def test_history_fits_token_budget(self, test_config):
+        """Test that old exchanges beyond the token budget are left out"""
+        with (
+            patch("rag_system.DocumentProcessor"),
+            patch("rag_system.VectorStore"),
+            patch("rag_system.AIGenerator") as mock_ai_gen,
+        ):
+            mock_ai_gen.return_value.generate_response.return_value = "Answer."
+            test_config.TOOL_RESULT_TOKEN_RESERVE = 0
+            test_config.PROMPT_CACHING = True
+            rag_system = RAGSystem(test_config)
+
+            # Size of the prompt without history
+            _, context = rag_system.query_with_context("Follow up?")
+            fixed = sum(context.prompt_tokens.values())
+            assert context.prompt_tokens["history"] == 0
+
+            session_id = rag_system.session_manager.create_session()
+            rag_system.session_manager.add_exchange(
+                session_id, "Old question", "word " * 400
+            )
+            rag_system.session_manager.add_exchange(
+                session_id, "Recent question", "Short answer."
+            )
+            test_config.CONTEXT_TOKEN_BUDGET = fixed + 100
+
+            _, context = rag_system.query_with_context("Follow up?", session_id)
+
+            call_args = mock_ai_gen.return_value.generate_response.call_args[1]
+            assert call_args["conversation_history"] == [
+                {"role": "user", "content": "Recent question"},
+                {"role": "assistant", "content": "Short answer."},
+            ]
+            assert 0 < context.prompt_tokens["history"] <= 100
+            assert set(context.prompt_tokens) == {"system", "tools", "query", "history"}
+
+    def test_repeated_query_served_from_answer_cache(self, test_config):
+        """Test that a similar first-turn question skips the AI generator"""
+        with (
+            patch("rag_system.DocumentProcessor"),
+            patch("rag_system.VectorStore") as mock_vector_store,
+            patch("rag_system.AIGenerator") as mock_ai_gen,
+            patch("rag_system.SessionManager"),
+        ):
+            test_config.ANSWER_CACHE_SIZE = 10
+            mock_ai_gen.SYSTEM_PROMPT = "system prompt"
+            mock_ai_gen.return_value.generate_response.side_effect = (
+                respond_with_sources("Cached response.", ["Source 1"], ["Link 1"])
+            )
+            store = mock_vector_store.return_value
+            store.generation = 1
+            store.embed_query.side_effect = lambda text: (
+                [1.0, 0.0] if "lesson 2" in text else [0.0, 1.0]
+            )
+
+            rag_system = RAGSystem(test_config)
+            rag_system.query("What is lesson 2 about?")
+            response, context = rag_system.query_with_context("what is lesson 2 about")
+
+            assert response == "Cached response."
+            assert context.cache_hit
+            assert context.get_sources() == (["Source 1"], ["Link 1"])
+            assert mock_ai_gen.return_value.generate_response.call_count == 1
+
+            # A different question misses and so does any question after a write
+            rag_system.query("Who teaches the course?")
+            store.generation = 2
+            rag_system.query("What is lesson 2 about?")
+            assert mock_ai_gen.return_value.generate_response.call_count == 3
+            stats = rag_system.get_answer_cache_stats()
+            assert (stats["hits"], stats["misses"]) == (1, 3)
+
+    def test_astream_query_emits_sources_after_tool_round(self, test_config):
+        """Test that sources are streamed as soon as a tool round finishes"""
+        with (
+            patch("rag_system.DocumentProcessor"),
+            patch("rag_system.VectorStore"),
+            patch("rag_system.AIGenerator") as mock_ai_gen,
+            patch("rag_system.SessionManager") as mock_session,
+        ):
+
+            async def fake_stream(**kwargs):
+                yield {"type": "round", "round": 1, "final": False}
+                yield {"type": "tool_use", "round": 1, "tools": ["search"]}
+                kwargs["context"].add_sources(["Source 1"], ["Link 1"])
+                yield {"type": "tool_results", "round": 1}
+                yield {"type": "token", "text": "Streamed"}
+                yield {"type": "done", "answer": "Streamed"}
+
+            mock_ai_gen.return_value.astream_response = fake_stream
+            mock_session.return_value.get_conversation_history.return_value = None
+
+            rag_system = RAGSystem(test_config)
+
+            async def collect():
+                return [
+                    event
+                    async for event in rag_system.astream_query(
+                        "What is AI?", session_id="session123"
+                    )
+                ]
+
+            events = asyncio.run(collect())
+
+            types = [event["type"] for event in events]
+            assert types == [
+                "round",
+                "tool_use",
+                "tool_results",
+                "sources",
+                "token",
+                "done",
+            ]
+            assert events[3]["sources"] == ["Source 1"]
+            assert events[-1]["answer"] == "Streamed"
+            assert events[-1]["source_links"] == ["Link 1"]
+            mock_session.return_value.add_exchange.assert_called_once_with(
+                "session123", "What is AI?", "Streamed"
+            )
+
+    def test_add_course_folder_reports_progress(self, test_config, tmp_path):
+        """Test that add_course_folder reports start and per-file events"""
+        with (
+            patch("rag_system.DocumentProcessor") as mock_doc_proc,
+            patch("rag_system.VectorStore") as mock_vector_store,
+            patch("rag_system.AIGenerator"),
+            patch("rag_system.SessionManager"),
+        ):
+            (tmp_path / "new.txt").write_text("x")
+            (tmp_path / "old.txt").write_text("x")
+            (tmp_path / "ignore.jpg").write_text("x")
+
+            mock_vector_store.return_value.get_existing_course_titles.return_value = [
+                "Old Course"
+            ]
+
+            def process(content, file_name):
+                title = "New Course" if file_name == "new.txt" else "Old Course"
+                return Course(title=title), [
+                    CourseChunk(content="c", course_title=title, chunk_index=0)
+                ]
+
+            mock_vector_store.return_value.chunk_id.return_value = "chunk_0"
+            mock_doc_proc.return_value.read_file.return_value = "x"
+            mock_doc_proc.return_value.process_course_text.side_effect = process
+            test_config.INGEST_PARSE_WORKERS = 0
+            test_config.CHROMA_PATH = str(tmp_path / "chroma")
+
+            rag_system = RAGSystem(test_config)
+            events = []
+            total_courses, total_chunks = rag_system.add_course_folder(
+                str(tmp_path), on_progress=events.append
+            )
+
+            assert (total_courses, total_chunks) == (1, 1)
+            assert events[0] == {"event": "start", "files_total": 2}
+            statuses = {e["file"]: e["status"] for e in events[1:]}
+            assert statuses == {"new.txt": "added", "old.txt": "skipped"}
+
+    def test_add_course_folder_removes_deleted_files(self, test_config, tmp_path):
+        """Test that courses whose files were deleted are dropped on re-ingestion"""
+        with (
+            patch("rag_system.DocumentProcessor") as mock_doc_proc,
+            patch("rag_system.VectorStore") as mock_vector_store,
+            patch("rag_system.AIGenerator"),
+            patch("rag_system.SessionManager"),
+        ):
+            docs = tmp_path / "docs"
+            docs.mkdir()
+            (docs / "gone.txt").write_text("x")
+
+            mock_vector_store.return_value.get_existing_course_titles.return_value = []
+            mock_vector_store.return_value.chunk_id.return_value = "Gone_Course_0"
+            mock_doc_proc.return_value.read_file.return_value = "x"
+            mock_doc_proc.return_value.process_course_text.return_value = (
+                Course(title="Gone Course"),
+                [CourseChunk(content="c", course_title="Gone Course", chunk_index=0)],
+            )
+            test_config.INGEST_PARSE_WORKERS = 0
+            test_config.CHROMA_PATH = str(tmp_path / "chroma")
+
+            rag_system = RAGSystem(test_config)
+            rag_system.add_course_folder(str(docs))
+            assert os.path.exists(tmp_path / "chroma" / "ingest_manifest.json")
+
+            (docs / "gone.txt").unlink()
+            events = []
+            rag_system.add_course_folder(str(docs), on_progress=events.append)
+
+            mock_vector_store.return_value.delete_course.assert_called_once_with(
+                "Gone Course"
+            )
+            assert events[-1] == {
+                "event": "removed",
+                "file": "gone.txt",
+                "course": "Gone Course",
+            }
+            assert rag_system.ingestion_manifest.entries == {}
@@ -0,0 +1,144 @@
+"""
+Unit tests for RetrievalContext — per-request sources, tool calls and timings.
+"""
+
+import threading
+
+import pytest
+
+from retrieval_context import RetrievalContext, ToolInvocation
+from search_tools import CourseSearchTool, ToolManager
+
+
+class TestRetrievalContext:
+    """Tests for the RetrievalContext container."""
+
+    def test_add_sources_appends(self):
+        ctx = RetrievalContext()
+        ctx.add_sources(["A - Lesson 1", "A - Lesson 1"], ["l1", "l1"])
+        ctx.add_sources(["B"], [None])
+        assert ctx.get_sources() == (
+            ["A - Lesson 1", "A - Lesson 1", "B"],
+            ["l1", "l1", None],
+        )
+
+    def test_get_sources_returns_snapshot(self):
+        ctx = RetrievalContext()
+        ctx.add_sources(["A"], ["l1"])
+        sources, links = ctx.get_sources()
+        sources.append("B")
+        assert ctx.sources == ["A"]
+
+    def test_record_tool_call_accumulates_timing(self):
+        ctx = RetrievalContext()
+        ctx.record_tool_call(ToolInvocation("search", {"query": "x"}, "r", 0.5))
+        ctx.record_tool_call(ToolInvocation("search", {"query": "y"}, "r", 0.25))
+        assert len(ctx.tool_calls) == 2
+        assert ctx.timings["tool:search"] == pytest.approx(0.75)
+
+    def test_record_usage_accumulates(self):
+        context = RetrievalContext()
+        context.record_usage({"input_tokens": 10, "cache_read_input_tokens": 90})
+        context.record_usage({"input_tokens": 5, "cache_read_input_tokens": 95})
+        assert context.usage == {"input_tokens": 15, "cache_read_input_tokens": 185}
+
+    def test_prompt_tokens_include_tool_results(self):
+        context = RetrievalContext()
+        context.record_prompt_tokens({"system": 100, "history": 20})
+        context.record_tool_call(
+            ToolInvocation("search", {"query": "x"}, "What is RAG?", 0.1)
+        )
+        context.record_tool_call(
+            ToolInvocation("search", {"query": "y"}, None, 0.1, error="failed")
+        )
+        assert context.prompt_tokens == {
+            "system": 100,
+            "history": 20,
+            "tool_results": 6,  # 4 for the result, 2 for the error
+        }
+
+    def test_timed_records_stage(self):
+        ctx = RetrievalContext()
+        with ctx.timed("generate"):
+            pass
+        with ctx.timed("generate"):
+            pass
+        assert ctx.timings["generate"] >= 0.0
+
+    def test_forks_merge_until_closed(self):
+        ctx = RetrievalContext()
+        ctx.add_sources(["A"], ["l1"])
+        finished, abandoned = ctx.fork(), ctx.fork()
+        finished.add_sources(["B"], [None])
+        finished.record_tool_call(ToolInvocation("search", {}, "r", 0.5))
+        abandoned.close()
+        abandoned.add_sources(["Late"], [None])
+
+        ctx.merge(finished)
+        ctx.merge(abandoned)
+
+        assert ctx.get_sources() == (["A", "B"], ["l1", None])
+        assert len(ctx.tool_calls) == 1
+        assert ctx.timings["tool:search"] == pytest.approx(0.5)
+
+    def test_concurrent_add_sources(self):
+        ctx = RetrievalContext()
+
+        def worker(n):
+            ctx.add_sources([f"S{n}"], [None])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(ctx.sources) == sorted(f"S{i}" for i in range(20))
+
+
+class TestToolManagerWithContext:
+    """Tests for threading a RetrievalContext through ToolManager."""
+
+    def test_sources_go_to_context_not_tool(self, mock_vector_store):
+        manager = ToolManager()
+        tool = CourseSearchTool(mock_vector_store)
+        manager.register_tool(tool)
+
+        ctx = RetrievalContext()
+        result = manager.execute_tool("search_course_content", ctx, query="test")
+
+        assert "Sample document content" in result
+        assert ctx.sources == ["Test Course - Lesson 1"]
+        assert ctx.source_links == ["https://example.com/lesson1"]
+        # Shared tool state is untouched by context-scoped execution
+        assert tool.last_sources == []
+
+        assert len(ctx.tool_calls) == 1
+        call = ctx.tool_calls[0]
+        assert call.name == "search_course_content"
+        assert call.arguments == {"query": "test"}
+        assert call.result == result
+        assert call.error is None
+
+    def test_overlapping_requests_do_not_leak(self, mock_vector_store):
+        manager = ToolManager()
+        manager.register_tool(CourseSearchTool(mock_vector_store))
+
+        ctx_a, ctx_b = RetrievalContext(), RetrievalContext()
+        manager.execute_tool("search_course_content", ctx_a, query="a")
+        mock_vector_store.get_lesson_link.return_value = "https://example.com/other"
+        manager.execute_tool("search_course_content", ctx_b, query="b")
+
+        assert ctx_a.source_links == ["https://example.com/lesson1"]
+        assert ctx_b.source_links == ["https://example.com/other"]
+
+    def test_failed_tool_is_recorded(self, mock_vector_store):
+        manager = ToolManager()
+        manager.register_tool(CourseSearchTool(mock_vector_store))
+        mock_vector_store.search.side_effect = RuntimeError("boom")
+
+        ctx = RetrievalContext()
+        with pytest.raises(RuntimeError):
+            manager.execute_tool("search_course_content", ctx, query="x")
+
+        assert ctx.tool_calls[0].error == "boom"
+        assert ctx.tool_calls[0].result is None
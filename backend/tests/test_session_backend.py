@@ -0,0 +1,275 @@
+"""
+Unit tests for the shared SQLite session backend and batched writer.
+"""
+
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+
+from session_backend import (
+    BatchedSessionWriter,
+    SessionWrite,
+    SQLiteSessionBackend,
+    create_session_backend,
+)
+from session_manager import SessionManager
+from session_summary import SessionSummarizer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions" / "sessions.db")
+
+
+def _worker(db_path, clock=None, **kwargs):
+    """A SessionManager as one uvicorn worker would build it"""
+    return SessionManager(
+        max_history=2,
+        backend=SQLiteSessionBackend(db_path),
+        clock=clock or FakeClock(),
+        **kwargs,
+    )
+
+
+class TestSQLiteSessionBackend:
+    """Tests for the SQLite storage itself."""
+
+    def test_uses_wal_mode(self, db_path):
+        SQLiteSessionBackend(db_path)
+        mode = sqlite3.connect(db_path).execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+    def test_round_trip_and_trim(self, db_path):
+        backend = SQLiteSessionBackend(db_path)
+        backend.write_batch(
+            [
+                SessionWrite("s1", 1.0, [("user", "Q1"), ("assistant", "A1")]),
+                SessionWrite("s1", 2.0, [("user", "Q2"), ("assistant", "A2")]),
+            ],
+            max_messages=3,
+        )
+        assert backend.load("s1") == (
+            2.0,
+            [("assistant", "A1"), ("user", "Q2"), ("assistant", "A2")],
+            "",
+        )
+        assert backend.load("unknown") is None
+
+    def test_delete_and_expire(self, db_path):
+        backend = SQLiteSessionBackend(db_path)
+        backend.write_batch(
+            [
+                SessionWrite("old", 1.0, [("user", "Q")]),
+                SessionWrite("new", 5.0),
+                SessionWrite("gone", 5.0),
+                SessionWrite("gone", 6.0, delete=True),
+            ],
+            max_messages=4,
+        )
+        assert backend.count() == 2
+        assert backend.expire(cutoff=3.0) == ["old"]
+        assert backend.load("old") is None
+        assert backend.load("new") == (5.0, [], "")
+
+    def test_summary_is_stored_with_session(self, db_path):
+        backend = SQLiteSessionBackend(db_path)
+        backend.write_batch(
+            [
+                SessionWrite("s1", 1.0, [("user", "Q")]),
+                SessionWrite("s1", 2.0, summary="- Asked: Q"),
+            ],
+            max_messages=4,
+        )
+        assert backend.load("s1") == (2.0, [("user", "Q")], "- Asked: Q")
+
+    def test_adds_summary_column_to_older_databases(self, db_path):
+        SQLiteSessionBackend(db_path).close()
+        db = sqlite3.connect(db_path)
+        db.execute("DROP TABLE sessions")
+        db.execute("CREATE TABLE sessions (id TEXT PRIMARY KEY, last_access REAL)")
+        db.execute("INSERT INTO sessions VALUES ('old', 1.0)")
+        db.commit()
+        db.close()
+
+        assert SQLiteSessionBackend(db_path).load("old") == (1.0, [], "")
+
+    def test_unknown_backend(self, db_path):
+        assert create_session_backend("memory", db_path) is None
+        with pytest.raises(ValueError):
+            create_session_backend("redis", db_path)
+
+
+class TestBatchedSessionWriter:
+    """Tests for batching writes into transactions."""
+
+    def test_flush_commits_queued_writes_in_one_batch(self, db_path):
+        backend = SQLiteSessionBackend(db_path)
+        writer = BatchedSessionWriter(backend, max_messages=4, flush_interval=60)
+        for i in range(5):
+            writer.put(SessionWrite(f"s{i}", 1.0, [("user", "Q")]))
+        writer.flush()
+        assert backend.count() == 5
+        assert writer.stats()["batches"] == 1
+        assert writer.stats()["writes"] == 5
+        writer.stop(timeout=1)
+
+    def test_failed_batch_is_retried_then_dropped(self, db_path):
+        backend = SQLiteSessionBackend(db_path)
+        writer = BatchedSessionWriter(
+            backend, max_messages=4, flush_interval=60, max_attempts=2
+        )
+        write_batch = backend.write_batch
+        backend.write_batch = Mock(side_effect=sqlite3.OperationalError("locked"))
+        writer.put(SessionWrite("s1", 1.0, [("user", "Q")]))
+
+        writer.flush()
+        assert writer.pending == 1  # Requeued
+        backend.write_batch = write_batch
+        writer.flush()
+        assert backend.load("s1") == (1.0, [("user", "Q")], "")
+
+        backend.write_batch = Mock(side_effect=sqlite3.OperationalError("locked"))
+        writer.put(SessionWrite("s2", 2.0))
+        writer.flush()
+        writer.flush()
+        assert writer.pending == 0
+        assert writer.stats()["write_errors"] == 3
+        assert writer.stats()["dropped_writes"] == 1
+        writer.stop(timeout=1)
+
+    def test_background_thread_flushes(self, db_path):
+        backend = SQLiteSessionBackend(db_path)
+        writer = BatchedSessionWriter(backend, max_messages=4, flush_interval=0.01)
+        writer.put(SessionWrite("s1", 1.0, [("user", "Q")]))
+        writer.stop(timeout=1)
+        assert backend.load("s1") == (1.0, [("user", "Q")], "")
+        assert writer.pending == 0
+
+
+class TestSharedSessions:
+    """Tests for SessionManager instances sharing one database."""
+
+    def test_ids_do_not_collide_across_workers(self, db_path):
+        first, second = _worker(db_path), _worker(db_path)
+        ids = {first.create_session() for _ in range(50)}
+        ids |= {second.create_session() for _ in range(50)}
+        assert len(ids) == 100
+
+    def test_history_is_visible_to_other_workers(self, db_path):
+        first, second = _worker(db_path), _worker(db_path)
+        sid = first.create_session()
+        first.add_exchange(sid, "What is RAG?", "Retrieval-augmented generation.")
+        first.writer.flush()
+
+        assert second.get_history_messages(sid) == [
+            {"role": "user", "content": "What is RAG?"},
+            {"role": "assistant", "content": "Retrieval-augmented generation."},
+        ]
+
+    def test_reads_are_cached_until_cache_ttl(self, db_path):
+        clock = FakeClock()
+        first = _worker(db_path, clock)
+        second = _worker(db_path, clock, cache_ttl=1.0)
+        sid = first.create_session()
+        first.add_exchange(sid, "Q1", "A1")
+        first.writer.flush()
+        assert len(second.get_history_messages(sid)) == 2
+
+        first.add_exchange(sid, "Q2", "A2")
+        first.writer.flush()
+        assert len(second.get_history_messages(sid)) == 2  # Served from cache
+
+        clock.now += 2
+        assert [m["content"] for m in second.get_history_messages(sid)] == [
+            "Q1",
+            "A1",
+            "Q2",
+            "A2",
+        ]
+        stats = second.stats()
+        assert stats["cache_hits"] == 1
+        assert stats["cache_loads"] == 2
+
+    def test_stale_reads_merge_queued_writes_without_flushing(self, db_path):
+        clock = FakeClock()
+        worker = _worker(db_path, clock, cache_ttl=1.0, write_interval=60)
+        sid = worker.create_session()
+        worker.add_exchange(sid, "Q1", "A1")
+        worker.add_exchange(sid, "Q2", "A2")
+
+        clock.now += 2
+        history = worker.get_history_messages(sid)
+        assert [m["content"] for m in history] == ["Q1", "A1", "Q2", "A2"]
+        assert worker.stats()["cache_loads"] == 1
+        assert worker.writer.batches == 0
+        assert worker.backend.load(sid) is None
+
+    def test_sweep_counts_sessions_expired_by_other_workers(self, db_path):
+        clock = FakeClock()
+        first = _worker(db_path, clock, ttl_seconds=10)
+        second = _worker(db_path, clock, ttl_seconds=10)
+        first.create_session()
+        second.create_session()
+        first.writer.flush()
+
+        clock.now += 11
+        assert second.sweep_expired() == 2
+        assert second.stats()["expirations"] == 2
+
+    def test_clear_and_expiry_apply_to_every_worker(self, db_path):
+        clock = FakeClock()
+        first = _worker(db_path, clock, ttl_seconds=10, cache_ttl=0)
+        second = _worker(db_path, clock, ttl_seconds=10, cache_ttl=0)
+        cleared = first.create_session()
+        idle = first.create_session()
+        first.add_exchange(cleared, "Q", "A")
+        first.add_exchange(idle, "Q", "A")
+
+        first.clear_session(cleared)
+        first.writer.flush()
+        assert second.get_history_messages(cleared) is None
+
+        clock.now += 11
+        second.sweep_expired()
+        assert first.get_history_messages(idle) is None
+
+    def test_expired_sessions_are_counted_once(self, db_path):
+        clock = FakeClock()
+        worker = _worker(db_path, clock, ttl_seconds=10)
+        worker.add_exchange(worker.create_session(), "Q", "A")
+        worker.writer.flush()
+
+        clock.now += 11
+        assert worker.sweep_expired() == 1
+        assert worker.stats()["expirations"] == 1
+
+    def test_close_commits_pending_writes(self, db_path):
+        first = _worker(db_path, write_interval=60)
+        sid = first.create_session()
+        first.add_exchange(sid, "Q", "A")
+        first.close(timeout=1)
+
+        assert len(_worker(db_path).get_history_messages(sid)) == 2
+
+    def test_summary_is_shared_with_other_workers(self, db_path):
+        first = _worker(db_path, summarizer=SessionSummarizer(max_tokens=100))
+        second = _worker(db_path)
+        sid = first.create_session()
+        first.add_exchange(sid, "Q1?", "A1.")
+        first.add_exchange(sid, "Q2?", "A2.")
+        first.add_exchange(sid, "Q3?", "A3.")
+        first.summarizer.wait()
+        first.writer.flush()
+
+        history = second.get_history_messages(sid)
+        assert history[0]["content"].endswith("- Asked: Q1?\n- Answered: A1.")
+        assert [m["content"] for m in history[2:]] == ["Q2?", "A2.", "Q3?", "A3."]
@@ -2,11 +2,21 @@
 Unit tests for SessionManager — conversation session lifecycle and message history.
 """
 
+import threading
+
 import pytest
 
 from session_manager import Message, SessionManager
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
 class TestMessage:
     """Tests for the Message dataclass."""
 
@@ -56,7 +66,7 @@ class TestSessionManagerCreation:
         sm = SessionManager()
         sid = sm.create_session()
         assert sid in sm.sessions
-        assert sm.sessions[sid] == []
+        assert list(sm.sessions[sid]) == []
 
 
 class TestAddMessage:
@@ -163,6 +173,26 @@ class TestGetConversationHistory:
         assert len(lines) == 4
 
 
+class TestGetHistoryMessages:
+    """Tests for history formatted as API messages."""
+
+    def test_none_for_unknown_or_empty_session(self):
+        sm = SessionManager()
+        sid = sm.create_session()
+        assert sm.get_history_messages(None) is None
+        assert sm.get_history_messages("nonexistent") is None
+        assert sm.get_history_messages(sid) is None
+
+    def test_returns_role_content_dicts(self):
+        sm = SessionManager()
+        sid = sm.create_session()
+        sm.add_exchange(sid, "What is RAG?", "Retrieval-augmented generation.")
+        assert sm.get_history_messages(sid) == [
+            {"role": "user", "content": "What is RAG?"},
+            {"role": "assistant", "content": "Retrieval-augmented generation."},
+        ]
+
+
 class TestClearSession:
     """Tests for clearing / deleting sessions."""
 
@@ -209,3 +239,139 @@ class TestSessionIsolation:
         sm.clear_session(s2)
         assert s1 in sm.sessions
         assert s2 not in sm.sessions
+
+
+class TestCapacity:
+    """Tests for the least-recently-used session limit."""
+
+    def test_evicts_least_recently_used(self):
+        sm = SessionManager(max_sessions=2)
+        s1 = sm.create_session()
+        s2 = sm.create_session()
+        sm.add_message(s1, "user", "still here")  # s1 is now most recent
+        s3 = sm.create_session()
+        assert s2 not in sm.sessions
+        assert list(sm.sessions) == [s1, s3]
+        assert sm.stats()["evictions"] == 1
+
+    def test_ring_buffer_keeps_latest_messages(self):
+        sm = SessionManager(max_history=1)
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1", "A1")
+        sm.add_exchange(sid, "Q2", "A2")
+        assert [m.content for m in sm.sessions[sid]] == ["Q2", "A2"]
+
+
+class TestExpiry:
+    """Tests for idle TTL expiry."""
+
+    def test_idle_session_expires_on_lookup(self):
+        clock = FakeClock()
+        sm = SessionManager(ttl_seconds=10, clock=clock)
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q", "A")
+        clock.now = 11
+        assert sm.get_history_messages(sid) is None
+        assert sid not in sm.sessions
+        assert sm.stats()["expirations"] == 1
+
+    def test_access_refreshes_ttl(self):
+        clock = FakeClock()
+        sm = SessionManager(ttl_seconds=10, clock=clock)
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q", "A")
+        clock.now = 8
+        assert sm.get_conversation_history(sid)
+        clock.now = 16
+        assert sm.get_conversation_history(sid)
+
+    def test_sweep_removes_only_idle_sessions(self):
+        clock = FakeClock()
+        sm = SessionManager(ttl_seconds=10, clock=clock)
+        old = sm.create_session()
+        clock.now = 5
+        fresh = sm.create_session()
+        clock.now = 12
+        assert sm.sweep_expired() == 1
+        assert list(sm.sessions) == [fresh]
+        assert old not in sm.sessions
+
+    def test_background_sweeper_expires_sessions(self):
+        clock = FakeClock()
+        sm = SessionManager(ttl_seconds=1, sweep_interval=0.01, clock=clock)
+        sm.create_session()
+        clock.now = 5
+        sm.start_sweeper()
+        try:
+            for _ in range(500):
+                if not len(sm):
+                    break
+                threading.Event().wait(0.01)
+        finally:
+            sm.stop_sweeper(timeout=1)
+        assert len(sm) == 0
+
+
+class TestConcurrency:
+    """Tests for concurrent use of one session."""
+
+    def test_concurrent_exchanges_stay_paired(self):
+        sm = SessionManager(max_history=1000)
+        sid = sm.create_session()
+
+        def worker(n):
+            for i in range(50):
+                sm.add_exchange(sid, f"Q{n}-{i}", f"A{n}-{i}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        messages = list(sm.sessions[sid])
+        assert len(messages) == 800
+        for question, answer in zip(messages[::2], messages[1::2]):
+            assert question.role == "user" and answer.role == "assistant"
+            assert answer.content == "A" + question.content[1:]
+
+
+class TestStats:
+    """Tests for occupancy and memory metrics."""
+
+    def test_reports_occupancy_and_memory(self):
+        sm = SessionManager(max_sessions=4)
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q", "A")
+        sm.create_session()
+        stats = sm.stats()
+        assert stats["sessions"] == 2
+        assert stats["occupancy"] == 0.5
+        assert stats["messages"] == 2
+        assert stats["created"] == 2
+        assert stats["memory_bytes"] > 0
+
+
+class TestTokenBudget:
+    """Tests for history trimmed to a token budget."""
+
+    def test_budget_drops_oldest_exchanges(self):
+        sm = SessionManager(max_history=5)
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1", "long answer " * 100)
+        sm.add_exchange(sid, "Q2", "A2")
+        assert sm.get_history_messages(sid, max_tokens=50) == [
+            {"role": "user", "content": "Q2"},
+            {"role": "assistant", "content": "A2"},
+        ]
+        assert (
+            sm.get_conversation_history(sid, max_tokens=50) == "User: Q2\nAssistant: A2"
+        )
+        assert len(sm.get_history_messages(sid)) == 4
+
+    def test_nothing_fits(self):
+        sm = SessionManager()
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1", "A1")
+        assert sm.get_history_messages(sid, max_tokens=0) is None
+        assert sm.get_conversation_history(sid, max_tokens=0) is None
@@ -0,0 +1,141 @@
+"""
+Unit tests for rolling summarization compaction of long sessions.
+"""
+
+from unittest.mock import Mock
+
+from session_manager import SUMMARY_ACKNOWLEDGEMENT, SUMMARY_HEADING, SessionManager
+from session_summary import SessionSummarizer, extractive_summary
+
+
+def _compacting(summarize=None, max_history=1, max_tokens=300):
+    return SessionManager(
+        max_history=max_history,
+        summarizer=SessionSummarizer(summarize, max_tokens=max_tokens),
+    )
+
+
+class TestExtractiveSummary:
+    """Tests for the local fallback summary."""
+
+    def test_keeps_questions_and_first_sentences(self):
+        summary = extractive_summary(
+            "",
+            [
+                {"role": "user", "content": "What is RAG?"},
+                {
+                    "role": "assistant",
+                    "content": "Retrieval-augmented generation. It adds search.",
+                },
+            ],
+            max_tokens=100,
+        )
+        assert summary == (
+            "- Asked: What is RAG?\n- Answered: Retrieval-augmented generation."
+        )
+
+    def test_drops_oldest_lines_beyond_budget(self):
+        previous = "\n".join(f"- Asked: question number {i}" for i in range(50))
+        summary = extractive_summary(
+            previous, [{"role": "user", "content": "Latest question"}], max_tokens=20
+        )
+        assert summary.endswith("- Asked: Latest question")
+        assert "question number 0" not in summary
+
+
+class TestSessionSummarizer:
+    """Tests for model summaries and the fallback."""
+
+    def test_uses_model_summary(self):
+        summarize = Mock(return_value="- Discussed RAG")
+        summarizer = SessionSummarizer(summarize, max_tokens=50)
+        messages = [{"role": "user", "content": "What is RAG?"}]
+
+        assert summarizer.compact("earlier", messages) == "- Discussed RAG"
+        summarize.assert_called_once_with("earlier", messages, 50)
+        assert summarizer.stats()["model_summaries"] == 1
+
+    def test_falls_back_when_model_fails(self):
+        summarizer = SessionSummarizer(Mock(side_effect=RuntimeError("overloaded")))
+
+        summary = summarizer.compact("", [{"role": "user", "content": "What is RAG?"}])
+
+        assert summary == "- Asked: What is RAG?"
+        assert summarizer.stats()["fallback_summaries"] == 1
+
+
+class TestSessionCompaction:
+    """Tests for SessionManager folding old turns into a summary."""
+
+    def test_dropped_turns_are_summarized(self):
+        sm = _compacting(Mock(return_value="- Discussed Q1"))
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1", "A1")
+        sm.add_exchange(sid, "Q2", "A2")
+        sm.summarizer.wait()
+
+        assert sm.get_history_messages(sid) == [
+            {"role": "user", "content": f"{SUMMARY_HEADING}\n- Discussed Q1"},
+            {"role": "assistant", "content": SUMMARY_ACKNOWLEDGEMENT},
+            {"role": "user", "content": "Q2"},
+            {"role": "assistant", "content": "A2"},
+        ]
+        assert sm.get_conversation_history(sid).startswith(
+            f"{SUMMARY_HEADING}\n- Discussed Q1\nUser: Q2"
+        )
+        sm.summarizer.summarize.assert_called_once_with(
+            "",
+            [{"role": "user", "content": "Q1"}, {"role": "assistant", "content": "A1"}],
+            300,
+        )
+
+    def test_summary_rolls_forward(self):
+        sm = _compacting()  # Extractive only
+        sid = sm.create_session()
+        for i in range(4):
+            sm.add_exchange(sid, f"Question {i}?", f"Answer {i}.")
+        sm.summarizer.wait()
+
+        summary = sm.sessions[sid].summary
+        assert summary.splitlines() == [
+            "- Asked: Question 0?",
+            "- Answered: Answer 0.",
+            "- Asked: Question 1?",
+            "- Answered: Answer 1.",
+            "- Asked: Question 2?",
+            "- Answered: Answer 2.",
+        ]
+        assert [m.content for m in sm.sessions[sid]] == ["Question 3?", "Answer 3."]
+
+    def test_pending_turns_are_covered_before_compaction_finishes(self):
+        sm = _compacting()
+        sm.summarizer.submit = Mock()  # Compaction never runs
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1?", "A1.")
+        sm.add_exchange(sid, "Q2?", "A2.")
+
+        history = sm.get_history_messages(sid)
+        assert (
+            history[0]["content"] == f"{SUMMARY_HEADING}\n- Asked: Q1?\n- Answered: A1."
+        )
+
+    def test_summary_counts_against_token_budget(self):
+        sm = _compacting(Mock(return_value="word " * 200))
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1", "A1")
+        sm.add_exchange(sid, "Q2", "A2")
+        sm.summarizer.wait()
+
+        # Too small for the summary: only the recent turns are sent
+        assert sm.get_history_messages(sid, max_tokens=50) == [
+            {"role": "user", "content": "Q2"},
+            {"role": "assistant", "content": "A2"},
+        ]
+        assert len(sm.get_history_messages(sid, max_tokens=1000)) == 4
+
+    def test_without_summarizer_old_turns_are_dropped(self):
+        sm = SessionManager(max_history=1)
+        sid = sm.create_session()
+        sm.add_exchange(sid, "Q1", "A1")
+        sm.add_exchange(sid, "Q2", "A2")
+        assert len(sm.get_history_messages(sid)) == 2
@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_function import LazySentenceTransformerFunction
+from startup import LazyModule, StartupProfile, WarmUp
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStartupProfile:
+    """Test cases for the startup phase timeline"""
+
+    def test_phase_records_offset_and_duration(self):
+        clock = FakeClock()
+        profile = StartupProfile(clock)
+        clock.now += 1.0
+        with profile.phase("load"):
+            clock.now += 2.5
+
+        (phase,) = profile.as_dict()["phases"]
+        assert phase == {"name": "load", "start": 1.0, "seconds": 2.5}
+        assert profile.as_dict()["uptime"] == 3.5
+
+    def test_failed_phase_records_error_and_reraises(self):
+        profile = StartupProfile(FakeClock())
+        with pytest.raises(RuntimeError):
+            with profile.phase("load"):
+                raise RuntimeError("boom")
+
+        assert profile.as_dict()["phases"][0]["error"] == "boom"
+
+    def test_record_defaults_start_to_now_minus_duration(self):
+        clock = FakeClock()
+        profile = StartupProfile(clock)
+        clock.now += 5.0
+        profile.record("imports", 2.0)
+
+        assert profile.as_dict()["phases"][0]["start"] == 3.0
+
+
+class TestLazyModule:
+    """Test cases for deferred module imports"""
+
+    def test_imports_on_first_attribute_access(self):
+        profile = StartupProfile()
+        module = LazyModule("json", profile)
+        assert profile.as_dict()["phases"] == []
+
+        assert module.dumps([1]) == "[1]"
+        module.loads("[]")
+
+        names = [phase["name"] for phase in profile.as_dict()["phases"]]
+        assert names == ["import json"]
+
+
+class TestWarmUp:
+    """Test cases for the background warm-up task"""
+
+    def test_runs_steps_in_order_and_completes(self):
+        calls = []
+        profile = StartupProfile()
+        warm_up = WarmUp(
+            [("a", lambda: calls.append("a")), ("b", lambda: calls.append("b"))],
+            profile,
+        )
+        assert warm_up.status == "pending"
+
+        warm_up.start()
+        assert warm_up.wait(timeout=5)
+
+        assert calls == ["a", "b"]
+        assert warm_up.status == "completed"
+        names = [phase["name"] for phase in profile.as_dict()["phases"]]
+        assert names == ["warm-up: a", "warm-up: b"]
+
+    def test_failing_step_does_not_stop_the_rest(self):
+        calls = []
+
+        def fail():
+            raise RuntimeError("model missing")
+
+        warm_up = WarmUp(
+            [("model", fail), ("index", lambda: calls.append("index"))],
+            StartupProfile(),
+            max_attempts=1,
+        )
+        warm_up.run()
+
+        assert calls == ["index"]
+        assert warm_up.finished
+        assert warm_up.to_dict() == {
+            "status": "failed",
+            "errors": {"model": "model missing"},
+        }
+
+    def test_failed_steps_are_retried_with_backoff(self):
+        failures = [RuntimeError("download timed out")] * 2
+        calls = []
+        sleeps = []
+
+        def flaky():
+            calls.append("model")
+            if failures:
+                raise failures.pop()
+
+        profile = StartupProfile()
+        warm_up = WarmUp(
+            [("model", flaky), ("index", lambda: calls.append("index"))],
+            profile,
+            sleep=sleeps.append,
+        )
+        warm_up.run()
+
+        assert calls == ["model", "index", "model", "model"]
+        assert sleeps == [1.0, 2.0]
+        assert warm_up.to_dict() == {"status": "completed", "errors": {}}
+        names = [phase["name"] for phase in profile.as_dict()["phases"]]
+        assert names[-1] == "warm-up: model (attempt 3)"
+
+    def test_no_steps_completes_immediately(self):
+        warm_up = WarmUp([], StartupProfile()).start()
+
+        assert warm_up.wait(timeout=5)
+        assert warm_up.status == "completed"
+
+
+class TestLazySentenceTransformerFunction:
+    """Test cases for the lazily loaded embedding function"""
+
+    def test_model_loads_on_first_call_only(self):
+        model = Mock(return_value=[[0.1, 0.2]])
+        factory = Mock(return_value=model)
+        function = LazySentenceTransformerFunction("test-model", factory=factory)
+        assert not function.loaded
+        factory.assert_not_called()
+
+        assert function(["hello"]) == [[0.1, 0.2]]
+        function(["again"])
+
+        factory.assert_called_once_with(
+            model_name="test-model", device="cpu", normalize_embeddings=False
+        )
+        assert model.call_count == 2
+
+    def test_concurrent_loads_build_one_model(self):
+        factory = Mock(return_value=Mock())
+        function = LazySentenceTransformerFunction("test-model", factory=factory)
+
+        threads = [threading.Thread(target=function.load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        factory.assert_called_once()
+
+    def test_reports_sentence_transformer_config(self):
+        function = LazySentenceTransformerFunction("test-model", factory=Mock())
+
+        assert function.name() == "sentence_transformer"
+        config = function.get_config()
+        assert config == {
+            "model_name": "test-model",
+            "device": "cpu",
+            "normalize_embeddings": False,
+            "kwargs": {},
+        }
+        assert not function.loaded
@@ -0,0 +1,61 @@
+"""
+Unit tests for prompt token estimation and history fitting.
+"""
+
+from token_budget import (
+    MESSAGE_OVERHEAD_TOKENS,
+    estimate_message_tokens,
+    estimate_tokens,
+    estimate_tools_tokens,
+    fit_messages,
+)
+
+
+def _exchange(question, answer):
+    return [
+        {"role": "user", "content": question},
+        {"role": "assistant", "content": answer},
+    ]
+
+
+class TestEstimateTokens:
+    """Tests for the local token estimate."""
+
+    def test_empty_text(self):
+        assert estimate_tokens("") == 0
+
+    def test_words_numbers_and_punctuation(self):
+        # "What" "is" "RAG" "?" are one token each; 12345 is two
+        assert estimate_tokens("What is RAG?") == 4
+        assert estimate_tokens("12345") == 2
+
+    def test_long_words_count_per_four_characters(self):
+        assert estimate_tokens("internationalization") == 5
+
+    def test_grows_with_length(self):
+        assert estimate_tokens("word " * 100) == 100
+
+    def test_message_and_tools(self):
+        message = {"role": "user", "content": "What is RAG?"}
+        assert estimate_message_tokens(message) == 4 + MESSAGE_OVERHEAD_TOKENS
+        assert estimate_tools_tokens([]) == 0
+        assert estimate_tools_tokens([{"name": "search", "input_schema": {}}]) > 0
+
+
+class TestFitMessages:
+    """Tests for trimming history to a token budget."""
+
+    def test_keeps_everything_within_budget(self):
+        messages = _exchange("Q1", "A1") + _exchange("Q2", "A2")
+        assert fit_messages(messages, 1000) == messages
+
+    def test_drops_oldest_exchanges_first(self):
+        messages = _exchange("Q1", "long answer " * 100) + _exchange("Q2", "A2")
+        assert fit_messages(messages, 50) == _exchange("Q2", "A2")
+
+    def test_never_splits_an_exchange(self):
+        messages = _exchange("Q1", "A1") + _exchange("Q2", "long answer " * 100)
+        assert fit_messages(messages, 50) == []
+
+    def test_zero_budget(self):
+        assert fit_messages(_exchange("Q1", "A1"), 0) == []
@@ -0,0 +1,257 @@
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Course, CourseChunk, Lesson
+from vector_backend import NumpyVectorBackend
+from vector_store import VectorStore
+
+
+def _collection(tmp_path, name="content", embedding_function=None):
+    backend = NumpyVectorBackend(str(tmp_path))
+    return backend.get_or_create_collection(name, embedding_function)
+
+
+def _fill(collection):
+    collection.upsert(
+        ids=["a", "b", "c"],
+        documents=["alpha", "beta", "gamma"],
+        metadatas=[
+            {"course_title": "X", "lesson_number": 1},
+            {"course_title": "X", "lesson_number": 2},
+            {"course_title": "Y", "lesson_number": 1},
+        ],
+        embeddings=[[1.0, 0.0], [0.6, 0.8], [0.0, 2.0]],
+    )
+
+
+class TestNumpyCollection:
+    """Test cases for the memory-mapped flat index collection"""
+
+    def test_query_ranks_by_cosine(self, tmp_path):
+        collection = _collection(tmp_path)
+        _fill(collection)
+
+        results = collection.query(query_embeddings=[[1.0, 0.1]], n_results=2)
+
+        assert results["ids"] == [["a", "b"]]
+        assert results["documents"] == [["alpha", "beta"]]
+        assert results["metadatas"][0][0] == {"course_title": "X", "lesson_number": 1}
+        assert results["distances"][0][0] == pytest.approx(
+            1 - 1 / np.sqrt(1.01), abs=1e-6
+        )
+
+    def test_query_filters_and_batches(self, tmp_path):
+        collection = _collection(tmp_path)
+        _fill(collection)
+
+        results = collection.query(
+            query_embeddings=[[1.0, 0.0], [0.0, 1.0]],
+            n_results=5,
+            where={"$and": [{"course_title": "X"}, {"lesson_number": 2}]},
+        )
+        assert results["ids"] == [["b"], ["b"]]
+
+        results = collection.query(
+            query_embeddings=[[0.0, 1.0]],
+            n_results=5,
+            where={"lesson_number": {"$in": [1]}},
+        )
+        assert results["ids"] == [["c", "a"]]
+        assert collection.query([[1.0, 0.0]], where={"course_title": "Z"}) == {
+            "ids": [[]],
+            "distances": [[]],
+            "documents": [[]],
+            "metadatas": [[]],
+        }
+
+    def test_upsert_get_and_delete(self, tmp_path):
+        collection = _collection(tmp_path)
+        _fill(collection)
+        collection.upsert(
+            ids=["b", "d"],
+            documents=["beta 2", "delta"],
+            metadatas=[{"course_title": "X"}, {"course_title": "Z"}],
+            embeddings=[[0.0, 1.0], [-1.0, 0.0]],
+        )
+
+        assert collection.count() == 4
+        got = collection.get(ids=["d", "b", "missing"], include=["embeddings"])
+        assert got["ids"] == ["d", "b"]
+        np.testing.assert_allclose(got["embeddings"], [[-1.0, 0.0], [0.0, 1.0]])
+        assert collection.get(where={"course_title": "X"})["documents"] == [
+            "alpha",
+            "beta 2",
+        ]
+
+        collection.delete(where={"course_title": "X"})
+        collection.delete(ids=["d"])
+        assert collection.get()["ids"] == ["c"]
+
+    def test_documents_are_embedded_without_embeddings(self, tmp_path):
+        collection = _collection(
+            tmp_path, embedding_function=lambda texts: [[len(t), 1.0] for t in texts]
+        )
+        collection.upsert(ids=["t"], documents=["title"], metadatas=[{"k": "v"}])
+
+        results = collection.query(query_embeddings=[[5.0, 1.0]], n_results=1)
+        assert results["ids"] == [["t"]]
+        assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-6)
+
+    def test_persists_and_shares_versions(self, tmp_path):
+        """Test that another client maps new versions written elsewhere"""
+        writer = _collection(tmp_path)
+        reader = _collection(tmp_path)
+        assert reader.count() == 0
+
+        _fill(writer)
+        assert reader.count() == 3
+        assert isinstance(reader.get(include=["embeddings"])["embeddings"], np.ndarray)
+        writer.delete(ids=["a"])
+        assert reader.get()["ids"] == ["b", "c"]
+
+        files = os.listdir(tmp_path / "content")
+        assert sorted(files) == ["segment-1.json", "segment-1.npy", "table.json"]
+
+    def test_writes_append_segments_and_merge(self, tmp_path):
+        """Test that a write leaves earlier segments untouched until a merge"""
+        collection = _collection(tmp_path)
+        _fill(collection)
+        first = os.stat(tmp_path / "content" / "segment-1.npy")
+
+        collection.upsert(ids=["d"], documents=["delta"], embeddings=[[1.0, 1.0]])
+        assert os.stat(tmp_path / "content" / "segment-1.npy") == first
+        assert sorted(os.listdir(tmp_path / "content"))[:4] == [
+            "segment-1.json",
+            "segment-1.npy",
+            "segment-2.json",
+            "segment-2.npy",
+        ]
+
+        # Equal-sized trailing segments merge into one
+        collection.upsert(ids=["e"], documents=["epsilon"], embeddings=[[0.0, 1.0]])
+        assert sorted(os.listdir(tmp_path / "content")) == [
+            "segment-1.json",
+            "segment-1.npy",
+            "segment-4.json",
+            "segment-4.npy",
+            "table.json",
+        ]
+        assert collection.count() == 5
+
+        # Compacted once deleted rows outnumber live ones
+        collection.delete(ids=["a", "b", "c"])
+        assert collection.get()["ids"] == ["d", "e"]
+        assert len(collection._current().segments) == 1
+        assert _collection(tmp_path).get()["ids"] == ["d", "e"]
+
+    def test_unsupported_filter_operator(self, tmp_path):
+        collection = _collection(tmp_path)
+        with pytest.raises(ValueError):
+            collection.query([[1.0, 0.0]], where={"lesson_number": {"$gt": 1}})
+        _fill(collection)
+        with pytest.raises(ValueError):
+            collection.get(where={"$not": {"course_title": "X"}})
+
+    def test_dimension_mismatch(self, tmp_path):
+        collection = _collection(tmp_path)
+        _fill(collection)
+        with pytest.raises(ValueError):
+            collection.upsert(ids=["e"], documents=["e"], embeddings=[[1.0, 0, 0]])
+
+    def test_only_the_cosine_space_is_supported(self, tmp_path):
+        backend = NumpyVectorBackend(str(tmp_path))
+        backend.get_or_create_collection("content", metadata={"hnsw:space": "cosine"})
+        with pytest.raises(ValueError):
+            backend.get_or_create_collection("other", metadata={"hnsw:space": "l2"})
+
+    def test_delete_collection(self, tmp_path):
+        backend = NumpyVectorBackend(str(tmp_path))
+        _fill(backend.get_or_create_collection("content"))
+
+        backend.delete_collection("content")
+
+        assert not os.path.exists(tmp_path / "content")
+        assert backend.get_or_create_collection("content").count() == 0
+
+
+class TestVectorStoreOnNumpyBackend:
+    """Test cases for VectorStore running on the flat index backend"""
+
+    def test_store_and_search(self, tmp_path):
+        with patch("vector_store.chromadb") as mock_chromadb:
+            embedding_functions = mock_chromadb.utils.embedding_functions
+            embedding_functions.SentenceTransformerEmbeddingFunction.return_value = (
+                lambda texts: [
+                    [float("mcp" in t.lower()), float("retrieval" in t.lower()), 0.1]
+                    for t in texts
+                ]
+            )
+            store = VectorStore(
+                str(tmp_path), "test-model", max_results=2, backend="numpy"
+            )
+        mock_chromadb.PersistentClient.assert_not_called()
+
+        store.add_course_metadata(
+            Course(title="MCP Course", lessons=[Lesson(lesson_number=1, title="Intro")])
+        )
+        store.add_course_content(
+            [
+                CourseChunk(
+                    content="MCP servers", course_title="MCP Course", chunk_index=0
+                ),
+                CourseChunk(
+                    content="Retrieval", course_title="MCP Course", chunk_index=1
+                ),
+            ]
+        )
+
+        results = store.search("mcp", mode="vector")
+        assert results.documents[0] == "MCP servers"
+        assert store.get_existing_course_titles() == ["MCP Course"]
+        assert store.get_course_metadata("MCP Course")["lessons"][0][
+            "lesson_title"
+        ] == ("Intro")
+        assert os.path.isdir(tmp_path / "numpy_index" / "course_content")
+
+        store.delete_course("MCP Course")
+        assert store.course_content.count() == 0
+
+    def test_unknown_backend(self, tmp_path):
+        with patch("vector_store.chromadb"):
+            with pytest.raises(ValueError):
+                VectorStore(str(tmp_path), "test-model", backend="faiss")
+
+    def test_warm_up_loads_model_and_queries_index(self, tmp_path):
+        with patch("vector_store.chromadb") as mock_chromadb:
+            embedding_functions = mock_chromadb.utils.embedding_functions
+            factory = embedding_functions.SentenceTransformerEmbeddingFunction
+            model = Mock(side_effect=lambda texts: [[1.0, 0.5] for _ in texts])
+            factory.return_value = model
+            store = VectorStore(
+                str(tmp_path), "test-model", backend="numpy", search_mode="hybrid"
+            )
+        factory.assert_not_called()
+        store.add_course_content(
+            [CourseChunk(content="MCP servers", course_title="MCP", chunk_index=0)]
+        )
+
+        steps = store.warm_up_steps()
+        for _, step in steps:
+            step()
+
+        assert [name for name, _ in steps] == [
+            "vector store",
+            "embedding model",
+            "catalog index",
+            "content index",
+            "lexical index",
+        ]
+        factory.assert_called_once()
+        assert store.embedding_function.loaded
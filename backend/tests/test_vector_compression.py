@@ -0,0 +1,143 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression_benchmark import evaluate, format_report
+from vector_compression import CompressedVectorIndex, VectorCodec, rescore
+
+
+def _corpus(count=200, width=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(8, width))
+    vectors = centers[rng.integers(0, 8, count)] + 0.3 * rng.normal(size=(count, width))
+    return vectors.astype(np.float32)
+
+
+class TestVectorCodec:
+    """Test cases for quantization and PCA projection"""
+
+    @pytest.mark.parametrize("mode", ["int8", "float16"])
+    def test_round_trip_is_close(self, mode):
+        codec = VectorCodec(mode)
+        vectors = _corpus(20)
+        codes, scales = codec.encode(vectors)
+
+        decoded = codec.decode(codes, scales)
+        assert decoded.shape == vectors.shape
+        np.testing.assert_allclose(decoded, codec.project(vectors), atol=0.01)
+
+    def test_int8_codes_are_one_byte(self):
+        codes, scales = VectorCodec("int8").encode(_corpus(10))
+        assert codes.dtype == np.int8
+        assert scales.dtype == np.float32
+
+    def test_pca_reduces_dimensions(self):
+        codec = VectorCodec("none", dimensions=8).fit(_corpus())
+        assert codec.projected
+        projected = codec.project(_corpus(5, seed=1))
+        assert projected.shape == (5, 8)
+        np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, atol=1e-5)
+
+    def test_pca_skipped_without_enough_samples(self):
+        codec = VectorCodec("int8", dimensions=16).fit(_corpus(4))
+        assert not codec.projected
+        assert codec.project(_corpus(1)).shape == (1, 32)
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            VectorCodec("int4")
+
+
+class TestCompressedVectorIndex:
+    """Test cases for the compressed flat index"""
+
+    def _index(self, mode="int8"):
+        index = CompressedVectorIndex(VectorCodec(mode))
+        index.add(
+            ["a", "b", "c"],
+            [[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]],
+            [
+                {"course_title": "X", "lesson_number": 1},
+                {"course_title": "X", "lesson_number": 2},
+                {"course_title": "Y", "lesson_number": 1},
+            ],
+        )
+        return index
+
+    def test_search_ranks_by_cosine(self):
+        ranked = self._index().search([1.0, 0.1], limit=2)
+        assert [doc_id for doc_id, _ in ranked] == ["a", "b"]
+        assert ranked[0][1] == pytest.approx(0.995, abs=0.01)
+
+    def test_search_filters(self):
+        index = self._index()
+        assert [i for i, _ in index.search([1.0, 0.0], 5, course_title="Y")] == ["c"]
+        assert [i for i, _ in index.search([1.0, 0.0], 5, lesson_number=2)] == ["b"]
+        assert index.search([1.0, 0.0], 5, course_title="Z") == []
+
+    def test_upsert_and_remove(self):
+        index = self._index()
+        index.add(["c", "d", "d"], [[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]])
+        assert len(index) == 4
+        ranked = index.search([-1.0, 0.0], limit=1)
+        assert ranked[0][0] == "d"
+
+        index.remove(["a", "missing"])
+        index.remove_where(course_title="X")
+        assert len(index) == 2
+        assert {i for i, _ in index.search([1.0, 0.0], 5)} == {"c", "d"}
+        index.clear()
+        assert len(index) == 0
+        assert index.search([1.0, 0.0], 5) == []
+
+    def test_memory_shrinks_with_quantization(self):
+        vectors = _corpus(100)
+        sizes = {}
+        for mode in ("none", "float16", "int8"):
+            index = CompressedVectorIndex(VectorCodec(mode))
+            index.add([str(i) for i in range(100)], vectors)
+            sizes[mode] = index.memory_bytes()
+        # Codes plus one float32 scale per vector
+        assert sizes["none"] == 100 * 32 * 4 + 400
+        assert sizes["float16"] == 100 * 32 * 2 + 400
+        assert sizes["int8"] == 100 * 32 + 400
+
+    def test_rescore_is_exact_cosine(self):
+        scores = rescore([2.0, 0.0], [[1.0, 0.0], [1.0, 1.0]])
+        np.testing.assert_allclose(scores, [1.0, np.sqrt(0.5)], rtol=1e-6)
+
+
+class TestCompressionBenchmark:
+    """Test cases for the recall/latency/memory benchmark"""
+
+    def test_evaluate_and_report(self):
+        vectors = _corpus()
+        queries = _corpus(20, seed=2)
+
+        rows = evaluate(vectors, queries, [("none", 0), ("int8", 8)], k=5)
+
+        assert rows[0].recall == 1.0
+        assert rows[0].rescored_recall == 1.0
+        assert rows[1].dimensions == 8
+        assert rows[1].memory_bytes < rows[0].memory_bytes
+        assert rows[1].rescored_recall >= rows[1].recall
+        # Lossy settings keep the float32 vectors to rescore against
+        assert rows[0].rescore_bytes == 0
+        assert rows[1].rescore_bytes == 200 * 32 * 4
+
+        corpus = {
+            "documents": 1,
+            "chunks": 200,
+            "queries": 20,
+            "model": "test",
+            "dimensions": 32,
+        }
+        report = format_report(rows, corpus, k=5, rescore_factor=4)
+        assert "| int8 | 8 |" in report
+        assert "| Rescore copy | Total |" in report
+        assert "Recall@5" in report
@@ -10,7 +10,20 @@ import pytest
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models import Course, CourseChunk, Lesson
-from vector_store import SearchResults, VectorStore
+from vector_store import SearchQuery, SearchResults, VectorStore
+
+
+def fake_embedding(text):
+    """Deterministic stand-in for a sentence embedding"""
+    return [float(len(text)), 1.0]
+
+
+def use_fake_embeddings(mock_chromadb):
+    """Make the patched Chroma embedding function return fake embeddings"""
+    embedding_functions = mock_chromadb.utils.embedding_functions
+    embedding_functions.SentenceTransformerEmbeddingFunction.return_value = (
+        lambda texts: [fake_embedding(text) for text in texts]
+    )
 
 
 class TestVectorStore:
@@ -22,6 +35,7 @@ class TestVectorStore:
             # Setup mocks
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
             mock_client.get_or_create_collection.return_value = mock_chroma_collection
 
             # Create vector store with proper config (MAX_RESULTS=5)
@@ -36,7 +50,7 @@ class TestVectorStore:
 
             # Assert that ChromaDB query was called with proper n_results
             mock_chroma_collection.query.assert_called_once_with(
-                query_texts=["test query"],
+                query_embeddings=[fake_embedding("test query")],
                 n_results=5,  # Should be 5, not 0
                 where=None,
             )
@@ -54,6 +68,7 @@ class TestVectorStore:
             # Setup mocks - simulate empty results when n_results=0
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
 
             # Mock collection that returns empty results when n_results=0
             empty_collection = Mock()
@@ -76,7 +91,9 @@ class TestVectorStore:
 
             # Assert that ChromaDB query was called with n_results=0
             empty_collection.query.assert_called_once_with(
-                query_texts=["valid query"], n_results=0, where=None  # This is the bug!
+                query_embeddings=[fake_embedding("valid query")],
+                n_results=0,
+                where=None,  # This is the bug!
             )
 
             # Verify that we get empty results even for valid queries
@@ -90,6 +107,7 @@ class TestVectorStore:
         with patch("vector_store.chromadb") as mock_chromadb:
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
 
             # Mock course catalog for course name resolution
             course_catalog = Mock()
@@ -123,12 +141,12 @@ class TestVectorStore:
 
             # Assert course resolution was called
             course_catalog.query.assert_called_once_with(
-                query_texts=["Test"], n_results=1
+                query_embeddings=[fake_embedding("Test")], n_results=1
             )
 
             # Assert content search was called with proper filter
             content_collection.query.assert_called_once_with(
-                query_texts=["test query"],
+                query_embeddings=[fake_embedding("test query")],
                 n_results=5,
                 where={"course_title": "Test Course"},
             )
@@ -141,6 +159,7 @@ class TestVectorStore:
         with patch("vector_store.chromadb") as mock_chromadb:
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
             mock_client.get_or_create_collection.return_value = mock_chroma_collection
 
             vector_store = VectorStore(
@@ -154,7 +173,9 @@ class TestVectorStore:
 
             # Assert search was called with lesson filter
             mock_chroma_collection.query.assert_called_once_with(
-                query_texts=["test query"], n_results=5, where={"lesson_number": 2}
+                query_embeddings=[fake_embedding("test query")],
+                n_results=5,
+                where={"lesson_number": 2},
             )
 
     def test_search_with_both_filters(self, test_config):
@@ -162,6 +183,7 @@ class TestVectorStore:
         with patch("vector_store.chromadb") as mock_chromadb:
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
 
             # Mock course catalog
             course_catalog = Mock()
@@ -201,7 +223,9 @@ class TestVectorStore:
                 "$and": [{"course_title": "Specific Course"}, {"lesson_number": 3}]
             }
             content_collection.query.assert_called_once_with(
-                query_texts=["test query"], n_results=5, where=expected_filter
+                query_embeddings=[fake_embedding("test query")],
+                n_results=5,
+                where=expected_filter,
             )
 
     def test_resolve_course_name_success(self, test_config):
@@ -209,6 +233,7 @@ class TestVectorStore:
         with patch("vector_store.chromadb") as mock_chromadb:
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
 
             # Mock course catalog with matching course
             course_catalog = Mock()
@@ -236,7 +261,7 @@ class TestVectorStore:
 
             assert resolved_name == "Building Towards Computer Use with Anthropic"
             course_catalog.query.assert_called_once_with(
-                query_texts=["Anthropic"], n_results=1
+                query_embeddings=[fake_embedding("Anthropic")], n_results=1
             )
 
     def test_resolve_course_name_not_found(self, test_config):
@@ -269,6 +294,42 @@ class TestVectorStore:
 
             assert resolved_name is None
 
+    def test_resolve_course_name_uses_catalog_index(self, test_config, sample_course):
+        """Test that names resolve from the in-memory index, rebuilt after writes"""
+        with patch("vector_store.chromadb") as mock_chromadb:
+            mock_client = Mock()
+            mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
+
+            course_catalog = Mock()
+            course_catalog.get.return_value = {
+                "ids": ["MCP: Build Rich-Context AI Apps", "Computer Use"],
+                "embeddings": [[1.0, 0.0], [0.0, 1.0]],
+            }
+            mock_client.get_or_create_collection.side_effect = [
+                course_catalog,
+                Mock(),
+            ]
+
+            vector_store = VectorStore(
+                chroma_path=test_config.CHROMA_PATH,
+                embedding_model=test_config.EMBEDDING_MODEL,
+                max_results=test_config.MAX_RESULTS,
+            )
+
+            assert (
+                vector_store._resolve_course_name("mcp")
+                == "MCP: Build Rich-Context AI Apps"
+            )
+            assert vector_store._resolve_course_name("computer use") == "Computer Use"
+            course_catalog.query.assert_not_called()
+            assert course_catalog.get.call_count == 1
+
+            # Catalog writes invalidate the index
+            vector_store.add_course_metadata(sample_course)
+            vector_store._resolve_course_name("mcp")
+            assert course_catalog.get.call_count == 2
+
     def test_search_course_not_found(self, test_config):
         """Test search when course name cannot be resolved"""
         with patch("vector_store.chromadb") as mock_chromadb:
@@ -400,9 +461,9 @@ class TestVectorStore:
             # Add course metadata
             vector_store.add_course_metadata(sample_course)
 
-            # Verify course catalog add was called
-            course_catalog.add.assert_called_once()
-            call_args = course_catalog.add.call_args
+            # Verify course catalog upsert was called
+            course_catalog.upsert.assert_called_once()
+            call_args = course_catalog.upsert.call_args
 
             assert call_args[1]["documents"] == [sample_course.title]
             assert call_args[1]["ids"] == [sample_course.title]
@@ -419,6 +480,7 @@ class TestVectorStore:
         with patch("vector_store.chromadb") as mock_chromadb:
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
 
             course_catalog = Mock()
             content_collection = Mock()
@@ -434,29 +496,66 @@ class TestVectorStore:
             )
 
             # Add course content
-            vector_store.add_course_content(sample_course_chunks)
+            stats = vector_store.add_course_content(sample_course_chunks)
 
-            # Verify content collection add was called
-            content_collection.add.assert_called_once()
-            call_args = content_collection.add.call_args
+            # Verify content collection upsert was called
+            content_collection.upsert.assert_called_once()
+            call_args = content_collection.upsert.call_args
 
             assert len(call_args[1]["documents"]) == len(sample_course_chunks)
             assert len(call_args[1]["metadatas"]) == len(sample_course_chunks)
             assert len(call_args[1]["ids"]) == len(sample_course_chunks)
+            assert len(stats) == 1 and stats[0].size == len(sample_course_chunks)
 
-            # Check first chunk
-            assert call_args[1]["documents"][0] == sample_course_chunks[0].content
+            # Chunks are embedded shortest first; metadata stays with its chunk
+            shortest = min(sample_course_chunks, key=lambda c: len(c.content))
+            assert call_args[1]["documents"][0] == shortest.content
+            assert call_args[1]["embeddings"][0] == fake_embedding(shortest.content)
+            assert call_args[1]["metadatas"][0]["course_title"] == shortest.course_title
             assert (
-                call_args[1]["metadatas"][0]["course_title"]
-                == sample_course_chunks[0].course_title
+                call_args[1]["metadatas"][0]["lesson_number"] == shortest.lesson_number
             )
-            assert (
-                call_args[1]["metadatas"][0]["lesson_number"]
-                == sample_course_chunks[0].lesson_number
+            assert call_args[1]["ids"][0] == VectorStore.chunk_id(shortest)
+
+    def test_add_course_content_in_batches(self, test_config, sample_course_chunks):
+        """Test that chunks are written in bounded batches"""
+        with patch("vector_store.chromadb") as mock_chromadb:
+            mock_client = Mock()
+            mock_client.get_max_batch_size.return_value = 2
+            mock_chromadb.PersistentClient.return_value = mock_client
+
+            content_collection = Mock()
+            mock_client.get_or_create_collection.side_effect = [
+                Mock(),
+                content_collection,
+            ]
+
+            vector_store = VectorStore(
+                chroma_path=test_config.CHROMA_PATH,
+                embedding_model=test_config.EMBEDDING_MODEL,
+                max_results=test_config.MAX_RESULTS,
+                write_batch_size=100,
             )
+            embeddings = [[float(i)] for i in range(len(sample_course_chunks))]
+            batches = []
+
+            stats = vector_store.add_course_content(
+                sample_course_chunks, embeddings=embeddings, on_batch=batches.append
+            )
+
+            # Capped by Chroma's max batch size; given embeddings keep chunk order
+            assert [b.size for b in stats] == [2, 1]
+            assert batches == stats
+            calls = content_collection.upsert.call_args_list
+            assert [c[1]["embeddings"] for c in calls] == [
+                embeddings[:2],
+                embeddings[2:],
+            ]
+            assert calls[1][1]["documents"] == [sample_course_chunks[2].content]
+            assert all(b.chunks_per_sec >= 0 for b in stats)
 
     def test_get_lesson_link(self, test_config):
-        """Test retrieving lesson link"""
+        """Test retrieving lesson links from the decoded lesson table"""
         with patch("vector_store.chromadb") as mock_chromadb:
             mock_client = Mock()
             mock_chromadb.PersistentClient.return_value = mock_client
@@ -464,11 +563,14 @@ class TestVectorStore:
             # Mock course catalog with lesson data
             course_catalog = Mock()
             course_catalog.get.return_value = {
+                "ids": ["Test Course"],
                 "metadatas": [
                     {
-                        "lessons_json": '[{"lesson_number": 1, "lesson_title": "Test Lesson", "lesson_link": "https://example.com/lesson1"}]'
+                        "title": "Test Course",
+                        "course_link": "https://example.com/course",
+                        "lessons_json": '[{"lesson_number": 1, "lesson_title": "Test Lesson", "lesson_link": "https://example.com/lesson1"}]',
                     }
-                ]
+                ],
             }
 
             content_collection = Mock()
@@ -483,11 +585,55 @@ class TestVectorStore:
                 max_results=test_config.MAX_RESULTS,
             )
 
-            # Get lesson link
+            # Get lesson links
+            link = vector_store.get_lesson_link("Test Course", 1)
+
+            assert link == "https://example.com/lesson1"
+            assert vector_store.get_lesson_link("Test Course", 2) is None
+            assert vector_store.get_lesson_link("Other Course", 1) is None
+            assert (
+                vector_store.get_course_link("Test Course")
+                == "https://example.com/course"
+            )
+            assert vector_store.get_course_metadata("Test Course")["lessons"] == [
+                {
+                    "lesson_number": 1,
+                    "lesson_title": "Test Lesson",
+                    "lesson_link": "https://example.com/lesson1",
+                }
+            ]
+
+            # The catalog is read and decoded once for all lookups
+            course_catalog.get.assert_called_once_with(
+                include=["embeddings", "metadatas"]
+            )
+
+    def test_get_lesson_link_without_index(self, test_config):
+        """Test that lesson links fall back to catalog reads if the index fails"""
+        with patch("vector_store.chromadb") as mock_chromadb:
+            mock_client = Mock()
+            mock_chromadb.PersistentClient.return_value = mock_client
+
+            course_catalog = Mock()
+            course_catalog.get.return_value = {
+                "metadatas": [
+                    {
+                        "lessons_json": '[{"lesson_number": 1, "lesson_link": "https://example.com/lesson1"}]'
+                    }
+                ]
+            }
+            mock_client.get_or_create_collection.side_effect = [course_catalog, Mock()]
+
+            vector_store = VectorStore(
+                chroma_path=test_config.CHROMA_PATH,
+                embedding_model=test_config.EMBEDDING_MODEL,
+                max_results=test_config.MAX_RESULTS,
+            )
+
             link = vector_store.get_lesson_link("Test Course", 1)
 
             assert link == "https://example.com/lesson1"
-            course_catalog.get.assert_called_once_with(ids=["Test Course"])
+            course_catalog.get.assert_called_with(ids=["Test Course"])
 
     def test_search_results_from_chroma(self):
         """Test SearchResults.from_chroma method"""
@@ -514,3 +660,395 @@ class TestVectorStore:
         assert results.distances == []
         assert results.error == "Test error message"
         assert results.is_empty()
+
+    def test_client_opens_in_warm_up(self, test_config):
+        """Test that building the store defers opening Chroma to the warm-up"""
+        with patch("vector_store.chromadb") as mock_chromadb:
+            store = VectorStore(test_config.CHROMA_PATH, test_config.EMBEDDING_MODEL)
+            mock_chromadb.PersistentClient.assert_not_called()
+
+            name, step = store.warm_up_steps()[0]
+            assert name == "vector store"
+            step()
+            step()
+
+            mock_chromadb.PersistentClient.assert_called_once()
+            client = mock_chromadb.PersistentClient.return_value
+            assert client.get_or_create_collection.call_count == 2
+            for call in client.get_or_create_collection.call_args_list:
+                assert call.kwargs["metadata"] == {"hnsw:space": "cosine"}
+            assert store.course_content is client.get_or_create_collection.return_value
+
+
+class TestHybridSearch:
+    """Test cases for BM25 + vector retrieval"""
+
+    CHUNKS = {
+        "MCP_0": ("Call the get_course_outline tool for a course", 0),
+        "MCP_1": ("Embeddings map text into a vector space", 1),
+        "MCP_2": ("Vector databases store embeddings for retrieval", 2),
+    }
+
+    def _store(self, test_config, vector_ids, **kwargs):
+        """Store whose content collection holds CHUNKS and ranks vector_ids"""
+        with patch("vector_store.chromadb") as mock_chromadb:
+            mock_client = Mock()
+            mock_chromadb.PersistentClient.return_value = mock_client
+            use_fake_embeddings(mock_chromadb)
+            content = MagicMock()
+            mock_client.get_or_create_collection.side_effect = lambda name, **kw: (
+                content if name == "course_content" else MagicMock()
+            )
+            store = VectorStore(
+                chroma_path=test_config.CHROMA_PATH,
+                embedding_model=test_config.EMBEDDING_MODEL,
+                max_results=2,
+                **kwargs,
+            )
+
+        def metadata(chunk_id):
+            return {
+                "course_title": "MCP",
+                "lesson_number": self.CHUNKS[chunk_id][1],
+                "chunk_index": self.CHUNKS[chunk_id][1],
+            }
+
+        content.get.return_value = {
+            "ids": list(self.CHUNKS),
+            "documents": [text for text, _ in self.CHUNKS.values()],
+            "metadatas": [metadata(chunk_id) for chunk_id in self.CHUNKS],
+        }
+        content.query.return_value = {
+            "ids": [vector_ids],
+            "documents": [[self.CHUNKS[i][0] for i in vector_ids]],
+            "metadatas": [[metadata(i) for i in vector_ids]],
+            "distances": [[0.2 + 0.1 * n for n in range(len(vector_ids))]],
+        }
+        return store, content
+
+    def test_hybrid_fuses_exact_term_match(self, test_config):
+        """Test that a chunk found only by BM25 is fused into the results"""
+        store, content = self._store(
+            test_config, vector_ids=["MCP_1", "MCP_2"], search_mode="hybrid"
+        )
+
+        results = store.search("get_course_outline")
+
+        assert results.documents[0] == self.CHUNKS["MCP_0"][0]
+        assert results.distances[0] == 0.0
+        assert len(results.documents) == 2
+        # Candidates are over-fetched from the vector side before fusion
+        assert content.query.call_args.kwargs["n_results"] == 6
+
+    def test_lexical_mode_skips_embedding(self, test_config):
+        """Test that the lexical fast path never embeds or queries Chroma"""
+        store, content = self._store(test_config, vector_ids=[])
+        store.embed_query = Mock()
+
+        results = store.search("vector embeddings", mode="lexical")
+
+        store.embed_query.assert_not_called()
+        content.query.assert_not_called()
+        assert set(results.documents) == {
+            self.CHUNKS["MCP_1"][0],
+            self.CHUNKS["MCP_2"][0],
+        }
+
+    def test_lexical_search_honours_filters(self, test_config):
+        store, _ = self._store(test_config, vector_ids=[])
+
+        results = store.search("embeddings", lesson_number=2, mode="lexical")
+
+        assert results.documents == [self.CHUNKS["MCP_2"][0]]
+
+    def test_writes_update_built_index(self, test_config):
+        """Test that content writes and deletes keep the BM25 index current"""
+        store, content = self._store(test_config, vector_ids=[], search_mode="lexical")
+        assert len(store.get_lexical_index()) == 3
+
+        store.add_course_content(
+            [
+                CourseChunk(
+                    content="Prompt caching reuses prefixes",
+                    course_title="MCP",
+                    lesson_number=3,
+                    chunk_index=3,
+                )
+            ]
+        )
+        assert store.search("caching").documents == ["Prompt caching reuses prefixes"]
+
+        store.delete_course_content(["MCP_3"])
+        assert store.search("caching").is_empty()
+
+        store.delete_course("MCP")
+        assert len(store.get_lexical_index()) == 0
+        content.get.assert_called_once()
+
+    def test_default_mode_is_vector(self, test_config):
+        """Test that BM25 is opt-in so distances stay cosine by default"""
+        store, content = self._store(test_config, vector_ids=["MCP_1"])
+
+        results = store.search("embeddings")
+
+        content.get.assert_not_called()
+        assert results.distances == [0.2]
+        assert "lexical index" not in [name for name, _ in store.warm_up_steps()]
+
+    def test_vector_mode_keeps_plain_query(self, test_config):
+        store, content = self._store(test_config, vector_ids=["MCP_1"])
+
+        store.search("embeddings", mode="vector")
+
+        content.get.assert_not_called()
+        assert content.query.call_args.kwargs["n_results"] == 2
+
+    def test_unknown_search_mode(self, test_config):
+        with pytest.raises(ValueError):
+            self._store(test_config, vector_ids=[], search_mode="fuzzy")
+
+
+class TestSearchMany:
+    """Test cases for batched multi-query search"""
+
+    def _store(self, test_config):
+        with patch("vector_store.chromadb") as mock_chromadb:
+            mock_client = Mock()
+            mock_chromadb.PersistentClient.return_value = mock_client
+            embed = Mock(side_effect=lambda texts: [fake_embedding(t) for t in texts])
+            embedding_functions = mock_chromadb.utils.embedding_functions
+            embedding_functions.SentenceTransformerEmbeddingFunction.return_value = (
+                embed
+            )
+            content = MagicMock()
+            mock_client.get_or_create_collection.side_effect = lambda name, **kw: (
+                content if name == "course_content" else MagicMock()
+            )
+            store = VectorStore(
+                chroma_path=test_config.CHROMA_PATH,
+                embedding_model=test_config.EMBEDDING_MODEL,
+                max_results=3,
+                search_mode="vector",
+            )
+
+        def query(query_embeddings, n_results, where):
+            rows = range(len(query_embeddings))
+            return {
+                "ids": [[f"id{len(e)}_{r}"] for r, e in zip(rows, query_embeddings)],
+                "documents": [[f"doc for {e[0]:.0f}"] for e in query_embeddings],
+                "metadatas": [[{"where": str(where)}] for _ in rows],
+                "distances": [[0.1] for _ in rows],
+            }
+
+        content.query.side_effect = query
+        return store, content, embed
+
+    def test_one_embedding_pass_and_grouped_queries(self, test_config):
+        """Test that queries sharing a filter go to Chroma together"""
+        store, content, embed = self._store(test_config)
+
+        results = store.search_many(
+            [
+                "alpha",
+                SearchQuery("beta query", lesson_number=2),
+                "gamma!",
+                "alpha",
+            ]
+        )
+
+        # Duplicate texts are embedded once, all in one batch
+        embed.assert_called_once_with(["alpha", "beta query", "gamma!"])
+        assert content.query.call_count == 2
+        unfiltered = content.query.call_args_list[0].kwargs
+        assert unfiltered["where"] is None
+        assert len(unfiltered["query_embeddings"]) == 3
+        assert content.query.call_args_list[1].kwargs["where"] == {"lesson_number": 2}
+
+        assert [r.documents for r in results] == [
+            ["doc for 5"],
+            ["doc for 10"],
+            ["doc for 6"],
+            ["doc for 5"],
+        ]
+        assert results[1].metadata == [{"where": "{'lesson_number': 2}"}]
+
+    def test_unresolved_course_only_fails_its_entry(self, test_config):
+        store, content, _ = self._store(test_config)
+        store._resolve_course_name = Mock(
+            side_effect=lambda name: "MCP Course" if name == "MCP" else None
+        )
+
+        results = store.search_many(
+            [
+                SearchQuery("servers", course_name="MCP"),
+                SearchQuery("servers", course_name="Unknown"),
+                SearchQuery("clients", course_name="MCP"),
+            ]
+        )
+
+        assert results[1].error == "No course found matching 'Unknown'"
+        assert not results[0].error and not results[2].error
+        content.query.assert_called_once()
+        assert content.query.call_args.kwargs["where"] == {"course_title": "MCP Course"}
+
+    def test_chroma_error_reported_per_query(self, test_config):
+        store, content, _ = self._store(test_config)
+        content.query.side_effect = Exception("Database down")
+
+        results = store.search_many(["one", "two"])
+
+        assert [r.error for r in results] == ["Search error: Database down"] * 2
+
+
+class TestCompressedSearch:
+    """Test cases for compressed candidate search with rescoring"""
+
+    VECTORS = {
+        "a": ([1.0, 0.0, 0.0], "Course A"),
+        "b": ([0.9, 0.3, 0.0], "Course A"),
+        "c": ([0.8, 0.0, 0.6], "Course B"),
+        "d": ([0.0, 0.0, 1.0], "Course B"),
+    }
+
+    def _store(self, tmp_path, **kwargs):
+        with patch("vector_store.chromadb") as mock_chromadb:
+            mock_client = Mock()
+            mock_chromadb.PersistentClient.return_value = mock_client
+            embedding_functions = mock_chromadb.utils.embedding_functions
+            embedding_functions.SentenceTransformerEmbeddingFunction.return_value = (
+                lambda texts: [[1.0, 0.1, 0.2] for _ in texts]
+            )
+            content = MagicMock()
+            mock_client.get_or_create_collection.side_effect = lambda name, **kw: (
+                content if name == "course_content" else MagicMock()
+            )
+            store = VectorStore(
+                chroma_path=str(tmp_path),
+                embedding_model="test-model",
+                max_results=2,
+                search_mode="vector",
+                **kwargs,
+            )
+
+        def get(ids=None, include=None):
+            ids = list(self.VECTORS) if ids is None else ids
+            return {
+                "ids": ids,
+                "embeddings": [self.VECTORS[i][0] for i in ids],
+                "documents": [f"text {i}" for i in ids],
+                "metadatas": [{"course_title": self.VECTORS[i][1]} for i in ids],
+            }
+
+        content.get.side_effect = get
+        return store, content
+
+    def test_candidates_are_rescored_at_full_precision(self, tmp_path):
+        """Test that compressed search replaces the Chroma query"""
+        store, content = self._store(tmp_path, vector_compression="int8")
+
+        results = store.search("query")
+
+        content.query.assert_not_called()
+        assert results.documents == ["text a", "text b"]
+        assert results.distances[0] == pytest.approx(1 - 1.0 / 1.0247, abs=1e-3)
+        assert results.distances[0] < results.distances[1]
+        # Candidate vectors come from the mapped copy, only records from Chroma
+        candidate_read = content.get.call_args_list[-1].kwargs
+        assert set(candidate_read["ids"]) == set(self.VECTORS)
+        assert "embeddings" not in candidate_read["include"]
+        assert store.rescore_vectors.count() == 4
+        assert os.path.isdir(tmp_path / "rescore_vectors" / "course_content")
+
+    def test_existing_vectors_are_copied_once(self, tmp_path):
+        """Test that content stored before compression is copied on first build"""
+        store, content = self._store(tmp_path, vector_compression="int8")
+        assert store.rescore_vectors.count() == 0
+
+        store.get_compressed_index()
+        store._update_compressed_index(None)
+        store.get_compressed_index()
+
+        embedding_reads = [
+            call
+            for call in content.get.call_args_list
+            if "embeddings" in call.kwargs["include"]
+        ]
+        assert len(embedding_reads) == 1
+
+    def test_filters_apply_to_compressed_index(self, tmp_path):
+        store, content = self._store(tmp_path, vector_compression="float16")
+        store._resolve_course_name = Mock(return_value="Course B")
+
+        results = store.search("query", course_name="B")
+
+        assert results.documents == ["text c", "text d"]
+        assert set(content.get.call_args.kwargs["ids"]) == {"c", "d"}
+
+    def test_writes_update_compressed_index(self, tmp_path):
+        store, content = self._store(tmp_path, vector_compression="int8")
+        index = store.get_compressed_index()
+        assert len(index) == 4
+
+        store.add_course_content(
+            [CourseChunk(content="new", course_title="Course C", chunk_index=0)],
+            embeddings=[[0.0, 1.0, 0.0]],
+        )
+        assert len(index) == store.rescore_vectors.count() == 5
+        store.delete_course("Course B")
+        assert len(index) == store.rescore_vectors.count() == 3
+        store.clear_all_data()
+        assert store._compressed_index is None
+        assert store.rescore_vectors.count() == 0
+
+    def test_warm_up_skips_backend_index(self, tmp_path):
+        """Test that warm-up builds the compressed index, not Chroma's"""
+        store, content = self._store(tmp_path, vector_compression="int8")
+
+        steps = store.warm_up_steps()
+        for _, step in steps:
+            step()
+
+        assert [name for name, _ in steps] == [
+            "vector store",
+            "embedding model",
+            "catalog index",
+            "compressed index",
+        ]
+        content.query.assert_not_called()
+        assert store._compressed_index is not None
+
+    def test_stats_count_rescore_copy(self, tmp_path):
+        """Test that the footprint includes the full-precision copy on disk"""
+        store, _ = self._store(tmp_path, vector_compression="int8")
+        index = store.get_compressed_index()
+
+        stats = store.get_compression_stats()
+
+        assert stats["memory_bytes"] == index.memory_bytes() > 0
+        assert stats["rescore_copy"] is True
+        # Four float32 vectors of three dimensions, plus the side table
+        assert stats["rescore_disk_bytes"] > 4 * 3 * 4
+        assert stats["total_bytes"] == (
+            stats["memory_bytes"] + stats["rescore_disk_bytes"]
+        )
+        assert self._store(tmp_path / "off")[0].get_compression_stats() == {
+            "enabled": False
+        }
+
+    def test_disabled_by_default(self, tmp_path):
+        store, content = self._store(tmp_path)
+        content.query.return_value = {
+            "ids": [["a"]],
+            "documents": [["text a"]],
+            "metadatas": [[{}]],
+            "distances": [[0.1]],
+        }
+
+        assert store.get_compressed_index() is None
+        assert store.rescore_vectors is None
+        assert store.search("query").documents == ["text a"]
+        content.query.assert_called_once()
+
+    def test_unknown_compression_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            self._store(tmp_path, vector_compression="int4")
@@ -0,0 +1,69 @@
+import json
+import math
+import re
+from typing import Any, Dict, List
+
+# Word pieces, numbers and single punctuation marks, roughly how BPE
+# tokenizers split English text and code
+_PIECE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Characters per token inside long words and numbers
+CHARS_PER_TOKEN = 4
+
+# Role and separator tokens the API adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text without a network call.
+
+    Counts one token per punctuation mark and one per four characters of
+    each word or number. It is a rough estimate rather than Claude's exact
+    tokenizer, but close enough to budget prompts and cheap enough to run
+    on every request.
+    """
+    if not text:
+        return 0
+    return sum(
+        math.ceil(len(piece) / CHARS_PER_TOKEN) for piece in _PIECE.findall(text)
+    )
+
+
+def estimate_message_tokens(message: Dict[str, Any]) -> int:
+    """Estimate the tokens of one API message, including its overhead"""
+    content = message.get("content", "")
+    if not isinstance(content, str):
+        content = json.dumps(content)
+    return estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_tools_tokens(tools: List[Dict[str, Any]]) -> int:
+    """Estimate the tokens of tool definitions as sent with a request"""
+    return estimate_tokens(json.dumps(tools)) if tools else 0
+
+
+def fit_messages(
+    messages: List[Dict[str, Any]], max_tokens: int
+) -> List[Dict[str, Any]]:
+    """
+    Keep the most recent messages that fit within max_tokens.
+
+    Messages are dropped oldest first and whole exchanges at a time, so the
+    kept history never starts with an assistant reply to a dropped question.
+    """
+    kept: List[Dict[str, Any]] = []
+    used = 0
+    exchange: List[Dict[str, Any]] = []
+    exchange_tokens = 0
+    for message in reversed(messages):
+        exchange.insert(0, message)
+        exchange_tokens += estimate_message_tokens(message)
+        if message.get("role") != "user":
+            continue
+        if used + exchange_tokens > max_tokens:
+            break
+        kept[:0] = exchange
+        used += exchange_tokens
+        exchange, exchange_tokens = [], 0
+    return kept
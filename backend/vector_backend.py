@@ -0,0 +1,620 @@
+import json
+import os
+import shutil
+import threading
+from itertools import chain, compress
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+
+class VectorCollection(Protocol):
+    """
+    The part of the Chroma collection API VectorStore relies on.
+
+    get and query return Chroma-shaped dicts: get has flat lists per
+    included field, query has one list per query embedding.
+    """
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]: ...
+
+    def query(
+        self,
+        query_embeddings: Sequence[Any],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]: ...
+
+    def upsert(
+        self,
+        ids: List[str],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Sequence[Any]] = None,
+    ): ...
+
+    def delete(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None
+    ): ...
+
+    def count(self) -> int: ...
+
+
+class VectorBackend(Protocol):
+    """The part of the Chroma client API VectorStore relies on"""
+
+    def get_or_create_collection(
+        self,
+        name: str,
+        embedding_function: Optional[Callable] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> VectorCollection: ...
+
+    def delete_collection(self, name: str): ...
+
+    def get_max_batch_size(self) -> Optional[int]: ...
+
+
+# Comparison operators of Chroma's metadata filters that the flat index supports
+FILTER_OPERATORS = ("$eq", "$ne", "$in", "$nin")
+
+
+def _check_operators(key: str, condition: Any):
+    """Reject filter operators the flat index would otherwise ignore"""
+    if key.startswith("$") and key not in ("$and", "$or"):
+        raise ValueError(f"Unsupported filter operator: {key}")
+    if isinstance(condition, dict):
+        for op in condition:
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style metadata filter against one record"""
+    for key, condition in where.items():
+        _check_operators(key, condition)
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class _Segment:
+    """Rows written together: one mapped embeddings file and its records"""
+
+    def __init__(
+        self,
+        name: str,
+        ids: List[str],
+        documents: List[Optional[str]],
+        metadatas: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+        deleted: Iterable[int] = (),
+    ):
+        self.name = name
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.embeddings = embeddings  # (rows, dimensions) float32, unit length
+        self.deleted = frozenset(deleted)  # Rows replaced or removed since
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def live_count(self) -> int:
+        return len(self.ids) - len(self.deleted)
+
+    def live_rows(self) -> List[int]:
+        return [row for row in range(len(self.ids)) if row not in self.deleted]
+
+    def with_deleted(self, rows: Iterable[int]) -> "_Segment":
+        return _Segment(
+            self.name,
+            self.ids,
+            self.documents,
+            self.metadatas,
+            self.embeddings,
+            self.deleted | set(rows),
+        )
+
+
+class _Snapshot:
+    """
+    One immutable version of a collection.
+
+    Rows are numbered across its segments in order; rows deleted from a
+    segment keep their number but are excluded from every read.
+    """
+
+    def __init__(
+        self,
+        segments: List[_Segment],
+        version: int = 0,
+        stamp: Optional[tuple] = None,
+        next_segment: int = 1,
+    ):
+        self.segments = segments
+        self.version = version
+        self.stamp = stamp  # (inode, mtime) of the table it was read from
+        self.next_segment = next_segment
+        self.offsets = np.cumsum([0] + [len(s) for s in segments])
+        self.ids = list(chain.from_iterable(s.ids for s in segments))
+        self.documents = list(chain.from_iterable(s.documents for s in segments))
+        self.metadatas = list(chain.from_iterable(s.metadatas for s in segments))
+        self.live = np.ones(len(self.ids), dtype=bool)
+        for start, segment in zip(self.offsets, segments):
+            if segment.deleted:
+                self.live[start + np.fromiter(segment.deleted, dtype=np.int64)] = False
+        live_rows = np.flatnonzero(self.live).tolist()
+        self.rows = dict(zip(compress(self.ids, self.live), live_rows))
+        self.width = segments[0].embeddings.shape[1] if segments else None
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def column(self, key: str) -> np.ndarray:
+        """Metadata values of one key as an array, for vectorized filters"""
+        if key not in self._columns:
+            values = np.empty(len(self.ids), dtype=object)
+            values[:] = [metadata.get(key) for metadata in self.metadatas]
+            self._columns[key] = values
+        return self._columns[key]
+
+    def mask(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Boolean row mask for a filter (None: every row)"""
+        if not where:
+            return None
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, condition in where.items():
+            _check_operators(key, condition)
+            if key == "$and":
+                for clause in condition:
+                    mask &= self.mask(clause)
+            elif key == "$or":
+                either = np.zeros(len(self.ids), dtype=bool)
+                for clause in condition:
+                    either |= self.mask(clause)
+                mask &= either
+            elif isinstance(condition, dict) and set(condition) - {"$eq"}:
+                # Membership operators are rare; evaluate them row by row
+                mask &= np.fromiter(
+                    (_matches(m, {key: condition}) for m in self.metadatas),
+                    dtype=bool,
+                    count=len(self.ids),
+                )
+            else:
+                value = (
+                    condition.get("$eq") if isinstance(condition, dict) else condition
+                )
+                mask &= self.column(key) == value
+        return mask
+
+    def select(self, where: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Live rows matching a filter, in row order"""
+        mask = self.mask(where)
+        return np.flatnonzero(self.live if mask is None else self.live & mask)
+
+    def vectors(self, rows: Sequence[int]) -> np.ndarray:
+        """Embeddings of the given rows, copied out of their segments"""
+        out = np.empty((len(rows), self.width or 0), dtype=np.float32)
+        if not len(rows):
+            return out
+        rows = np.asarray(rows, dtype=np.int64)
+        owners = np.searchsorted(self.offsets, rows, side="right") - 1
+        for owner in np.unique(owners):
+            picked = owners == owner
+            segment = self.segments[owner]
+            out[picked] = segment.embeddings[rows[picked] - self.offsets[owner]]
+        return out
+
+    def scores(self, queries: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Dot products of unit queries with the given rows"""
+        if not len(rows) or not self.segments:
+            return np.zeros((len(queries), 0), dtype=np.float32)
+        if len(rows) < len(self.ids) // 2:
+            return queries @ self.vectors(rows).T
+        # Most rows are wanted: score each mapped segment in place
+        full = np.hstack([queries @ s.embeddings.T for s in self.segments])
+        return full[:, rows]
+
+    def without_rows(self, rows: Iterable[int]) -> List[_Segment]:
+        """Segments with the given rows marked deleted"""
+        by_segment: Dict[int, List[int]] = {}
+        for row in map(int, rows):
+            owner = int(np.searchsorted(self.offsets, row, side="right")) - 1
+            by_segment.setdefault(owner, []).append(row - int(self.offsets[owner]))
+        return [
+            segment.with_deleted(by_segment[i]) if i in by_segment else segment
+            for i, segment in enumerate(self.segments)
+        ]
+
+
+class NumpyCollection:
+    """
+    Collection stored as memory-mapped NumPy segments and a JSON manifest.
+
+    Each write appends a segment: segment-<n>.npy holds its embeddings,
+    normalized to unit length and opened with mmap_mode="r", so worker
+    processes share the pages through the OS page cache, and
+    segment-<n>.json holds their ids, documents and metadata. table.json
+    lists the segments of the current version and the rows replaced or
+    deleted in each. Queries are an exact dot product over the segments
+    with top-k selection, after a vectorized metadata mask; distances are
+    cosine distances.
+
+    Segment files are written under new names and the table is renamed
+    into place last, so readers see whole versions only. A write costs
+    time proportional to its own rows plus occasional merges: the newest
+    segment is merged into the one before it while it holds at least as
+    many live rows, and everything is compacted once deleted rows
+    outnumber live ones. That keeps the segment count logarithmic and the
+    total cost of ingesting N rows O(N log N). Other processes pick up a
+    new version on their next read; writes are expected from one process
+    at a time.
+    """
+
+    TABLE_FILE = "table.json"
+    SEGMENT_PREFIX = "segment-"
+
+    def __init__(self, path: str, embedding_function: Optional[Callable] = None):
+        self.path = path
+        self.embedding_function = embedding_function
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._snapshot = _Snapshot([])
+        self._snapshot = self._load()
+
+    @property
+    def _table_path(self) -> str:
+        return os.path.join(self.path, self.TABLE_FILE)
+
+    def _stamp(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self._table_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _load(self, attempts: int = 3) -> _Snapshot:
+        """Read the current version from disk, reusing segments already mapped"""
+        stamp = self._stamp()
+        if stamp is None:
+            return _Snapshot([])
+        with open(self._table_path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        known = {segment.name: segment for segment in self._snapshot.segments}
+        segments = []
+        try:
+            for entry in table["segments"]:
+                segment = known.get(entry["name"]) or self._read_segment(entry["name"])
+                segments.append(segment.with_deleted(entry.get("deleted", [])))
+        except FileNotFoundError:
+            # A writer merged these segments away while they were being read
+            if attempts <= 1:
+                raise
+            return self._load(attempts - 1)
+        return _Snapshot(
+            segments,
+            version=table.get("version", 0),
+            stamp=stamp,
+            next_segment=table.get("next_segment", 1),
+        )
+
+    def _current(self) -> _Snapshot:
+        """Latest snapshot, reloading it if another process wrote a version"""
+        with self._lock:
+            if self._stamp() != self._snapshot.stamp:
+                self._snapshot = self._load()
+            return self._snapshot
+
+    def _read_segment(self, name: str) -> _Segment:
+        with open(os.path.join(self.path, name + ".json"), "r", encoding="utf-8") as f:
+            records = json.load(f)
+        embeddings = np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r")
+        return _Segment(
+            name, records["ids"], records["documents"], records["metadatas"], embeddings
+        )
+
+    def _write_segment(
+        self,
+        number: int,
+        ids: List[str],
+        documents: List[Optional[str]],
+        metadatas: List[Dict[str, Any]],
+        embeddings: np.ndarray,
+    ) -> _Segment:
+        """Write one segment's files and map them; caller holds the lock"""
+        name = f"{self.SEGMENT_PREFIX}{number}"
+        temp = os.path.join(self.path, f".{name}.npy.tmp")
+        with open(temp, "wb") as f:
+            np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+        os.replace(temp, os.path.join(self.path, name + ".npy"))
+        temp = os.path.join(self.path, f".{name}.json.tmp")
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(
+                json.dumps({"ids": ids, "documents": documents, "metadatas": metadatas})
+            )
+        os.replace(temp, os.path.join(self.path, name + ".json"))
+        embeddings = np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r")
+        return _Segment(name, ids, documents, metadatas, embeddings)
+
+    def _merge(
+        self, segments: List[_Segment], next_segment: int
+    ) -> Tuple[List[_Segment], int]:
+        """Rewrite segments into one, keeping only their live rows"""
+        rows = [(segment, segment.live_rows()) for segment in segments]
+        merged = self._write_segment(
+            next_segment,
+            [s.ids[r] for s, live in rows for r in live],
+            [s.documents[r] for s, live in rows for r in live],
+            [s.metadatas[r] for s, live in rows for r in live],
+            np.concatenate([np.asarray(s.embeddings[live]) for s, live in rows]),
+        )
+        return [merged], next_segment + 1
+
+    def _commit(self, segments: List[_Segment], previous: _Snapshot, next_segment: int):
+        """Merge segments as needed and publish a new version; caller holds the lock"""
+        segments = [segment for segment in segments if segment.live_count]
+        live = sum(segment.live_count for segment in segments)
+        deleted = sum(len(segment.deleted) for segment in segments)
+        if len(segments) > 1 and deleted > live:
+            segments, next_segment = self._merge(segments, next_segment)
+        while len(segments) > 1 and segments[-1].live_count >= segments[-2].live_count:
+            merged, next_segment = self._merge(segments[-2:], next_segment)
+            segments = segments[:-2] + merged
+
+        temp = self._table_path + ".tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "version": previous.version + 1,
+                        "next_segment": next_segment,
+                        "segments": [
+                            {"name": s.name, "deleted": sorted(s.deleted)}
+                            for s in segments
+                        ],
+                    }
+                )
+            )
+        os.replace(temp, self._table_path)
+
+        # Mappings of merged segments stay valid after unlinking
+        names = {segment.name for segment in segments}
+        for filename in os.listdir(self.path):
+            stem, _ = os.path.splitext(filename)
+            if stem.startswith(self.SEGMENT_PREFIX) and stem not in names:
+                try:
+                    os.remove(os.path.join(self.path, filename))
+                except OSError:
+                    pass
+        self._snapshot = _Snapshot(
+            segments, previous.version + 1, self._stamp(), next_segment
+        )
+
+    def count(self) -> int:
+        return len(self._current().rows)
+
+    def upsert(
+        self,
+        ids: List[str],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Sequence[Any]] = None,
+    ):
+        """Insert or replace records; documents are embedded if needed"""
+        if not ids:
+            return
+        documents = documents if documents is not None else [None] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+        if embeddings is None:
+            if self.embedding_function is None:
+                raise ValueError("Embeddings or an embedding function are required")
+            embeddings = self.embedding_function(documents)
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        vectors = vectors / np.maximum(
+            np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12
+        )
+
+        self._current()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot.width is not None and snapshot.width != vectors.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"collection dimension {snapshot.width}"
+                )
+            # The last occurrence of an id within the batch wins
+            order = sorted({doc_id: i for i, doc_id in enumerate(ids)}.values())
+            segment = self._write_segment(
+                snapshot.next_segment,
+                [ids[i] for i in order],
+                [documents[i] for i in order],
+                [dict(metadatas[i] or {}) for i in order],
+                vectors[order],
+            )
+            replaced = [snapshot.rows[i] for i in ids if i in snapshot.rows]
+            self._commit(
+                snapshot.without_rows(set(replaced)) + [segment],
+                snapshot,
+                snapshot.next_segment + 1,
+            )
+
+    def delete(
+        self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None
+    ):
+        """Remove records by id and/or metadata filter"""
+        self._current()
+        with self._lock:
+            snapshot = self._snapshot
+            rows = snapshot.select(where) if where else None
+            if ids is not None:
+                wanted = {snapshot.rows[i] for i in ids if i in snapshot.rows}
+                rows = [r for r in rows if r in wanted] if rows is not None else wanted
+            if rows is None or not len(rows):
+                return
+            self._commit(snapshot.without_rows(rows), snapshot, snapshot.next_segment)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Records by id (in the given order) and/or filter"""
+        include = include if include is not None else ["documents", "metadatas"]
+        snapshot = self._current()
+        if ids is not None:
+            rows = [snapshot.rows[i] for i in ids if i in snapshot.rows]
+            mask = snapshot.mask(where)
+            if mask is not None:
+                rows = [r for r in rows if mask[r]]
+        else:
+            rows = [int(r) for r in snapshot.select(where)]
+        return self._records(snapshot, rows, include)
+
+    def query(
+        self,
+        query_embeddings: Sequence[Any],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """Exact nearest neighbours by cosine similarity for each query"""
+        include = (
+            include if include is not None else ["documents", "metadatas", "distances"]
+        )
+        snapshot = self._current()
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries.reshape(len(query_embeddings), -1)
+        queries = queries / np.maximum(
+            np.linalg.norm(queries, axis=1, keepdims=True), 1e-12
+        )
+
+        candidates = snapshot.select(where)
+        if n_results <= 0:
+            candidates = candidates[:0]
+        scores = snapshot.scores(queries, candidates)
+
+        results: Dict[str, Any] = {"ids": [], "distances": []}
+        for key in ("documents", "metadatas", "embeddings"):
+            if key in include:
+                results[key] = []
+        count = min(n_results, scores.shape[1])
+        for row_scores in scores:
+            if count:
+                top = np.argpartition(-row_scores, count - 1)[:count]
+                top = top[np.argsort(-row_scores[top], kind="stable")]
+            else:
+                top = np.zeros(0, dtype=np.int64)
+            records = self._records(
+                snapshot, [int(candidates[t]) for t in top], include
+            )
+            for key in results:
+                if key != "distances":
+                    results[key].append(records[key])
+            results["distances"].append([1.0 - float(row_scores[t]) for t in top])
+        if "distances" not in include:
+            results["distances"] = None
+        return results
+
+    @staticmethod
+    def _records(
+        snapshot: _Snapshot, rows: List[int], include: List[str]
+    ) -> Dict[str, Any]:
+        records: Dict[str, Any] = {"ids": [snapshot.ids[r] for r in rows]}
+        if "documents" in include:
+            records["documents"] = [snapshot.documents[r] for r in rows]
+        if "metadatas" in include:
+            records["metadatas"] = [dict(snapshot.metadatas[r]) for r in rows]
+        if "embeddings" in include:
+            records["embeddings"] = snapshot.vectors(rows)
+        return records
+
+
+class NumpyVectorBackend:
+    """
+    Client for collections stored as memory-mapped NumPy flat indexes.
+
+    Each collection is a directory under path. Opening one reads its side
+    table and maps its embeddings, without the database and index loading
+    of a Chroma client, so small and medium corpora open in milliseconds.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def get_or_create_collection(
+        self,
+        name: str,
+        embedding_function: Optional[Callable] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> NumpyCollection:
+        """Open a collection; metadata may only ask for Chroma's cosine space"""
+        space = (metadata or {}).get("hnsw:space", "cosine")
+        if space != "cosine":
+            raise ValueError(f"Unsupported distance space: {space}")
+        with self._lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = NumpyCollection(
+                    os.path.join(self.path, name), embedding_function
+                )
+                self._collections[name] = collection
+            elif embedding_function is not None:
+                collection.embedding_function = embedding_function
+            return collection
+
+    def delete_collection(self, name: str):
+        with self._lock:
+            self._collections.pop(name, None)
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+
+    def get_max_batch_size(self) -> Optional[int]:
+        """No limit beyond memory; VectorStore's batch size applies"""
+        return None
+
+    def disk_bytes(self) -> int:
+        """Bytes of every collection's segments and side tables on disk"""
+        total = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass  # Removed by a concurrent merge
+        return total
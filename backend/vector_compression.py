@@ -0,0 +1,256 @@
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+COMPRESSION_MODES = ("none", "float16", "int8")
+
+# Rows scored per block so int8 codes are never widened all at once
+SCORE_BLOCK_ROWS = 4096
+
+
+def _as_matrix(vectors: Any) -> np.ndarray:
+    """Stack embeddings into a float32 matrix"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    return matrix.reshape(1, -1) if matrix.ndim == 1 else matrix
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class VectorCodec:
+    """
+    Compact encoding of embeddings for approximate cosine search.
+
+    Vectors are optionally projected onto their leading principal
+    components, re-normalized so dot products stay cosine similarities,
+    and then stored as float16 or as int8 with one scale per vector.
+    """
+
+    def __init__(self, mode: str = "int8", dimensions: Optional[int] = None):
+        if mode not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown compression mode: {mode}")
+        self.mode = mode
+        self.dimensions = dimensions or None  # Target PCA dimensions
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None  # (dimensions, original)
+
+    @property
+    def projected(self) -> bool:
+        return self.components is not None
+
+    def fit(self, vectors: Any) -> "VectorCodec":
+        """
+        Fit the PCA projection on a sample of embeddings.
+
+        Without a target dimension, or with fewer samples than dimensions
+        kept, vectors are left at full dimension.
+        """
+        matrix = _as_matrix(vectors)
+        self.mean, self.components = None, None
+        if not self.dimensions or not matrix.size:
+            return self
+        count, width = matrix.shape
+        if self.dimensions >= width or count < self.dimensions:
+            return self
+        self.mean = matrix.mean(axis=0)
+        _, _, vt = np.linalg.svd(matrix - self.mean, full_matrices=False)
+        self.components = vt[: self.dimensions].astype(np.float32)
+        return self
+
+    def project(self, vectors: Any) -> np.ndarray:
+        """Unit vectors in the (possibly reduced) search space"""
+        matrix = _as_matrix(vectors)
+        if self.components is not None:
+            matrix = (matrix - self.mean) @ self.components.T
+        return _normalize(matrix)
+
+    def encode(self, vectors: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode embeddings.
+
+        Returns:
+            (codes, scales); a vector decodes to codes * scale
+        """
+        matrix = self.project(vectors)
+        if self.mode == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales = np.maximum(scales, 1e-12).astype(np.float32)
+            codes = np.round(matrix / scales[:, None]).astype(np.int8)
+            return codes, scales
+        dtype = np.float16 if self.mode == "float16" else np.float32
+        return matrix.astype(dtype), np.ones(len(matrix), dtype=np.float32)
+
+    def decode(self, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) * scales[:, None]
+
+
+class CompressedVectorIndex:
+    """
+    In-memory flat index of compressed course chunk embeddings.
+
+    Mirrors the course_content collection by chunk id and ranks chunks by
+    approximate cosine similarity, filtered on course_title and
+    lesson_number like the Chroma queries. Candidates are meant to be
+    rescored against the full-precision embeddings before being returned.
+    """
+
+    def __init__(self, codec: VectorCodec):
+        self.codec = codec
+        self._codes: Optional[np.ndarray] = None
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._course_titles: List[Optional[str]] = []
+        self._lesson_numbers: List[Optional[int]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ids)
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: Any,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """Index embeddings, replacing any already indexed under the same id"""
+        if not ids:
+            return
+        metadatas = metadatas or [{} for _ in ids]
+        codes, scales = self.codec.encode(embeddings)
+        with self._lock:
+            stored = len(self._scales)
+            new_rows = []
+            for row, (doc_id, metadata) in enumerate(zip(ids, metadatas)):
+                metadata = metadata or {}
+                position = self._rows.get(doc_id)
+                if position is not None and position < stored:
+                    self._codes[position] = codes[row]
+                    self._scales[position] = scales[row]
+                elif position is not None:
+                    new_rows[position - stored] = row  # Repeated in this batch
+                else:
+                    position = len(self._ids)
+                    self._rows[doc_id] = position
+                    new_rows.append(row)
+                    self._ids.append(None)
+                    self._course_titles.append(None)
+                    self._lesson_numbers.append(None)
+                self._ids[position] = doc_id
+                self._course_titles[position] = metadata.get("course_title")
+                self._lesson_numbers[position] = metadata.get("lesson_number")
+            if new_rows:
+                self._codes = (
+                    codes[new_rows]
+                    if self._codes is None
+                    else np.concatenate([self._codes, codes[new_rows]])
+                )
+                self._scales = np.concatenate([self._scales, scales[new_rows]])
+
+    def remove(self, ids: List[str]):
+        """Drop embeddings by id"""
+        with self._lock:
+            self._remove_rows([self._rows[i] for i in ids if i in self._rows])
+
+    def remove_where(self, **metadata):
+        """Drop every embedding whose metadata matches all given values"""
+        with self._lock:
+            self._remove_rows(
+                [row for row in range(len(self._ids)) if self._matches(row, metadata)]
+            )
+
+    def clear(self):
+        with self._lock:
+            self._remove_rows(list(range(len(self._ids))))
+
+    def _remove_rows(self, rows: List[int]):
+        """Delete rows and renumber the rest; caller holds the lock"""
+        if not rows:
+            return
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[rows] = False
+        self._codes = self._codes[keep]
+        self._scales = self._scales[keep]
+        kept = np.flatnonzero(keep)
+        self._ids = [self._ids[r] for r in kept]
+        self._course_titles = [self._course_titles[r] for r in kept]
+        self._lesson_numbers = [self._lesson_numbers[r] for r in kept]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+
+    def _matches(self, row: int, filters: Dict[str, Any]) -> bool:
+        values = {
+            "course_title": self._course_titles[row],
+            "lesson_number": self._lesson_numbers[row],
+        }
+        return all(v is None or values.get(k) == v for k, v in filters.items())
+
+    def search(
+        self,
+        query_embedding: Any,
+        limit: int = 5,
+        course_title: Optional[str] = None,
+        lesson_number: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank indexed chunks by approximate cosine similarity.
+
+        Returns:
+            Up to limit (chunk id, approximate similarity) pairs, best first
+        """
+        query = self.codec.project(query_embedding)[0]
+        filters = {"course_title": course_title, "lesson_number": lesson_number}
+        filtered = course_title is not None or lesson_number is not None
+        with self._lock:
+            if not self._ids or limit <= 0:
+                return []
+            rows = np.arange(len(self._ids))
+            if filtered:
+                rows = np.array(
+                    [r for r in rows if self._matches(r, filters)], dtype=np.int64
+                )
+                if not len(rows):
+                    return []
+            scores = np.empty(len(rows), dtype=np.float32)
+            for start in range(0, len(rows), SCORE_BLOCK_ROWS):
+                block = rows[start : start + SCORE_BLOCK_ROWS]
+                scores[start : start + len(block)] = (
+                    self._codes[block].astype(np.float32) @ query
+                ) * self._scales[block]
+            count = min(limit, len(rows))
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(self._ids[rows[i]], float(scores[i])) for i in top]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the encoded vectors and their scales"""
+        with self._lock:
+            if self._codes is None:
+                return 0
+            return int(self._codes.nbytes + self._scales.nbytes)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = len(self._ids)
+            width = self._codes.shape[1] if self._codes is not None else 0
+        return {
+            "mode": self.codec.mode,
+            "vectors": count,
+            "dimensions": width,
+            "projected": self.codec.projected,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+def rescore(
+    query_embedding: Any,
+    candidate_embeddings: Sequence[Any],
+) -> np.ndarray:
+    """Exact cosine similarity of one query against full-precision candidates"""
+    if not len(candidate_embeddings):
+        return np.zeros(0, dtype=np.float32)
+    query = _normalize(_as_matrix(query_embedding))[0]
+    return _normalize(_as_matrix(candidate_embeddings)) @ query
@@ -1,15 +1,43 @@
+import json
+import os
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-import chromadb
-from chromadb.config import Settings
+from catalog_index import CourseCatalogIndex
+from embedding_cache import EmbeddingCache
+from embedding_function import LazySentenceTransformerFunction
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from metrics import (
+    course_resolution_seconds,
+    embedding_seconds,
+    ingest_batch_seconds,
+    ingest_chunks,
+    vector_query_seconds,
+)
 from models import Course, CourseChunk
-from sentence_transformers import SentenceTransformer
+from startup import LazyModule
+from vector_backend import NumpyVectorBackend, VectorBackend, VectorCollection
+from vector_compression import CompressedVectorIndex, VectorCodec, rescore
+
+# Imported on first use so the app starts without paying for it
+chromadb = LazyModule("chromadb")
+
+# Distance every backend ranks by: 1 - cosine similarity
+DISTANCE_SPACE = "cosine"
 
 
 @dataclass
 class SearchResults:
-    """Container for search results with metadata"""
+    """
+    Container for search results with metadata.
+
+    Vector search distances are cosine distances (DISTANCE_SPACE) on every
+    backend; hybrid and lexical results use the rank-based distances
+    described in VectorStore.search.
+    """
 
     documents: List[str]
     metadata: List[Dict[str, Any]]
@@ -41,36 +69,404 @@ class SearchResults:
         return len(self.documents) == 0
 
 
+@dataclass
+class SearchQuery:
+    """One query of a VectorStore.search_many batch"""
+
+    query: str
+    course_name: Optional[str] = None
+    lesson_number: Optional[int] = None
+
+
+@dataclass
+class BatchWriteStats:
+    """Timing of one batch written by add_course_content"""
+
+    size: int  # Chunks in the batch
+    embed_seconds: float  # Time spent embedding (0 if embeddings were given)
+    write_seconds: float  # Time spent in the Chroma upsert
+
+    @property
+    def chunks_per_sec(self) -> float:
+        total = self.embed_seconds + self.write_seconds
+        return self.size / total if total > 0 else 0.0
+
+
 class VectorStore:
-    """Vector storage using ChromaDB for course content and metadata"""
+    """
+    Vector storage for course content and metadata.
+
+    Collections live on a backend with Chroma's client API: ChromaDB, or
+    a memory-mapped NumPy flat index for small and medium corpora.
+    """
+
+    SEARCH_MODES = ("vector", "hybrid", "lexical")
+    BACKENDS = ("chroma", "numpy")
 
-    def __init__(self, chroma_path: str, embedding_model: str, max_results: int = 5):
+    # Candidates taken from each ranking per requested hybrid result
+    HYBRID_CANDIDATE_FACTOR = 3
+
+    def __init__(
+        self,
+        chroma_path: str,
+        embedding_model: str,
+        max_results: int = 5,
+        embedding_cache_size: int = 2048,
+        embedding_cache_path: Optional[str] = None,
+        embedding_cache_disk_entries: int = 100000,
+        write_batch_size: int = 256,
+        search_mode: str = "vector",
+        rrf_k: int = 60,
+        vector_compression: str = "none",
+        pca_dimensions: int = 0,
+        rescore_factor: int = 4,
+        backend: str = "chroma",
+    ):
+        if search_mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {search_mode}")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown vector backend: {backend}")
         self.max_results = max_results
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=chroma_path, settings=Settings(anonymized_telemetry=False)
+        self.write_batch_size = write_batch_size
+        self.search_mode = search_mode
+        self.rrf_k = rrf_k
+        # Validated here so a bad setting fails at startup, not on first search
+        VectorCodec(vector_compression, pca_dimensions)
+        self.vector_compression = vector_compression
+        self.pca_dimensions = pca_dimensions
+        self.rescore_factor = max(1, rescore_factor)
+        self.backend = backend
+        self.chroma_path = chroma_path
+        # Bound now so the client and the model later open through one module
+        module = self._chromadb = chromadb
+
+        # Set up sentence transformer embedding function; the model loads on
+        # first use or during warm_up, not here
+        self.embedding_function = LazySentenceTransformerFunction(
+            model_name=embedding_model,
+            factory=lambda **kwargs: (
+                module.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
+                    **kwargs
+                )
+            ),
+        )
+        # Query embeddings are cached so repeated searches skip the model
+        self.embedding_cache = EmbeddingCache(
+            self.embedding_function,
+            embedding_model,
+            max_entries=embedding_cache_size,
+            disk_path=embedding_cache_path,
+            max_disk_entries=embedding_cache_disk_entries,
         )
 
-        # Set up sentence transformer embedding function
-        self.embedding_function = (
-            chromadb.utils.embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=embedding_model
+        # The backend client and its collections open on first use or in
+        # the warm-up: a Chroma client loads its database and HNSW index,
+        # which would otherwise run when the app is imported
+        self._client: Optional[VectorBackend] = None
+        self._course_catalog: Optional[VectorCollection] = None
+        self._course_content: Optional[VectorCollection] = None
+        self._rescore_vectors: Optional[VectorCollection] = None
+        self._open_lock = threading.Lock()
+
+        # Full-precision vectors that compressed search rescores against,
+        # memory-mapped so workers share them through the page cache and
+        # Chroma's float32 index stays off the query path. The numpy
+        # backend already stores content that way.
+        self._rescore_backend: Optional[NumpyVectorBackend] = None
+        if self.compression_enabled and backend != "numpy":
+            self._rescore_backend = NumpyVectorBackend(
+                os.path.join(chroma_path, "rescore_vectors")
+            )
+
+        # Bumped on every write so caches keyed on it invalidate automatically
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+
+        # Catalog index for course-name resolution, rebuilt lazily after writes
+        self._catalog_index: Optional[CourseCatalogIndex] = None
+        self._catalog_version = 0
+        self._catalog_lock = threading.Lock()
+
+        # BM25 index over course_content, built lazily then updated in place
+        self._lexical_index: Optional[BM25Index] = None
+        self._lexical_version = 0
+        self._lexical_lock = threading.Lock()
+
+        # Compressed copy of the content embeddings for candidate search,
+        # built lazily when compression or PCA is configured
+        self._compressed_index: Optional[CompressedVectorIndex] = None
+        self._compressed_version = 0
+        self._compressed_lock = threading.Lock()
+
+    def _bump_generation(self):
+        with self._generation_lock:
+            self.generation += 1
+
+    def _invalidate_catalog(self):
+        """Drop the catalog index so the next resolution rebuilds it"""
+        with self._catalog_lock:
+            self._catalog_version += 1
+            self._catalog_index = None
+
+    def get_catalog_index(self) -> Optional[CourseCatalogIndex]:
+        """Return the catalog index, rebuilding it if the catalog changed"""
+        with self._catalog_lock:
+            if self._catalog_index is not None:
+                return self._catalog_index
+            version = self._catalog_version
+
+        try:
+            results = self.course_catalog.get(include=["embeddings", "metadatas"])
+            index = CourseCatalogIndex(
+                results["ids"], results.get("embeddings"), results.get("metadatas")
+            )
+        except Exception as e:
+            print(f"Error building course catalog index: {e}")
+            return None
+
+        with self._catalog_lock:
+            # Only keep it if no write happened while it was being built
+            if version == self._catalog_version:
+                self._catalog_index = index
+        return index
+
+    def get_lexical_index(self) -> Optional[BM25Index]:
+        """Return the BM25 index of course content, building it on first use"""
+        with self._lexical_lock:
+            if self._lexical_index is not None:
+                return self._lexical_index
+            version = self._lexical_version
+
+        try:
+            results = self.course_content.get(include=["documents", "metadatas"])
+            index = BM25Index()
+            index.add(
+                results["ids"],
+                results.get("documents") or [],
+                results.get("metadatas") or [],
+            )
+        except Exception as e:
+            print(f"Error building lexical index: {e}")
+            return None
+
+        with self._lexical_lock:
+            # Writes made while building are not in the snapshot, so only
+            # keep it if none happened
+            if version == self._lexical_version:
+                self._lexical_index = index
+        return index
+
+    def _update_lexical_index(self, update: Callable[[BM25Index], None]):
+        """Apply a write to the built lexical index, or invalidate a pending build"""
+        with self._lexical_lock:
+            if self._lexical_index is None:
+                self._lexical_version += 1
+            else:
+                update(self._lexical_index)
+
+    @property
+    def compression_enabled(self) -> bool:
+        return self.vector_compression != "none" or self.pca_dimensions > 0
+
+    def get_compressed_index(self) -> Optional[CompressedVectorIndex]:
+        """
+        Return the compressed embedding index, building it on first use.
+
+        The index is built from the memory-mapped rescore vectors, never
+        from Chroma's float32 index. The PCA projection is fitted on the
+        content stored at build time and kept for later writes;
+        clear_all_data drops the index so the next build refits it.
+        """
+        if not self.compression_enabled:
+            return None
+        with self._compressed_lock:
+            if self._compressed_index is not None:
+                return self._compressed_index
+            version = self._compressed_version
+
+        try:
+            self._sync_rescore_vectors()
+            results = self.rescore_vectors.get(include=["embeddings", "metadatas"])
+            embeddings = results.get("embeddings")
+            if embeddings is None:
+                embeddings = []
+            codec = VectorCodec(self.vector_compression, self.pca_dimensions)
+            index = CompressedVectorIndex(codec.fit(embeddings))
+            index.add(results["ids"], embeddings, results.get("metadatas") or [])
+        except Exception as e:
+            print(f"Error building compressed vector index: {e}")
+            return None
+
+        with self._compressed_lock:
+            if version == self._compressed_version:
+                self._compressed_index = index
+        return index
+
+    def _sync_rescore_vectors(self):
+        """
+        Copy content vectors missing from the rescore store, e.g. content
+        written before compression was enabled, and drop stale ones.
+        """
+        if self._rescore_backend is None:
+            return
+        stored = set(self.rescore_vectors.get(include=[])["ids"])
+        content_ids = self.course_content.get(include=[])["ids"]
+        stale = stored.difference(content_ids)
+        if stale:
+            self.rescore_vectors.delete(ids=list(stale))
+        missing = [doc_id for doc_id in content_ids if doc_id not in stored]
+        if missing:
+            results = self.course_content.get(
+                ids=missing, include=["embeddings", "metadatas"]
+            )
+            self.rescore_vectors.upsert(
+                ids=results["ids"],
+                metadatas=results.get("metadatas"),
+                embeddings=results["embeddings"],
             )
+
+    def get_compression_stats(self) -> Dict[str, Any]:
+        """
+        Net footprint of compressed search.
+
+        Counts the compressed index held in memory and the full-precision
+        rescore copy on disk. With the numpy backend the content store is
+        rescored directly, so there is no separate copy. The index is not
+        built here; before the first search its memory is reported as 0.
+        """
+        if not self.compression_enabled:
+            return {"enabled": False}
+        with self._compressed_lock:
+            index = self._compressed_index
+        stats = {"enabled": True, "memory_bytes": 0}
+        if index is not None:
+            stats.update(index.stats())
+        stats["rescore_copy"] = self._rescore_backend is not None
+        stats["rescore_disk_bytes"] = (
+            self._rescore_backend.disk_bytes() if self._rescore_backend else 0
         )
+        stats["total_bytes"] = stats["memory_bytes"] + stats["rescore_disk_bytes"]
+        return stats
+
+    def _update_compressed_index(
+        self, update: Optional[Callable[[CompressedVectorIndex], None]]
+    ):
+        """Apply a write to the built compressed index, or invalidate it"""
+        with self._compressed_lock:
+            if self._compressed_index is None or update is None:
+                self._compressed_version += 1
+                self._compressed_index = None
+            else:
+                update(self._compressed_index)
 
-        # Create collections for different types of data
-        self.course_catalog = self._create_collection(
-            "course_catalog"
+    def _create_client(self) -> VectorBackend:
+        """Open the storage backend rooted at chroma_path"""
+        if self.backend == "numpy":
+            return NumpyVectorBackend(os.path.join(self.chroma_path, "numpy_index"))
+        return self._chromadb.PersistentClient(
+            path=self.chroma_path,
+            settings=self._chromadb.config.Settings(anonymized_telemetry=False),
+        )
+
+    def _open_collections(self, client: VectorBackend):
+        """Create or get the collections, and the rescore copy, on client"""
+        # Chroma defaults to squared L2; cosine matches the flat and
+        # compressed indexes, so distances mean the same on every backend
+        metadata = {"hnsw:space": DISTANCE_SPACE}
+        self._course_catalog = client.get_or_create_collection(
+            name="course_catalog",
+            embedding_function=self.embedding_function,
+            metadata=metadata,
         )  # Course titles/instructors
-        self.course_content = self._create_collection(
-            "course_content"
+        self._course_content = client.get_or_create_collection(
+            name="course_content",
+            embedding_function=self.embedding_function,
+            metadata=metadata,
         )  # Actual course material
+        for collection in (self._course_catalog, self._course_content):
+            self._check_space(collection)
+        if self._rescore_backend is not None:
+            self._rescore_vectors = self._rescore_backend.get_or_create_collection(
+                "course_content"
+            )
+        elif self.compression_enabled:
+            self._rescore_vectors = self._course_content
 
-    def _create_collection(self, name: str):
-        """Create or get a ChromaDB collection"""
-        return self.client.get_or_create_collection(
-            name=name, embedding_function=self.embedding_function
-        )
+    @staticmethod
+    def _check_space(collection: VectorCollection):
+        """Warn about collections created before they ranked by cosine"""
+        config = getattr(collection, "configuration_json", None)
+        if not isinstance(config, dict):
+            return
+        space = (config.get("hnsw") or {}).get("space")
+        if space not in (None, DISTANCE_SPACE):
+            # Chroma cannot change the space of an existing collection
+            print(
+                f"Collection {collection.name} ranks by {space} distance; clear "
+                f"and re-ingest it to switch to {DISTANCE_SPACE}"
+            )
+
+    def open(self) -> VectorBackend:
+        """Open the storage backend and its collections once"""
+        if self._client is None:
+            with self._open_lock:
+                if self._client is None:
+                    client = self._create_client()
+                    self._open_collections(client)
+                    self._client = client
+        return self._client
+
+    @property
+    def client(self) -> VectorBackend:
+        return self.open()
+
+    @property
+    def course_catalog(self) -> VectorCollection:
+        self.open()
+        return self._course_catalog
+
+    @property
+    def course_content(self) -> VectorCollection:
+        self.open()
+        return self._course_content
+
+    @property
+    def rescore_vectors(self) -> Optional[VectorCollection]:
+        self.open()
+        return self._rescore_vectors
+
+    def warm_up_steps(self) -> List[Tuple[str, Callable[[], Any]]]:
+        """
+        Named steps that load everything the first search would otherwise
+        initialize: the backend client and its collections, the embedding
+        model, the in-memory indexes and the backend's vector index, which
+        is exercised with one dummy query.
+        With compression, searches never query the backend's index, so
+        the compressed index is built instead of loading it.
+        """
+
+        def load_model():
+            self.embedding_function.load()
+            self.embed_documents(["warm-up"])
+
+        def query_content():
+            if self.course_content.count():
+                self.course_content.query(
+                    query_embeddings=self.embed_documents(["warm-up"]), n_results=1
+                )
+
+        steps = [
+            ("vector store", self.open),
+            ("embedding model", load_model),
+            ("catalog index", self.get_catalog_index),
+        ]
+        if self.compression_enabled:
+            steps.append(("compressed index", self.get_compressed_index))
+        else:
+            steps.append(("content index", query_content))
+        if self.search_mode != "vector":
+            steps.append(("lexical index", self.get_lexical_index))
+        return steps
 
     def search(
         self,
@@ -78,45 +474,301 @@ class VectorStore:
         course_name: Optional[str] = None,
         lesson_number: Optional[int] = None,
         limit: Optional[int] = None,
+        mode: Optional[str] = None,
     ) -> SearchResults:
         """
         Main search interface that handles course resolution and content search.
 
+        In hybrid mode the vector ranking and the BM25 ranking are fused with
+        reciprocal rank fusion, so chunks matching exact terms surface even
+        when their embeddings are not the closest. Lexical mode uses only the
+        BM25 index and never embeds the query. For hybrid and lexical
+        results, distances are 1 - score / best score (0 for the top hit),
+        so both are opt-in: the default vector mode keeps cosine distances.
+
         Args:
             query: What to search for in course content
             course_name: Optional course name/title to filter by
             lesson_number: Optional lesson number to filter by
             limit: Maximum results to return
+            mode: "vector", "hybrid" or "lexical"; defaults to search_mode
 
         Returns:
             SearchResults object with documents and metadata
         """
-        # Step 1: Resolve course name if provided
-        course_title = None
-        if course_name:
-            course_title = self._resolve_course_name(course_name)
-            if not course_title:
-                return SearchResults.empty(f"No course found matching '{course_name}'")
+        return self.search_many(
+            [SearchQuery(query, course_name, lesson_number)], limit=limit, mode=mode
+        )[0]
+
+    def search_many(
+        self,
+        queries: List[Union[str, SearchQuery]],
+        limit: Optional[int] = None,
+        mode: Optional[str] = None,
+    ) -> List[SearchResults]:
+        """
+        Search several queries with one embedding pass.
+
+        Course names are resolved once per distinct name, all query texts
+        are embedded in a single batch, and queries sharing the same filter
+        go to Chroma as one multi-embedding query. Fusion and lexical modes
+        work as in search.
+
+        Args:
+            queries: Query texts or SearchQuery objects with their own filters
+            limit: Maximum results per query
+            mode: "vector", "hybrid" or "lexical"; defaults to search_mode
+
+        Returns:
+            One SearchResults per query, in input order; a failed course
+            resolution only affects its own entry
+        """
+        requests = [
+            q if isinstance(q, SearchQuery) else SearchQuery(q) for q in queries
+        ]
+        results: List[Optional[SearchResults]] = [None] * len(requests)
+
+        # Step 1: Resolve each distinct course name once
+        titles = {
+            name: self._resolve_course_name(name)
+            for name in {r.course_name for r in requests if r.course_name}
+        }
 
-        # Step 2: Build filter for content search
-        filter_dict = self._build_filter(course_title, lesson_number)
+        # Step 2: Build filters for the queries that can run
+        pending = []  # (position, course title, filter)
+        for i, request in enumerate(requests):
+            course_title = titles.get(request.course_name)
+            if request.course_name and not course_title:
+                results[i] = SearchResults.empty(
+                    f"No course found matching '{request.course_name}'"
+                )
+                continue
+            filter_dict = self._build_filter(course_title, request.lesson_number)
+            pending.append((i, course_title, filter_dict))
 
         # Step 3: Search course content
         # Use provided limit or fall back to configured max_results
         search_limit = limit if limit is not None else self.max_results
 
+        mode = mode or self.search_mode
         try:
-            results = self.course_content.query(
-                query_texts=[query], n_results=search_limit, where=filter_dict
+            index = self.get_lexical_index() if mode != "vector" else None
+            # Without indexed content there is nothing lexical to fuse
+            if index is not None and not len(index):
+                index = None
+
+            if index is not None and mode == "lexical":
+                for i, course_title, _ in pending:
+                    ranked = index.search(
+                        requests[i].query,
+                        search_limit,
+                        course_title,
+                        requests[i].lesson_number,
+                    )
+                    results[i] = self._ranked_results(ranked, index, {})
+                return results
+
+            n_results = (
+                search_limit * self.HYBRID_CANDIDATE_FACTOR if index else search_limit
+            )
+            vector_results = self._vector_query_many(
+                [(requests[i].query, filter_dict) for i, _, filter_dict in pending],
+                n_results,
             )
-            return SearchResults.from_chroma(results)
+            for (i, course_title, _), found in zip(pending, vector_results):
+                if index is None:
+                    results[i] = SearchResults.from_chroma(found)
+                    continue
+                lexical = index.search(
+                    requests[i].query,
+                    n_results,
+                    course_title,
+                    requests[i].lesson_number,
+                )
+                results[i] = self._fuse(found, lexical, index, search_limit)
         except Exception as e:
-            return SearchResults.empty(f"Search error: {str(e)}")
+            for i, _, _ in pending:
+                if results[i] is None:
+                    results[i] = SearchResults.empty(f"Search error: {str(e)}")
+        return results
+
+    def _vector_query_many(
+        self, items: List[Tuple[str, Optional[Dict]]], n_results: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Dense search for (query, filter) pairs.
+
+        Returns:
+            Per-query results shaped like a single-query Chroma response
+        """
+        texts = list(dict.fromkeys(query for query, _ in items))
+        embeddings = dict(zip(texts, self.embed_queries(texts)))
+
+        compressed = self.get_compressed_index()
+        if compressed is not None and len(compressed):
+            with vector_query_seconds.time(collection="course_content_compressed"):
+                return self._compressed_query_many(
+                    items, embeddings, n_results, compressed
+                )
+
+        groups: Dict[str, List[int]] = {}
+        for position, (_, filter_dict) in enumerate(items):
+            key = json.dumps(filter_dict, sort_keys=True)
+            groups.setdefault(key, []).append(position)
+
+        per_query: List[Dict[str, Any]] = [{} for _ in items]
+        for positions in groups.values():
+            with vector_query_seconds.time(collection="course_content"):
+                response = self.course_content.query(
+                    query_embeddings=[embeddings[items[p][0]] for p in positions],
+                    n_results=n_results,
+                    where=items[positions[0]][1],
+                )
+            for row, position in enumerate(positions):
+                per_query[position] = {
+                    key: [response[key][row]] if response.get(key) else None
+                    for key in ("ids", "documents", "metadatas", "distances")
+                }
+        return per_query
+
+    def _compressed_query_many(
+        self,
+        items: List[Tuple[str, Optional[Dict]]],
+        embeddings: Dict[str, Any],
+        n_results: int,
+        index: CompressedVectorIndex,
+    ) -> List[Dict[str, Any]]:
+        """
+        Dense search on compressed embeddings with full-precision rescoring.
+
+        Each query takes rescore_factor times n_results candidates from the
+        compressed index. The candidates' full-precision embeddings are read
+        from the memory-mapped rescore vectors, their documents and metadata
+        from the content collection without touching its vector index, and
+        they are ranked by exact cosine similarity. Distances are cosine
+        distances.
+        """
+        candidates = [
+            [
+                doc_id
+                for doc_id, _ in index.search(
+                    embeddings[query],
+                    n_results * self.rescore_factor,
+                    **self._filter_values(filter_dict),
+                )
+            ]
+            for query, filter_dict in items
+        ]
+        wanted = list(dict.fromkeys(i for ids in candidates for i in ids))
+        vectors: Dict[str, Any] = {"ids": [], "embeddings": []}
+        records: Dict[str, Any] = {"ids": []}
+        if wanted:
+            vectors = self.rescore_vectors.get(ids=wanted, include=["embeddings"])
+            records = self.course_content.get(
+                ids=wanted, include=["documents", "metadatas"]
+            )
+        vector_rows = {doc_id: row for row, doc_id in enumerate(vectors["ids"])}
+        rows = {doc_id: row for row, doc_id in enumerate(records["ids"])}
+
+        per_query = []
+        for (query, _), ids in zip(items, candidates):
+            ids = [doc_id for doc_id in ids if doc_id in rows and doc_id in vector_rows]
+            similarity = rescore(
+                embeddings[query],
+                [vectors["embeddings"][vector_rows[i]] for i in ids],
+            )
+            ranked = sorted(range(len(ids)), key=lambda j: -similarity[j])
+            ranked = ranked[:n_results]
+            per_query.append(
+                {
+                    "ids": [[ids[j] for j in ranked]],
+                    "documents": [[records["documents"][rows[ids[j]]] for j in ranked]],
+                    "metadatas": [[records["metadatas"][rows[ids[j]]] for j in ranked]],
+                    "distances": [[1.0 - float(similarity[j]) for j in ranked]],
+                }
+            )
+        return per_query
+
+    @staticmethod
+    def _filter_values(filter_dict: Optional[Dict]) -> Dict[str, Any]:
+        """Flatten a filter from _build_filter into field values"""
+        if not filter_dict:
+            return {}
+        values: Dict[str, Any] = {}
+        for clause in filter_dict.get("$and", [filter_dict]):
+            values.update(clause)
+        return values
+
+    def _fuse(
+        self,
+        vector_results: Dict[str, Any],
+        lexical: List[Tuple[str, float]],
+        index: BM25Index,
+        limit: int,
+    ) -> SearchResults:
+        """Reciprocal rank fusion of one query's vector and BM25 rankings"""
+        vector_ids = vector_results["ids"][0] if vector_results["ids"] else []
+        fused = reciprocal_rank_fusion(
+            [vector_ids, [doc_id for doc_id, _ in lexical]], k=self.rrf_k
+        )
+        found = SearchResults.from_chroma(vector_results)
+        known = {
+            doc_id: (document, metadata)
+            for doc_id, document, metadata in zip(
+                vector_ids, found.documents, found.metadata
+            )
+        }
+        return self._ranked_results(fused[:limit], index, known)
+
+    @staticmethod
+    def _ranked_results(
+        ranked: List[Tuple[str, float]],
+        index: BM25Index,
+        known: Dict[str, Tuple[str, Dict[str, Any]]],
+    ) -> SearchResults:
+        """Build results for ranked chunk ids, reading text from the index"""
+        documents, metadata, distances = [], [], []
+        top_score = ranked[0][1] if ranked else 0.0
+        for doc_id, score in ranked:
+            entry = known.get(doc_id) or index.get(doc_id)
+            if entry is None:
+                continue
+            documents.append(entry[0])
+            metadata.append(entry[1])
+            distances.append(1.0 - score / top_score if top_score > 0 else 0.0)
+        return SearchResults(
+            documents=documents, metadata=metadata, distances=distances
+        )
 
     def _resolve_course_name(self, course_name: str) -> Optional[str]:
+        """Find the best matching course title, timed in the metrics"""
+        start = time.perf_counter()
+        title = self._match_course_name(course_name)
+        course_resolution_seconds.observe(
+            time.perf_counter() - start,
+            outcome="resolved" if title else "unresolved",
+        )
+        return title
+
+    def _match_course_name(self, course_name: str) -> Optional[str]:
+        """Find the best matching course title, using the in-memory index first"""
+        index = self.get_catalog_index()
+        if index is not None:
+            if not len(index):
+                return None
+            title = index.resolve(course_name, self.embed_query)
+            if title:
+                return title
+        return self._query_course_name(course_name)
+
+    def _query_course_name(self, course_name: str) -> Optional[str]:
         """Use vector search to find best matching course by name"""
         try:
-            results = self.course_catalog.query(query_texts=[course_name], n_results=1)
+            query_embedding = self.embed_query(course_name)
+            with vector_query_seconds.time(collection="course_catalog"):
+                results = self.course_catalog.query(
+                    query_embeddings=[query_embedding], n_results=1
+                )
 
             if results["documents"][0] and results["metadatas"][0]:
                 # Return the title (which is now the ID)
@@ -164,7 +816,8 @@ class VectorStore:
                 }
             )
 
-        self.course_catalog.add(
+        # Upsert so re-ingesting an edited course replaces its catalog entry
+        self.course_catalog.upsert(
             documents=[course_text],
             metadatas=[
                 {
@@ -179,37 +832,172 @@ class VectorStore:
             ],
             ids=[course.title],
         )
+        self._invalidate_catalog()
+        self._bump_generation()
+
+    def embed_documents(self, texts: List[str]) -> List[Any]:
+        """Embed texts with the store's embedding model"""
+        with embedding_seconds.time(kind="documents"):
+            return self.embedding_function(texts)
+
+    def embed_query(self, text: str) -> Any:
+        """Embed a single query text through the embedding cache"""
+        return self.embed_queries([text])[0]
 
-    def add_course_content(self, chunks: List[CourseChunk]):
-        """Add course content chunks to the vector store"""
+    def embed_queries(self, texts: List[str]) -> List[Any]:
+        """Embed query texts in one batch through the embedding cache"""
+        return self.embedding_cache.embed(texts)
+
+    def add_course_content(
+        self,
+        chunks: List[CourseChunk],
+        embeddings: Optional[List[Any]] = None,
+        batch_size: Optional[int] = None,
+        on_batch: Optional[Callable[[BatchWriteStats], None]] = None,
+    ) -> List[BatchWriteStats]:
+        """
+        Add course content chunks to the vector store in batches, replacing
+        any existing chunks with the same ids.
+
+        Without precomputed embeddings, chunks are sorted by length so each
+        embedding batch pads as little as possible, and every batch is
+        embedded and written before the next one, bounding peak memory.
+
+        Args:
+            chunks: Chunks to store
+            embeddings: Optional precomputed embeddings, one per chunk
+            batch_size: Chunks per batch; defaults to write_batch_size,
+                capped by Chroma's maximum batch size
+            on_batch: Optional callback receiving each batch's stats
+
+        Returns:
+            Stats of every batch written
+        """
         if not chunks:
-            return
+            return []
 
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [
-            {
-                "course_title": chunk.course_title,
-                "lesson_number": chunk.lesson_number,
-                "chunk_index": chunk.chunk_index,
-            }
-            for chunk in chunks
-        ]
-        # Use title with chunk index for unique IDs
-        ids = [
-            f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}"
-            for chunk in chunks
-        ]
+        batch_size = self._effective_batch_size(batch_size)
+        order = list(range(len(chunks)))
+        if embeddings is None:
+            order.sort(key=lambda i: len(chunks[i].content))
+
+        stats = []
+        for start in range(0, len(order), batch_size):
+            batch = [chunks[i] for i in order[start : start + batch_size]]
+            documents = [chunk.content for chunk in batch]
+            metadatas = [
+                {
+                    "course_title": chunk.course_title,
+                    "lesson_number": chunk.lesson_number,
+                    "chunk_index": chunk.chunk_index,
+                }
+                for chunk in batch
+            ]
+            ids = [self.chunk_id(chunk) for chunk in batch]
+
+            embed_start = time.perf_counter()
+            if embeddings is None:
+                batch_embeddings = self.embed_documents(documents)
+            else:
+                batch_embeddings = [
+                    embeddings[i] for i in order[start : start + batch_size]
+                ]
+            write_start = time.perf_counter()
+
+            self.course_content.upsert(
+                documents=documents,
+                metadatas=metadatas,
+                ids=ids,
+                embeddings=batch_embeddings,
+            )
+            if self._rescore_backend is not None:
+                self.rescore_vectors.upsert(
+                    ids=ids, metadatas=metadatas, embeddings=batch_embeddings
+                )
+            self._update_lexical_index(
+                partial(
+                    BM25Index.add, ids=ids, documents=documents, metadatas=metadatas
+                )
+            )
+            self._update_compressed_index(
+                partial(
+                    CompressedVectorIndex.add,
+                    ids=ids,
+                    embeddings=batch_embeddings,
+                    metadatas=metadatas,
+                )
+            )
+
+            batch_stats = BatchWriteStats(
+                size=len(batch),
+                embed_seconds=write_start - embed_start,
+                write_seconds=time.perf_counter() - write_start,
+            )
+            stats.append(batch_stats)
+            ingest_batch_seconds.observe(batch_stats.embed_seconds, stage="embed")
+            ingest_batch_seconds.observe(batch_stats.write_seconds, stage="write")
+            ingest_chunks.inc(len(batch))
+            if on_batch:
+                on_batch(batch_stats)
+
+        self._bump_generation()
+        return stats
+
+    def _effective_batch_size(self, batch_size: Optional[int]) -> int:
+        """Requested batch size, capped by what the Chroma client accepts"""
+        size = batch_size or self.write_batch_size
+        try:
+            max_batch_size = self.client.get_max_batch_size()
+        except Exception:
+            max_batch_size = None
+        if isinstance(max_batch_size, int) and max_batch_size > 0:
+            size = min(size, max_batch_size)
+        return max(1, size)
 
-        self.course_content.add(documents=documents, metadatas=metadatas, ids=ids)
+    @staticmethod
+    def chunk_id(chunk: CourseChunk) -> str:
+        """Use title with chunk index for unique IDs"""
+        return f"{chunk.course_title.replace(' ', '_')}_{chunk.chunk_index}"
+
+    def delete_course(self, course_title: str):
+        """Remove a course's catalog entry and all of its content chunks"""
+        self.course_catalog.delete(ids=[course_title])
+        self.course_content.delete(where={"course_title": course_title})
+        if self._rescore_backend is not None:
+            self.rescore_vectors.delete(where={"course_title": course_title})
+        self._update_lexical_index(
+            lambda index: index.remove_where(course_title=course_title)
+        )
+        self._update_compressed_index(
+            lambda index: index.remove_where(course_title=course_title)
+        )
+        self._invalidate_catalog()
+        self._bump_generation()
+
+    def delete_course_content(self, ids: List[str]):
+        """Remove content chunks by id"""
+        if ids:
+            self.course_content.delete(ids=ids)
+            if self._rescore_backend is not None:
+                self.rescore_vectors.delete(ids=ids)
+            self._update_lexical_index(lambda index: index.remove(ids))
+            self._update_compressed_index(lambda index: index.remove(ids))
+            self._bump_generation()
 
     def clear_all_data(self):
         """Clear all data from both collections"""
         try:
             self.client.delete_collection("course_catalog")
             self.client.delete_collection("course_content")
+            if self._rescore_backend is not None:
+                self._rescore_backend.delete_collection("course_content")
             # Recreate collections
-            self.course_catalog = self._create_collection("course_catalog")
-            self.course_content = self._create_collection("course_content")
+            self._open_collections(self.client)
+            self._update_lexical_index(lambda index: index.clear())
+            # Rebuilt on next use so the PCA projection is refitted
+            self._update_compressed_index(None)
+            self._invalidate_catalog()
+            self._bump_generation()
         except Exception as e:
             print(f"Error clearing data: {e}")
 
@@ -259,8 +1047,34 @@ class VectorStore:
             print(f"Error getting courses metadata: {e}")
             return []
 
+    def get_course_metadata(self, course_title: str) -> Optional[Dict[str, Any]]:
+        """Get a course's catalog metadata with its lessons decoded"""
+        import json
+
+        index = self.get_catalog_index()
+        if index is not None:
+            return index.course(course_title)
+
+        try:
+            results = self.course_catalog.get(ids=[course_title])
+            if results and "metadatas" in results and results["metadatas"]:
+                course_meta = dict(results["metadatas"][0])
+                course_meta["lessons"] = json.loads(
+                    course_meta.pop("lessons_json", None) or "[]"
+                )
+                return course_meta
+            return None
+        except Exception as e:
+            print(f"Error getting course metadata: {e}")
+            return None
+
     def get_course_link(self, course_title: str) -> Optional[str]:
         """Get course link for a given course title"""
+        index = self.get_catalog_index()
+        if index is not None:
+            course = index.course(course_title)
+            return course.get("course_link") if course else None
+
         try:
             # Get course by ID (title is the ID)
             results = self.course_catalog.get(ids=[course_title])
@@ -276,6 +1090,11 @@ class VectorStore:
         """Get lesson link for a given course title and lesson number"""
         import json
 
+        index = self.get_catalog_index()
+        if index is not None:
+            lesson = index.lesson(course_title, lesson_number)
+            return lesson.get("lesson_link") if lesson else None
+
         try:
             # Get course by ID (title is the ID)
             results = self.course_catalog.get(ids=[course_title])